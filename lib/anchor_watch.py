@@ -0,0 +1,138 @@
+"""
+Bind a request to whichever session log receives its `CCB_REQ_ID` anchor.
+
+After `/clear` or a provider restart the daemon's bound log (and session-id filter) is stale: the
+prompt lands in a brand-new log. caskd/laskd arm an `AnchorWatch` right before `send_text`; it
+records the size of the recently active logs in the provider's session directories, and afterwards
+searches only bytes appended past those sizes (new files from 0) for the anchor. The first log that contains it is the binding, and its recorded size is where the
+reader starts, so nothing the provider wrote for this request is skipped or read twice.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+# Only the most recently modified logs per directory are candidates at arm time; a log that
+# receives the next prompt is either brand new or was just in use.
+_MAX_CANDIDATES = 64
+_READ_STEP = 1 << 20
+_RACY_S = 1.0
+
+
+@dataclass(frozen=True)
+class AnchorHit:
+    path: Path
+    # Size of the log when the watch was armed (0 for logs created afterwards).
+    offset: int
+
+
+def _list_logs(directory: Path, suffix: str) -> list[tuple[str, int, int]]:
+    """(path, mtime_ns, size) of the `suffix` files directly in `directory`."""
+    found: list[tuple[str, int, int]] = []
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if not entry.name.endswith(suffix) or entry.name.startswith("."):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                found.append((entry.path, int(st.st_mtime_ns), int(st.st_size)))
+    except OSError:
+        pass
+    return found
+
+
+class AnchorWatch:
+    def __init__(self, dirs: Iterable[Optional[Path]], anchor: str, *, suffix: str = ".jsonl"):
+        self.anchor = anchor.encode("utf-8")
+        self.suffix = suffix
+        self.dirs: list[Path] = []
+        for d in dirs:
+            if d is not None and Path(d) not in self.dirs:
+                self.dirs.append(Path(d))
+        # path -> size at arm time, and path -> bytes searched so far.
+        self._armed: dict[str, int] = {}
+        self._searched: dict[str, int] = {}
+        self._dir_mtimes: dict[Path, int] = {}
+        self.hit: Optional[AnchorHit] = None
+        for d in self.dirs:
+            logs = sorted(_list_logs(d, suffix), key=lambda f: f[1], reverse=True)[:_MAX_CANDIDATES]
+            for path, _mtime, size in logs:
+                self._armed[path] = size
+                self._searched[path] = size
+
+    def watch_paths(self) -> list[Path]:
+        """Directories to hand to the reactor; a missing one (e.g. tomorrow's partition) is watched via its parent."""
+        paths: list[Path] = []
+        for d in self.dirs:
+            probe = d
+            for _ in range(3):
+                if probe.exists():
+                    break
+                probe = probe.parent
+            if probe not in paths:
+                paths.append(probe)
+        return paths
+
+    def poll(self) -> Optional[AnchorHit]:
+        """Search newly written bytes of every candidate; returns the first log holding the anchor."""
+        if self.hit is not None:
+            return self.hit
+        for d in self.dirs:
+            try:
+                mtime = os.stat(d).st_mtime_ns
+            except OSError:
+                continue
+            # A listing taken within the mtime granularity of the last change may miss a file created
+            # in the same tick, so recent directories are relisted until their mtime settles.
+            if self._dir_mtimes.get(d) == mtime and time.time() - mtime / 1e9 > _RACY_S:
+                continue
+            self._dir_mtimes[d] = mtime
+            for path, _mtime, _size in _list_logs(d, self.suffix):
+                if path not in self._armed:
+                    # Created after arming: everything in it belongs to this request or later.
+                    self._armed[path] = 0
+                    self._searched[path] = 0
+        for path in list(self._armed):
+            if self._search(path):
+                self.hit = AnchorHit(Path(path), self._armed[path])
+                return self.hit
+        return None
+
+    def _search(self, path: str) -> bool:
+        start = self._searched.get(path, 0)
+        try:
+            size = os.stat(path).st_size
+        except OSError:
+            return False
+        if size < start:
+            # Rewritten in place: start over from the beginning.
+            self._armed[path] = 0
+            start = 0
+        if size <= start:
+            return False
+        overlap = len(self.anchor) - 1
+        try:
+            with open(path, "rb") as handle:
+                pos = max(self._armed[path], start - overlap)
+                handle.seek(pos)
+                while pos < size:
+                    data = handle.read(min(max(_READ_STEP, 2 * len(self.anchor)), size - pos))
+                    if len(data) <= overlap:
+                        break
+                    if self.anchor in data:
+                        return True
+                    pos += len(data)
+                    if pos < size:
+                        pos -= overlap
+                        handle.seek(pos)
+        except OSError:
+            return False
+        self._searched[path] = size
+        return False
@@ -155,6 +155,16 @@ def state_file_from_env(env_name: str) -> Optional[Path]:
         return None
 
 
+def request_priority_from_env(default: str = "interactive") -> str:
+    """
+    Priority class sent with daemon requests (`CCB_ASK_PRIORITY`: interactive|normal|bulk).
+
+    CLI asks default to interactive; background delegation (e.g. the MCP server) sets `bulk`.
+    """
+    raw = (os.environ.get("CCB_ASK_PRIORITY") or "").strip().lower()
+    return raw if raw in ("interactive", "normal", "bulk") else default
+
+
 def try_daemon_request(spec: ProviderClientSpec, work_dir: Path, message: str, timeout: float, quiet: bool, state_file: Optional[Path] = None) -> Optional[Tuple[str, int]]:
     if not env_bool(spec.enabled_env, True):
         return None
@@ -186,6 +196,7 @@ def try_daemon_request(spec: ProviderClientSpec, work_dir: Path, message: str, t
             "timeout_s": float(timeout),
             "quiet": bool(quiet),
             "message": message,
+            "priority": request_priority_from_env(),
         }
         connect_timeout = min(1.0, max(0.1, float(timeout)))
         with socket.create_connection((host, port), timeout=connect_timeout) as sock:
@@ -0,0 +1,324 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Union
+
+from file_watch import InotifyWatcher
+
+PathLike = Union[str, Path]
+FileSig = Optional[tuple[int, int, int]]
+# A fixed poll interval in seconds, or a callable re-evaluated after every poll of the wait.
+PollInterval = Union[float, Callable[[], float]]
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = (os.environ.get(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except Exception:
+        return default
+
+
+def file_sig(path: str) -> FileSig:
+    """Cheap change signature for a file or directory: (mtime_ns, size, inode), or None if missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return int(st.st_mtime_ns), int(st.st_size), int(getattr(st, "st_ino", 0) or 0)
+
+
+def _norm_paths(paths: Iterable[Optional[PathLike]]) -> tuple[str, ...]:
+    out: list[str] = []
+    for p in paths:
+        if p in (None, ""):
+            continue
+        s = str(p)
+        if s not in out:
+            out.append(s)
+    return tuple(out)
+
+
+class _Wait:
+    __slots__ = ("paths", "baseline", "deadline", "event", "changed", "interval", "next_poll")
+
+    def __init__(
+        self,
+        paths: tuple[str, ...],
+        baseline: dict[str, FileSig],
+        deadline: float,
+        interval: Optional[PollInterval] = None,
+    ):
+        self.paths = paths
+        self.baseline = baseline
+        self.deadline = deadline
+        self.event = threading.Event()
+        self.changed = False
+        self.interval = interval
+        self.next_poll = 0.0
+
+
+class Reactor:
+    """
+    One thread that owns every outstanding provider wait in the daemon process.
+
+    Session workers register "wake me when any of these files changes, or at this deadline" and then
+    block on an Event; they no longer spin in their own sleep-poll loops. The reactor stats each watched
+    path once per tick (shared across all waits on the same file) and sleeps until the earliest deadline
+    when nothing is being watched.
+
+    On Linux the reactor blocks on inotify watches of the watched paths' directories and only re-stats
+    after an event (plus a slow `safety_interval` re-check for filesystems that drop events); paths whose
+    directory cannot be watched, and all paths on other platforms, are stat-polled every `poll_interval`,
+    or at the wait's own `poll_interval` when it passes one (see `poll_schedule.PollCadence`).
+    """
+
+    def __init__(
+        self,
+        *,
+        poll_interval: Optional[float] = None,
+        use_inotify: Optional[bool] = None,
+        safety_interval: Optional[float] = None,
+    ):
+        if poll_interval is None:
+            poll_interval = _env_float("CCB_REACTOR_POLL_INTERVAL", 0.05)
+        self.poll_interval = min(1.0, max(0.01, float(poll_interval)))
+        if safety_interval is None:
+            safety_interval = _env_float("CCB_REACTOR_SAFETY_INTERVAL", 1.0)
+        self.safety_interval = max(self.poll_interval, float(safety_interval))
+        self._watcher: Optional[InotifyWatcher] = InotifyWatcher.create() if use_inotify is not False else None
+        self._cond = threading.Condition(threading.Lock())
+        self._waits: set[_Wait] = set()
+        self._thread: Optional[threading.Thread] = None
+        self._counters = {"waits": 0, "fired_change": 0, "fired_timer": 0, "ticks": 0, "stats": 0, "interrupts": 0}
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._watcher is not None
+
+    def snapshot(self, paths: Iterable[Optional[PathLike]]) -> dict[str, FileSig]:
+        return {p: file_sig(p) for p in _norm_paths(paths)}
+
+    def wait_for_change(
+        self,
+        paths: Iterable[Optional[PathLike]],
+        timeout: float,
+        *,
+        baseline: Optional[dict[str, FileSig]] = None,
+        poll_interval: Optional[PollInterval] = None,
+    ) -> bool:
+        """
+        Block until a watched path differs from `baseline` (True) or `timeout` elapses (False).
+
+        Pass a `baseline` captured *before* the caller's last read so a write landing between that
+        read and this call is not missed. `poll_interval` overrides the reactor's stat-poll cadence
+        for this wait (it does not slow down inotify wakeups).
+        """
+        norm = _norm_paths(paths)
+        if baseline is None:
+            baseline = {p: file_sig(p) for p in norm}
+        else:
+            baseline = {p: baseline[p] if p in baseline else file_sig(p) for p in norm}
+            if any(file_sig(p) != baseline[p] for p in norm):
+                return True
+        timeout = max(0.0, float(timeout))
+        if timeout <= 0:
+            return False
+
+        now = time.monotonic()
+        w = _Wait(norm, baseline, now + timeout, poll_interval)
+        w.next_poll = now + self._interval(w)
+        with self._cond:
+            self._waits.add(w)
+            self._counters["waits"] += 1
+            self._ensure_thread_locked()
+            self._cond.notify()
+        if self._watcher is not None:
+            self._watcher.wake()
+        try:
+            # The reactor fires the event at the deadline; the slack is only a safety net.
+            w.event.wait(timeout + 1.0)
+        finally:
+            with self._cond:
+                self._waits.discard(w)
+        return w.changed
+
+    def read_or_wait(
+        self,
+        try_read: Callable[[dict], tuple[Any, dict]],
+        watch_paths: Callable[[dict], Iterable[Optional[PathLike]]],
+        state: dict,
+        timeout: float,
+        *,
+        cadence: Any = None,
+    ) -> tuple[Any, dict]:
+        """
+        Non-blocking reader poll; when it yields nothing, park in the reactor until change/timeout.
+
+        With a `cadence` (`poll_schedule.PollCadence`) the wait polls at its interval, and a result
+        or a log change counts as activity.
+        """
+        baseline = self.snapshot(watch_paths(state))
+        result, state = try_read(state)
+        if result:
+            if cadence is not None:
+                cadence.activity()
+            return result, state
+        interval = cadence.interval if cadence is not None else None
+        if self.wait_for_change(watch_paths(state), timeout, baseline=baseline, poll_interval=interval) and cadence is not None:
+            cadence.activity()
+        return result, state
+
+    def interrupt(self) -> None:
+        """End every pending wait now (as a timeout) so its owner re-checks state, e.g. after a pane died."""
+        with self._cond:
+            self._counters["interrupts"] += 1
+            for w in list(self._waits):
+                self._waits.discard(w)
+                self._fire(w, False)
+            self._cond.notify()
+
+    def stats(self) -> dict:
+        with self._cond:
+            out = dict(self._counters)
+            out["pending"] = len(self._waits)
+        out["backend"] = "inotify" if self._watcher is not None else "poll"
+        if self._watcher is not None:
+            out["watched_dirs"] = self._watcher.watched_dirs()
+        return out
+
+    def _interval(self, w: _Wait) -> float:
+        interval = w.interval
+        if interval is None:
+            return self.poll_interval
+        try:
+            value = float(interval() if callable(interval) else interval)
+        except Exception:
+            return self.poll_interval
+        return min(60.0, max(0.01, value))
+
+    def _ensure_thread_locked(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="askd-reactor", daemon=True)
+        self._thread.start()
+
+    def _fire(self, w: _Wait, changed: bool) -> None:
+        w.changed = changed
+        self._counters["fired_change" if changed else "fired_timer"] += 1
+        w.event.set()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._waits:
+                    self._cond.wait()
+                now = time.monotonic()
+                sleep_for = min(w.deadline for w in self._waits) - now
+                watcher = self._watcher
+                # Every wait is re-stated on its own cadence unless inotify covers all its paths.
+                check_all = False
+                if watcher is None:
+                    polled = [w for w in self._waits if w.paths]
+                    if polled:
+                        sleep_for = min(sleep_for, min(w.next_poll for w in polled) - now)
+                    if sleep_for > 0:
+                        self._cond.wait(sleep_for)
+                else:
+                    paths = {p for w in self._waits for p in w.paths}
+                    unwatched = watcher.sync(paths)
+                    if paths:
+                        sleep_for = min(sleep_for, self.safety_interval)
+                        polled = [w for w in self._waits if unwatched.intersection(w.paths)]
+                        if polled:
+                            sleep_for = min(sleep_for, min(w.next_poll for w in polled) - now)
+                        else:
+                            check_all = True
+            if watcher is not None and sleep_for > 0:
+                # Outside the lock: registrations call watcher.wake() to interrupt this.
+                if watcher.wait(sleep_for):
+                    check_all = True
+            with self._cond:
+                waits = [w for w in self._waits if not w.event.is_set()]
+                self._counters["ticks"] += 1
+
+            now = time.monotonic()
+            sigs: dict[str, FileSig] = {}
+            fired: list[tuple[_Wait, bool]] = []
+            for w in waits:
+                changed = False
+                if check_all or now >= w.next_poll:
+                    for p in w.paths:
+                        if p not in sigs:
+                            sigs[p] = file_sig(p)
+                        if sigs[p] != w.baseline.get(p):
+                            changed = True
+                            break
+                    w.next_poll = now + self._interval(w)
+                if changed:
+                    fired.append((w, True))
+                elif now >= w.deadline:
+                    fired.append((w, False))
+            with self._cond:
+                self._counters["stats"] += len(sigs)
+                for w, changed in fired:
+                    self._waits.discard(w)
+                    self._fire(w, changed)
+
+
+_reactor: Optional[Reactor] = None
+_reactor_lock = threading.Lock()
+
+
+def get_reactor() -> Reactor:
+    global _reactor
+    with _reactor_lock:
+        if _reactor is None:
+            _reactor = Reactor()
+        return _reactor
+
+
+def watch_baseline(paths: Iterable[Optional[PathLike]]) -> Optional[dict[str, FileSig]]:
+    """
+    Signatures for a reader's idle wait, taken *before* the read it guards.
+
+    Returns None when the reactor has no inotify backend; `wait_for_change_or_sleep` then keeps the
+    reader's plain sleep-poll behaviour without paying for the extra stats.
+    """
+    reactor = get_reactor()
+    if not reactor.uses_inotify:
+        return None
+    return reactor.snapshot(paths)
+
+
+def wait_for_change_or_sleep(
+    baseline: Optional[dict[str, FileSig]],
+    poll_interval: float,
+    deadline: float,
+    *,
+    max_wait: Optional[float] = None,
+) -> bool:
+    """
+    Idle step for blocking log-reader loops: block until a baseline path changes, else sleep-poll.
+
+    `deadline` is wall-clock (time.time()), matching the readers. Waits are capped by
+    CCB_WATCH_MAX_WAIT and `max_wait` so loops still run their periodic rescans / forced reads.
+    Returns True when a change woke us.
+    """
+    if not baseline:
+        time.sleep(poll_interval)
+        return False
+    cap = max(0.0, _env_float("CCB_WATCH_MAX_WAIT", 0.5))
+    if max_wait is not None:
+        cap = min(cap, max_wait)
+    timeout = max(0.0, min(cap, deadline - time.time()))
+    if timeout <= 0:
+        # Still yield once so a zero-length window does not turn into a busy loop.
+        time.sleep(min(poll_interval, 0.01))
+        return False
+    return get_reactor().wait_for_change(list(baseline), timeout, baseline=baseline)
@@ -63,3 +63,61 @@ def shutdown_daemon(protocol_prefix: str, timeout_s: float, state_file: Path) ->
         return True
     except Exception:
         return False
+
+
+def request_stats(protocol_prefix: str, timeout_s: float, state_file: Path) -> dict | None:
+    st = read_state(state_file)
+    if not st:
+        return None
+    try:
+        host = st.get("connect_host") or st["host"]
+        port = int(st["port"])
+        token = st["token"]
+    except Exception:
+        return None
+    try:
+        with socket.create_connection((host, port), timeout=timeout_s) as sock:
+            req = {"type": f"{protocol_prefix}.stats", "v": 1, "id": "stats", "token": token}
+            sock.sendall((json.dumps(req) + "\n").encode("utf-8"))
+            buf = b""
+            deadline = time.time() + timeout_s
+            while b"\n" not in buf and time.time() < deadline:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                buf += chunk
+            if b"\n" not in buf:
+                return None
+            line = buf.split(b"\n", 1)[0].decode("utf-8", errors="replace")
+            resp = json.loads(line)
+            stats = resp.get("stats") if resp.get("type") == f"{protocol_prefix}.stats" else None
+            return stats if isinstance(stats, dict) else None
+    except Exception:
+        return None
+
+
+def send_pane_event(protocol_prefix: str, timeout_s: float, state_file: Path, *, pane_id: str, event: str) -> bool:
+    st = read_state(state_file)
+    if not st:
+        return False
+    try:
+        host = st.get("connect_host") or st["host"]
+        port = int(st["port"])
+        token = st["token"]
+    except Exception:
+        return False
+    try:
+        with socket.create_connection((host, port), timeout=timeout_s) as sock:
+            req = {
+                "type": f"{protocol_prefix}.pane_event",
+                "v": 1,
+                "id": "pane_event",
+                "token": token,
+                "pane_id": pane_id,
+                "event": event,
+            }
+            sock.sendall((json.dumps(req) + "\n").encode("utf-8"))
+            _ = sock.recv(1024)
+        return True
+    except Exception:
+        return False
@@ -9,12 +9,14 @@ import time
 from pathlib import Path
 from typing import Callable, Optional
 
+import pane_events
 from askd_runtime import log_path, normalize_connect_host, run_dir, write_log
 from process_lock import ProviderLock
 from providers import ProviderDaemonSpec
 from session_utils import safe_write_session
 
 RequestHandler = Callable[[dict], dict]
+StatsHandler = Callable[[], dict]
 
 
 def _env_truthy(name: str) -> bool:
@@ -66,6 +68,7 @@ class AskDaemonServer:
         token: str,
         state_file: Path,
         request_handler: RequestHandler,
+        stats_handler: Optional[StatsHandler] = None,
         request_queue_size: Optional[int] = None,
         on_stop: Optional[Callable[[], None]] = None,
         parent_pid: Optional[int] = None,
@@ -77,6 +80,7 @@ class AskDaemonServer:
         self.token = token
         self.state_file = state_file
         self.request_handler = request_handler
+        self.stats_handler = stats_handler
         self.request_queue_size = request_queue_size
         self.on_stop = on_stop
         self.parent_pid = parent_pid if parent_pid is not None else _env_parent_pid()
@@ -118,6 +122,22 @@ class AskDaemonServer:
                     self._write({"type": f"{protocol_prefix}.pong", "v": 1, "id": msg.get("id"), "exit_code": 0, "reply": "OK"})
                     return
 
+                if msg_type == f"{protocol_prefix}.stats":
+                    handler = self.server.stats_handler
+                    try:
+                        stats = handler() if handler else {}
+                    except Exception as exc:
+                        self._write({"type": response_type, "v": 1, "id": msg.get("id"), "exit_code": 1, "reply": f"Stats error: {exc}"})
+                        return
+                    self._write({"type": f"{protocol_prefix}.stats", "v": 1, "id": msg.get("id"), "exit_code": 0, "stats": stats})
+                    return
+
+                if msg_type == f"{protocol_prefix}.pane_event":
+                    # Pushed by the tmux pane-died/pane-exited hooks (see pane_events).
+                    pane_events.notify(str(msg.get("pane_id") or ""), str(msg.get("event") or "died"))
+                    self._write({"type": response_type, "v": 1, "id": msg.get("id"), "exit_code": 0, "reply": "OK"})
+                    return
+
                 if msg_type == f"{protocol_prefix}.shutdown":
                     self._write({"type": response_type, "v": 1, "id": msg.get("id"), "exit_code": 0, "reply": "OK"})
                     threading.Thread(target=self.server.shutdown, daemon=True).start()
@@ -181,6 +201,7 @@ class AskDaemonServer:
                 httpd.spec = self.spec
                 httpd.token = self.token
                 httpd.request_handler = self.request_handler
+                httpd.stats_handler = self.stats_handler
                 httpd.active_requests = 0
                 httpd.last_activity = time.time()
                 httpd.activity_lock = threading.Lock()
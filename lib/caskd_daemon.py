@@ -1,7 +1,5 @@
 from __future__ import annotations
 
-import heapq
-import json
 import os
 import threading
 import time
@@ -14,22 +12,39 @@ from worker_pool import BaseSessionWorker, PerSessionWorkerPool
 from ccb_protocol import (
     CaskdRequest,
     CaskdResult,
+    DoneDetector,
     REQ_ID_PREFIX,
 
     make_req_id,
-    is_done_text,
-    strip_done_text,
+    normalize_priority,
     wrap_codex_prompt,
 )
-from caskd_session import CodexProjectSession, compute_session_key, find_project_session_file, load_project_session
+from caskd_session import CodexProjectSession, find_project_session_file, session_handles
 from terminal import is_windows
-from codex_comm import CodexLogReader, CodexCommunicator, SESSION_ID_PATTERN, SESSION_ROOT
-from terminal import get_backend_for_session
+from codex_comm import (
+    CodexLogReader,
+    CodexCommunicator,
+    SESSION_ID_PATTERN,
+    SESSION_ROOT,
+    codex_anchor_dirs,
+    codex_log_index,
+    codex_turn_index,
+    latest_codex_log,
+)
+from terminal import get_backend_for_session, pane_sweep
 from askd_runtime import state_file_path, log_path, write_log, random_token
 import askd_rpc
 from askd_server import AskDaemonServer
+from askd_reactor import get_reactor
+from anchor_watch import AnchorWatch
+from poll_schedule import poll_cadence
+import pane_events
+import pane_tap
+from turn_index import sync_in_background
 from providers import CASKD_SPEC
 
+_INTERRUPT_MARKER = "■ Conversation interrupted"
+
 
 def _now_ms() -> int:
     return int(time.time() * 1000)
@@ -42,17 +57,6 @@ def _extract_codex_session_id_from_log(log_path: Path) -> Optional[str]:
         return None
 
 
-def _tail_state_for_log(log_path: Optional[Path], *, tail_bytes: int) -> dict:
-    if not log_path:
-        return {"log_path": None, "offset": 0}
-    try:
-        size = log_path.stat().st_size
-    except OSError:
-        size = 0
-    offset = max(0, int(size) - int(tail_bytes))
-    return {"log_path": log_path, "offset": offset}
-
-
 def _env_int(name: str, default: int) -> int:
     raw = (os.environ.get(name) or "").strip()
     if not raw:
@@ -104,98 +108,27 @@ def _find_latest_log_for_session_id(session_id: str, *, session_root: Path = SES
     root = Path(session_root).expanduser()
     if not session_id or not root.exists():
         return None
-    latest: Optional[Path] = None
-    latest_mtime = -1.0
-    try:
-        pattern = f"**/*{session_id}*.jsonl"
-        for p in root.glob(pattern):
-            if not p.is_file():
-                continue
-            try:
-                mtime = p.stat().st_mtime
-            except OSError:
-                continue
-            if mtime >= latest_mtime:
-                latest = p
-                latest_mtime = mtime
-    except Exception:
-        return None
-    return latest
-
-
-def _read_session_meta(log_path: Path) -> tuple[Optional[str], Optional[str]]:
-    """
-    Best-effort read of session_meta for (cwd, session_id).
-
-    Codex logs usually have session_meta on the first line, but we scan a few lines to be robust.
-    """
-    try:
-        with log_path.open("r", encoding="utf-8", errors="ignore") as handle:
-            for _ in range(30):
-                line = handle.readline()
-                if not line:
-                    break
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    entry = json.loads(line)
-                except Exception:
-                    continue
-                if not isinstance(entry, dict) or entry.get("type") != "session_meta":
-                    continue
-                payload = entry.get("payload") if isinstance(entry.get("payload"), dict) else {}
-                cwd = payload.get("cwd")
-                sid = payload.get("id")
-                cwd_str = str(cwd).strip() if isinstance(cwd, str) else None
-                sid_str = str(sid).strip() if isinstance(sid, str) else None
-                return cwd_str or None, sid_str or None
-    except OSError:
-        return None, None
-    return None, None
+    entry = codex_log_index(root).latest(lambda e: session_id in os.path.basename(e.path))
+    return Path(entry.path) if entry else None
 
 
 def _scan_latest_log_for_work_dir(
     work_dir: Path, *, session_root: Path = SESSION_ROOT, scan_limit: int
 ) -> tuple[Optional[Path], Optional[str]]:
     """
-    Scan ~/.codex/sessions and find the latest log whose session_meta.cwd is within work_dir.
+    Find the latest log whose session_meta.cwd is within work_dir.
 
-    Uses a bounded heap so we only inspect the N most recently modified logs.
+    Only about N of the newest logs are considered, walking date partitions newest-first.
     """
     root = Path(session_root).expanduser()
     if not root.exists():
         return None, None
 
     work_dir_str = str(work_dir)
-
-    heap: list[tuple[float, str]] = []
-    try:
-        for p in root.glob("**/*.jsonl"):
-            if not p.is_file():
-                continue
-            try:
-                mtime = p.stat().st_mtime
-            except OSError:
-                continue
-            item = (mtime, str(p))
-            if len(heap) < scan_limit:
-                heapq.heappush(heap, item)
-            else:
-                if item[0] > heap[0][0]:
-                    heapq.heapreplace(heap, item)
-    except Exception:
+    entry = latest_codex_log(lambda e: bool(e.cwd) and _path_within(e.cwd, work_dir_str), root=root, limit=scan_limit)
+    if entry is None:
         return None, None
-
-    candidates = sorted(heap, key=lambda x: x[0], reverse=True)
-    for _, path_str in candidates:
-        path = Path(path_str)
-        cwd, sid = _read_session_meta(path)
-        if not cwd:
-            continue
-        if _path_within(cwd, work_dir_str):
-            return path, sid
-    return None, None
+    return Path(entry.path), entry.session_id
 
 
 def _should_overwrite_binding(current: Optional[Path], candidate: Path) -> bool:
@@ -262,6 +195,10 @@ class _QueuedTask:
     result: Optional[CaskdResult] = None
 
 
+def _reader_key(session: CodexProjectSession) -> tuple[str, str, str]:
+    return (session.work_dir, session.codex_session_path, session.codex_session_id)
+
+
 class _SessionWorker(BaseSessionWorker[_QueuedTask, CaskdResult]):
     def _handle_exception(self, exc: Exception, task: _QueuedTask) -> CaskdResult:
         write_log(log_path(CASKD_SPEC.log_file_name), f"[ERROR] session={self.session_key} req_id={task.req_id} {exc}")
@@ -280,8 +217,8 @@ class _SessionWorker(BaseSessionWorker[_QueuedTask, CaskdResult]):
         started_ms = _now_ms()
         req = task.request
         work_dir = Path(req.work_dir)
-        write_log(log_path(CASKD_SPEC.log_file_name), f"[INFO] start session={self.session_key} req_id={task.req_id} work_dir={req.work_dir}")
-        session = load_project_session(work_dir)
+        write_log(log_path(CASKD_SPEC.log_file_name), f"[INFO] start session={self.session_key} req_id={task.req_id} priority={req.priority} work_dir={req.work_dir}")
+        session = session_handles.get(work_dir).session
         if not session:
             return CaskdResult(
                 exit_code=1,
@@ -320,54 +257,68 @@ class _SessionWorker(BaseSessionWorker[_QueuedTask, CaskdResult]):
                 fallback_scan=False,
             )
 
-        prompt = wrap_codex_prompt(req.message, task.req_id)
+        prompt = wrap_codex_prompt(self._spool_message(session.work_dir, req.message), task.req_id)
 
         # Prefer project-bound log path if present; allow reader to follow newer logs if it changes.
         preferred_log = session.codex_session_path or None
         codex_session_id = session.codex_session_id or None
         # Start with session_id_filter if present; drop it if we see no events early (escape hatch).
-        reader = CodexLogReader(log_path=preferred_log, session_id_filter=codex_session_id or None, work_dir=Path(session.work_dir))
+        # A reader parked by the previous request on the same binding resumes from its cursor.
+        reader, state = self._acquire_reader(
+            _reader_key(session),
+            lambda: CodexLogReader(log_path=preferred_log, session_id_filter=codex_session_id or None, work_dir=Path(session.work_dir)),
+        )
 
-        state = reader.capture_state()
+        # Armed before sending: if the binding is stale (/clear, restart) the prompt lands in another
+        # log, and whichever log receives our anchor first becomes the binding.
+        anchor_watch = AnchorWatch(codex_anchor_dirs(preferred_log), f"{REQ_ID_PREFIX} {task.req_id}")
+        # Opt-in (CCB_PANE_TAP): pane output since this mark replaces periodic pane captures.
+        tap = pane_tap.tap_for(backend, pane_id, watch=(_INTERRUPT_MARKER,))
+        tap_mark = tap.mark() if tap is not None else 0
 
         backend.send_text(pane_id, prompt)
+        cadence = poll_cadence(CASKD_SPEC.daemon_key, self.session_key)
 
         deadline = None if float(req.timeout_s) < 0.0 else (time.time() + float(req.timeout_s))
-        chunks: list[str] = []
+        detector = DoneDetector(task.req_id)
         anchor_seen = False
         done_seen = False
         anchor_ms: Optional[int] = None
         done_ms: Optional[int] = None
         fallback_scan = False
 
-        # If we can't observe our user anchor within a short grace window, the log binding is likely stale.
-        # In that case we drop the bound session filter and rebind to the latest log, starting from a tail
-        # offset (NOT EOF) to avoid missing a reply that already landed.
-        anchor_grace_deadline = min(deadline, time.time() + 1.5) if deadline is not None else (time.time() + 1.5)
         anchor_collect_grace = min(deadline, time.time() + 2.0) if deadline is not None else (time.time() + 2.0)
         rebounded = False
         saw_any_event = False
-        tail_bytes = int(os.environ.get("CCB_CASKD_REBIND_TAIL_BYTES", str(1024 * 1024 * 2)) or (1024 * 1024 * 2))
         last_pane_check = time.time()
         # Windows平台降低检查频率，减少CLI调用和窗口闪烁风险
         default_interval = "5.0" if is_windows() else "2.0"
         pane_check_interval = float(os.environ.get("CCB_CASKD_PANE_CHECK_INTERVAL", default_interval) or default_interval)
+        reactor = get_reactor()
 
         while True:
             if deadline is not None:
                 remaining = deadline - time.time()
                 if remaining <= 0:
                     break
-                wait_step = min(remaining, 0.5)
+                wait_step = remaining
             else:
-                wait_step = 0.5
+                wait_step = pane_check_interval
+
+            # With a tap, the output since send is already in memory: check it on every wakeup.
+            interrupted = tap is not None and tap.seen(_INTERRUPT_MARKER, since=tap_mark)
 
             # Fail fast if the pane dies mid-request (e.g. Codex killed).
-            if time.time() - last_pane_check >= pane_check_interval:
+            # A pushed pane-death event (tmux hook -> pane_events) forces the check right away.
+            pane_pushed = pane_events.died_since(pane_id, started_ms / 1000.0)
+            if pane_pushed or time.time() - last_pane_check >= pane_check_interval:
                 try:
                     alive = bool(backend.is_alive(pane_id))
                 except Exception:
                     alive = False
+                if alive and pane_pushed:
+                    # Respawned in place since the event: nothing to fail.
+                    pane_events.clear(pane_id)
                 if not alive:
                     write_log(log_path(CASKD_SPEC.log_file_name), f"[ERROR] Pane {pane_id} died during request session={self.session_key} req_id={task.req_id}")
                     codex_log_path = None
@@ -392,59 +343,71 @@ class _SessionWorker(BaseSessionWorker[_QueuedTask, CaskdResult]):
                 # Check for Codex interrupted state
                 # Only trigger if "■ Conversation interrupted" appears AFTER "CCB_REQ_ID" (our request)
                 # This ensures we're detecting interrupt for current task, not history
-                if hasattr(backend, 'get_text'):
+                if tap is None and hasattr(backend, 'get_text'):
                     try:
                         pane_text = backend.get_text(pane_id, lines=15)
-                        if pane_text and '■ Conversation interrupted' in pane_text:
+                        if pane_text and _INTERRUPT_MARKER in pane_text:
                             # Verify this is for current request: interrupt should appear after our req_id
                             req_id_pos = pane_text.find(task.req_id)
-                            interrupt_pos = pane_text.find('■ Conversation interrupted')
+                            interrupt_pos = pane_text.find(_INTERRUPT_MARKER)
                             # Only trigger if interrupt is after our request ID (or if req_id not found but interrupt is recent)
-                            is_current_interrupt = (req_id_pos >= 0 and interrupt_pos > req_id_pos) or (req_id_pos < 0 and interrupt_pos >= 0)
-                        else:
-                            is_current_interrupt = False
-                        if is_current_interrupt:
-                            write_log(log_path(CASKD_SPEC.log_file_name), f"[WARN] Codex interrupted - skipping task session={self.session_key} req_id={task.req_id}")
-                            codex_log_path = None
-                            try:
-                                lp = reader.current_log_path()
-                                if lp:
-                                    codex_log_path = str(lp)
-                            except Exception:
-                                codex_log_path = None
-                            return CaskdResult(
-                                exit_code=1,
-                                reply="❌ Codex interrupted. Please recover Codex manually, then retry. Skipping to next task.",
-                                req_id=task.req_id,
-                                session_key=self.session_key,
-                                log_path=codex_log_path,
-                                anchor_seen=anchor_seen,
-                                done_seen=False,
-                                fallback_scan=fallback_scan,
-                                anchor_ms=anchor_ms,
-                                done_ms=None,
-                            )
+                            interrupted = (req_id_pos >= 0 and interrupt_pos > req_id_pos) or (req_id_pos < 0 and interrupt_pos >= 0)
                     except Exception:
                         pass
                 last_pane_check = time.time()
+            if interrupted:
+                write_log(log_path(CASKD_SPEC.log_file_name), f"[WARN] Codex interrupted - skipping task session={self.session_key} req_id={task.req_id}")
+                codex_log_path = None
+                try:
+                    lp = reader.current_log_path()
+                    if lp:
+                        codex_log_path = str(lp)
+                except Exception:
+                    codex_log_path = None
+                return CaskdResult(
+                    exit_code=1,
+                    reply="❌ Codex interrupted. Please recover Codex manually, then retry. Skipping to next task.",
+                    req_id=task.req_id,
+                    session_key=self.session_key,
+                    log_path=codex_log_path,
+                    anchor_seen=anchor_seen,
+                    done_seen=False,
+                    fallback_scan=fallback_scan,
+                    anchor_ms=anchor_ms,
+                    done_ms=None,
+                )
 
-            event, state = reader.wait_for_event(state, wait_step)
+            watching = (not rebounded) and (not anchor_seen)
+            watch_paths = reader.watch_paths(state) + (anchor_watch.watch_paths() if watching else [])
+            baseline = reactor.snapshot(watch_paths)
+            event, state = reader.try_get_event(state)
             if event is None:
-                if (not rebounded) and (not anchor_seen) and time.time() >= anchor_grace_deadline and codex_session_id:
-                    # Escape hatch: drop the session_id_filter so the reader can follow the latest log for this work_dir.
+                hit = anchor_watch.poll() if watching else None
+                if hit is not None and hit.path != state.get("log_path"):
+                    # The prompt landed in another log: drop the session_id_filter and read that log from
+                    # where it stood when the watch was armed.
                     codex_session_id = None
-                    reader = CodexLogReader(log_path=preferred_log, session_id_filter=None, work_dir=Path(session.work_dir))
-                    log_hint = reader.current_log_path()
-                    state = _tail_state_for_log(log_hint, tail_bytes=tail_bytes)
+                    reader = CodexLogReader(log_path=hit.path, session_id_filter=None, work_dir=Path(session.work_dir))
+                    state = {"log_path": hit.path, "offset": hit.offset}
                     fallback_scan = True
                     rebounded = True
+                    continue
+                # Sleep in the shared reactor until a log changes or the next pane check is due.
+                wake_at = last_pane_check + pane_check_interval
+                wait_s = max(0.0, min(wait_step, wake_at - time.time()))
+                if reactor.wait_for_change(watch_paths, wait_s, baseline=baseline, poll_interval=cadence.interval):
+                    cadence.activity()
+                else:
+                    state = reader.follow_latest(state)
                 continue
 
             role, text = event
             saw_any_event = True
+            cadence.activity()
             if role == "user":
                 if f"{REQ_ID_PREFIX} {task.req_id}" in text:
                     anchor_seen = True
+                    cadence.anchor()
                     if anchor_ms is None:
                         anchor_ms = _now_ms() - started_ms
                 continue
@@ -457,15 +420,13 @@ class _SessionWorker(BaseSessionWorker[_QueuedTask, CaskdResult]):
             if (not anchor_seen) and time.time() < anchor_collect_grace:
                 continue
 
-            chunks.append(text)
-            combined = "\n".join(chunks)
-            if is_done_text(combined, task.req_id):
+            if detector.feed(text):
                 done_seen = True
                 done_ms = _now_ms() - started_ms
                 break
 
-        combined = "\n".join(chunks)
-        reply = strip_done_text(combined, task.req_id)
+        cadence.finish(anchor_ms=anchor_ms, done_ms=done_ms)
+        reply = detector.reply()
         codex_log_path = None
         try:
             lp = state.get("log_path")
@@ -477,6 +438,10 @@ class _SessionWorker(BaseSessionWorker[_QueuedTask, CaskdResult]):
         if done_seen and codex_log_path:
             sid = _extract_codex_session_id_from_log(Path(codex_log_path))
             session.update_codex_log_binding(log_path=codex_log_path, session_id=sid)
+            sync_in_background(codex_turn_index(Path(codex_log_path)))
+        if not rebounded:
+            # Keyed on the binding *after* the update above, so the next request resumes this cursor.
+            self._park_reader(_reader_key(session), reader, state)
 
         exit_code = 0 if done_seen else 2
         result = CaskdResult(
@@ -520,15 +485,22 @@ class SessionRegistry:
         self._lock = threading.Lock()
         self._sessions: dict[str, _SessionEntry] = {}  # work_dir -> entry
         self._stop = threading.Event()
+        # Set by pushed pane-death events (pane_events) to run the next check immediately.
+        self._wake = threading.Event()
         self._monitor_thread: Optional[threading.Thread] = None
 
     def start_monitor(self) -> None:
         if self._monitor_thread is None:
+            pane_events.subscribe(self._on_pane_event)
             self._monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
             self._monitor_thread.start()
 
     def stop_monitor(self) -> None:
         self._stop.set()
+        self._wake.set()
+
+    def _on_pane_event(self, pane_id: str, event: str) -> None:
+        self._wake.set()
 
     def get_session(self, work_dir: Path) -> Optional[CodexProjectSession]:
         key = str(work_dir)
@@ -557,7 +529,7 @@ class SessionRegistry:
         return None
 
     def _load_and_cache(self, work_dir: Path) -> Optional[_SessionEntry]:
-        session = load_project_session(work_dir)
+        session = session_handles.get(work_dir).session
         session_file = session.session_file if session else (find_project_session_file(work_dir) or (work_dir / ".ccb_config" / ".codex-session"))
         mtime = 0.0
         if session_file.exists():
@@ -602,7 +574,11 @@ class SessionRegistry:
                 write_log(log_path(CASKD_SPEC.log_file_name), f"[INFO] Session removed: {work_dir}")
 
     def _monitor_loop(self) -> None:
-        while not self._stop.wait(self.CHECK_INTERVAL):
+        while not self._stop.is_set():
+            self._wake.wait(self.CHECK_INTERVAL)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
             self._check_all_sessions()
 
     def _check_all_sessions(self) -> None:
@@ -613,12 +589,14 @@ class SessionRegistry:
         with self._lock:
             snapshot = [(key, entry.work_dir) for key, entry in self._sessions.items() if entry.valid]
 
-        for key, work_dir in snapshot:
-            try:
-                self._check_one(key, work_dir, now=now, refresh_interval_s=refresh_interval_s, scan_limit=scan_limit)
-            except Exception:
-                # Never let monitor crash the daemon.
-                continue
+        # Every session's pane check is answered from one pane listing taken for this sweep.
+        with pane_sweep():
+            for key, work_dir in snapshot:
+                try:
+                    self._check_one(key, work_dir, now=now, refresh_interval_s=refresh_interval_s, scan_limit=scan_limit)
+                except Exception:
+                    # Never let monitor crash the daemon.
+                    continue
 
         # Cleanup invalid entries.
         with self._lock:
@@ -660,7 +638,7 @@ class SessionRegistry:
                 return
             file_changed = bool((entry.session_file != session_file) or (entry.file_mtime != current_mtime))
             if file_changed or (entry.session is None):
-                session = load_project_session(work_dir)
+                session = session_handles.get(work_dir).session
                 entry.session = session
                 entry.session_file = session_file
                 entry.file_mtime = current_mtime
@@ -756,13 +734,16 @@ class _WorkerPool:
         req_id = make_req_id()
         task = _QueuedTask(request=request, created_ms=_now_ms(), req_id=req_id, done_event=threading.Event())
 
-        session = load_project_session(Path(request.work_dir))
-        session_key = compute_session_key(session) if session else "codex:unknown"
+        session_key = session_handles.get(Path(request.work_dir)).session_key or "codex:unknown"
 
-        worker = self._pool.get_or_create(session_key, _SessionWorker)
-        worker.enqueue(task)
+        self._pool.submit(session_key, _SessionWorker, task)
         return task
 
+    def stats(self) -> dict:
+        stats = self._pool.stats()
+        stats["session_cache"] = session_handles.stats()
+        return stats
+
 
 class CaskdServer:
     def __init__(self, host: str = "127.0.0.1", port: int = 0, *, state_file: Optional[Path] = None):
@@ -782,6 +763,7 @@ class CaskdServer:
                     quiet=bool(msg.get("quiet") or False),
                     message=str(msg.get("message") or ""),
                     output_path=str(msg.get("output_path")) if msg.get("output_path") else None,
+                    priority=normalize_priority(msg.get("priority")),
                 )
             except Exception as exc:
                 return {"type": "cask.response", "v": 1, "id": msg.get("id"), "exit_code": 1, "reply": f"Bad request: {exc}"}
@@ -802,6 +784,7 @@ class CaskdServer:
                 "reply": result.reply,
                 "meta": {
                     "session_key": result.session_key,
+                    "priority": req.priority,
                     "log_path": result.log_path,
                     "anchor_seen": result.anchor_seen,
                     "done_seen": result.done_seen,
@@ -818,11 +801,16 @@ class CaskdServer:
             token=self.token,
             state_file=self.state_file,
             request_handler=_handle_request,
+            stats_handler=self.pool.stats,
             request_queue_size=128,
-            on_stop=self._cleanup_state_file,
+            on_stop=self._on_stop,
         )
         return server.serve_forever()
 
+    def _on_stop(self) -> None:
+        pane_tap.close_all()
+        self._cleanup_state_file()
+
     def _cleanup_state_file(self) -> None:
         try:
             st = read_state(self.state_file)
@@ -854,3 +842,8 @@ def ping_daemon(timeout_s: float = 0.5, state_file: Optional[Path] = None) -> bo
 def shutdown_daemon(timeout_s: float = 1.0, state_file: Optional[Path] = None) -> bool:
     state_file = state_file or state_file_path(CASKD_SPEC.state_file_name)
     return askd_rpc.shutdown_daemon("cask", timeout_s, state_file)
+
+
+def request_stats(timeout_s: float = 0.5, state_file: Optional[Path] = None) -> Optional[dict]:
+    state_file = state_file or state_file_path(CASKD_SPEC.state_file_name)
+    return askd_rpc.request_stats("cask", timeout_s, state_file)
@@ -9,6 +9,7 @@ from typing import Optional, Tuple
 
 from ccb_config import apply_backend_env
 from project_id import compute_ccb_project_id
+from session_cache import SessionHandleCache
 from session_utils import find_project_session_file as _find_project_session_file, safe_write_session
 from terminal import get_backend_for_session
 
@@ -175,3 +176,7 @@ def compute_session_key(session: CodexProjectSession) -> str:
         except Exception:
             pid = ""
     return f"codex:{pid}" if pid else "codex:unknown"
+
+
+# Shared by the daemon's submit path, session workers and monitor (see session_cache.SessionHandleCache).
+session_handles: SessionHandleCache[CodexProjectSession] = SessionHandleCache(load_project_session, compute_session_key, locate=find_project_session_file)
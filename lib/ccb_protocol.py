@@ -3,11 +3,18 @@ from __future__ import annotations
 import re
 import secrets
 from dataclasses import dataclass
+from functools import lru_cache
 
 
 REQ_ID_PREFIX = "CCB_REQ_ID:"
 DONE_PREFIX = "CCB_DONE:"
 
+# Request priority classes (lower rank is served first by the per-session worker queue).
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_NORMAL = "normal"
+PRIORITY_BULK = "bulk"
+PRIORITY_RANKS = {PRIORITY_INTERACTIVE: 0, PRIORITY_NORMAL: 1, PRIORITY_BULK: 2}
+
 DONE_LINE_RE_TEMPLATE = r"^\s*CCB_DONE:\s*{req_id}\s*$"
 
 _TRAILING_DONE_TAG_RE = re.compile(
@@ -40,6 +47,12 @@ def strip_trailing_markers(text: str) -> str:
     return "\n".join(lines).rstrip()
 
 
+def normalize_priority(value: object) -> str:
+    """Map a client-supplied priority to a known class; unknown/missing values fall back to `normal`."""
+    raw = str(value or "").strip().lower()
+    return raw if raw in PRIORITY_RANKS else PRIORITY_NORMAL
+
+
 def make_req_id() -> str:
     # 128-bit token is enough; hex string is log/grep friendly.
     return secrets.token_hex(16)
@@ -57,6 +70,7 @@ def wrap_codex_prompt(message: str, req_id: str) -> str:
     )
 
 
+@lru_cache(maxsize=256)
 def done_line_re(req_id: str) -> re.Pattern[str]:
     return re.compile(DONE_LINE_RE_TEMPLATE.format(req_id=re.escape(req_id)))
 
@@ -87,6 +101,73 @@ def strip_done_text(text: str, req_id: str) -> str:
     return "\n".join(lines).rstrip()
 
 
+# Characters after which `str.splitlines` starts a new line ("\r" is special-cased below).
+_LINE_BREAKS = frozenset("\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029")
+
+
+class DoneDetector:
+    """
+    Incremental `is_done_text` / `strip_done_text` over a reply that arrives in chunks.
+
+    Equivalent to calling both on `"\n".join(chunks)` after every chunk, but each chunk is split
+    into lines once and only its own lines are scanned, so a long streamed reply costs O(n)
+    instead of O(n^2).
+    """
+
+    def __init__(self, req_id: str):
+        self.req_id = req_id
+        self._done_re = done_line_re(req_id)
+        self._lines: list[str] = []
+        # Index of the last non-noise line and of the non-noise line before it (-1 when absent).
+        self._last = -1
+        self._prev = -1
+        # The joining "\n" after the previous chunk opens an empty line of its own.
+        self._open_line = False
+        self.done = False
+
+    def reset(self) -> None:
+        self._lines = []
+        self._last = self._prev = -1
+        self._open_line = False
+        self.done = False
+
+    def feed(self, chunk: str) -> bool:
+        """Append one chunk (as if joined with "\n" to the previous ones); returns `done`."""
+        chunk = chunk or ""
+        if self._open_line:
+            self._lines.append("")
+        start = len(self._lines)
+        self._lines.extend(chunk.splitlines())
+        self._open_line = chunk == "" or (chunk[-1] in _LINE_BREAKS and chunk[-1] != "\r")
+
+        found: list[int] = []
+        for i in range(len(self._lines) - 1, start - 1, -1):
+            if not _is_trailing_noise_line(self._lines[i]):
+                found.append(i)
+                if len(found) == 2:
+                    break
+        if found:
+            if len(found) == 1:
+                self._prev = self._last
+                self._last = found[0]
+            else:
+                self._last, self._prev = found
+            self.done = bool(self._done_re.match(self._lines[self._last]))
+        return self.done
+
+    def replace(self, text: str) -> bool:
+        """Start over with `text` as the whole reply (for readers that return snapshots)."""
+        self.reset()
+        return self.feed(text)
+
+    def reply(self) -> str:
+        """The reply with trailing noise and our done line removed (`strip_done_text`)."""
+        end = self._prev if self.done else self._last
+        if end < 0:
+            return ""
+        return "\n".join(self._lines[: end + 1]).rstrip()
+
+
 @dataclass(frozen=True)
 class CaskdRequest:
     client_id: str
@@ -95,6 +176,7 @@ class CaskdRequest:
     quiet: bool
     message: str
     output_path: str | None = None
+    priority: str = PRIORITY_NORMAL
 
 
 @dataclass(frozen=True)
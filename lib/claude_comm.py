@@ -14,9 +14,15 @@ import time
 from pathlib import Path
 from typing import Any, Dict, Optional, Tuple
 
+from askd_reactor import wait_for_change_or_sleep, watch_baseline
 from ccb_config import apply_backend_env
+from jsonl_tail import decode_json_line, read_jsonl_window
+from log_map import LogMap
+from turn_index import TurnIndex, get_turn_index
+from claude_sessions_index import latest_indexed_session
 from ccb_protocol import is_done_text, make_req_id, strip_done_text
 from laskd_protocol import wrap_claude_prompt
+from log_scan import newest, scan_dirs
 from claude_session_resolver import resolve_claude_session
 from pane_registry import upsert_registry
 from project_id import compute_ccb_project_id
@@ -130,6 +136,12 @@ def _extract_content_text(content: Any) -> Optional[str]:
     return "\n".join(texts).strip()
 
 
+# Roles are matched case-insensitively below, so the prefilters carry the capitalized spelling
+# too. `"user"` (quoted) does not match the `userType` key present on every Claude line.
+_ASSISTANT_MARKERS = (b"assistant", b"Assistant")
+_EVENT_MARKERS = (b'"user"', b'"User"', b"assistant", b"Assistant")
+
+
 def _extract_message(entry: dict, role: str) -> Optional[str]:
     if not isinstance(entry, dict):
         return None
@@ -170,6 +182,20 @@ def _extract_message(entry: dict, role: str) -> Optional[str]:
     return _extract_content_text(entry.get("content"))
 
 
+def _extract_event(entry: Any) -> Optional[tuple[str, str]]:
+    user_msg = _extract_message(entry, "user")
+    if user_msg:
+        return "user", user_msg
+    assistant_msg = _extract_message(entry, "assistant")
+    if assistant_msg:
+        return "assistant", assistant_msg
+    return None
+
+
+def claude_turn_index(session_path: Path) -> TurnIndex:
+    return get_turn_index("claude", session_path, _extract_event, markers=_EVENT_MARKERS)
+
+
 class ClaudeLogReader:
     """Reads Claude session logs from ~/.claude/projects/<key>"""
 
@@ -193,6 +219,10 @@ class ClaudeLogReader:
             return candidates[-1]
         return self.root / _project_key_for_path(self.work_dir)
 
+    def session_dirs(self) -> list[Path]:
+        """Directories a new session log for this work_dir can appear in."""
+        return [self._project_dir()]
+
     def _session_is_sidechain(self, session_path: Path) -> Optional[bool]:
         try:
             with session_path.open("r", encoding="utf-8", errors="replace") as handle:
@@ -200,13 +230,7 @@ class ClaudeLogReader:
                     line = handle.readline()
                     if not line:
                         break
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        entry = json.loads(line)
-                    except Exception:
-                        continue
+                    entry = decode_json_line(line, (b"isSidechain",))
                     if isinstance(entry, dict) and "isSidechain" in entry:
                         return bool(entry.get("isSidechain"))
         except OSError:
@@ -220,71 +244,18 @@ class ClaudeLogReader:
         index_path = project_dir / "sessions-index.json"
         if not index_path.exists():
             return None
-        try:
-            payload = json.loads(index_path.read_text(encoding="utf-8", errors="replace"))
-        except Exception:
-            return None
-        entries = payload.get("entries") if isinstance(payload, dict) else None
-        if not isinstance(entries, list):
-            return None
-        candidates = set(_candidate_project_paths(self.work_dir))
-        best_path: Optional[Path] = None
-        best_mtime = -1
-        for entry in entries:
-            if not isinstance(entry, dict):
-                continue
-            if entry.get("isSidechain") is True:
-                continue
-            project_path = entry.get("projectPath")
-            if isinstance(project_path, str) and project_path.strip():
-                normalized = _normalize_project_path(project_path)
-                if candidates and normalized and normalized not in candidates:
-                    continue
-            elif candidates:
-                continue
-            full_path = entry.get("fullPath")
-            if not isinstance(full_path, str) or not full_path.strip():
-                continue
-            try:
-                session_path = Path(full_path).expanduser()
-            except Exception:
-                continue
-            if not session_path.is_absolute():
-                session_path = (project_dir / session_path).expanduser()
-            if not session_path.exists():
-                continue
-            mtime_raw = entry.get("fileMtime")
-            mtime = None
-            if isinstance(mtime_raw, (int, float)):
-                mtime = int(mtime_raw)
-            elif isinstance(mtime_raw, str) and mtime_raw.strip().isdigit():
-                try:
-                    mtime = int(mtime_raw.strip())
-                except Exception:
-                    mtime = None
-            if mtime is None:
-                try:
-                    mtime = int(session_path.stat().st_mtime * 1000)
-                except OSError:
-                    mtime = None
-            if mtime is None:
-                continue
-            if mtime > best_mtime:
-                best_mtime = mtime
-                best_path = session_path
-        return best_path
+        return latest_indexed_session(index_path, _candidate_project_paths(self.work_dir), _normalize_project_path)
 
     def _scan_latest_session_any_project(self) -> Optional[Path]:
         if not self.root.exists():
             return None
         try:
-            sessions = sorted(
-                (p for p in self.root.glob("*/*.jsonl") if p.is_file() and not p.name.startswith(".")),
-                key=lambda p: p.stat().st_mtime,
-            )
+            with os.scandir(self.root) as it:
+                project_dirs = [e.path for e in it if e.is_dir()]
         except OSError:
             return None
-        return sessions[-1] if sessions else None
+        latest = newest(scan_dirs(project_dirs, lambda name: name.endswith(".jsonl")), 1)
+        return Path(latest[0].path) if latest else None
 
     def _scan_latest_session(self) -> Optional[Path]:
         project_dir = self._project_dir()
@@ -358,6 +329,15 @@ class ClaudeLogReader:
     def current_session_path(self) -> Optional[Path]:
         return self._latest_session()
 
+    def watch_paths(self, state: Dict[str, Any]) -> list[Path]:
+        """Session log plus project dir (new sessions / index rewrites) for the daemon reactor."""
+        paths: list[Path] = []
+        session = state.get("session_path")
+        if isinstance(session, Path):
+            paths.append(session)
+        paths.append(self._project_dir())
+        return paths
+
     def capture_state(self) -> Dict[str, Any]:
         session = self._latest_session()
         offset = 0
@@ -368,6 +348,24 @@ class ClaudeLogReader:
                 offset = 0
         return {"session_path": session, "offset": offset, "carry": b""}
 
+    def resume_state(self, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Rebase a cursor left by a previous request to the current end of its session file, without rediscovery.
+
+        Returns None on evidence of rotation (file missing or shrunk); callers then capture afresh.
+        """
+        session = state.get("session_path")
+        offset = state.get("offset")
+        if not isinstance(session, Path) or not isinstance(offset, int) or offset < 0:
+            return None
+        try:
+            size = session.stat().st_size
+        except OSError:
+            return None
+        if size < offset:
+            return None
+        return {"session_path": session, "offset": size, "carry": b""}
+
     def wait_for_message(self, state: Dict[str, Any], timeout: float) -> Tuple[Optional[str], Dict[str, Any]]:
         return self._read_since(state, timeout=timeout, block=True)
 
@@ -384,62 +382,42 @@ class ClaudeLogReader:
         session = self._latest_session()
         if not session or not session.exists():
             return None
-        last: Optional[str] = None
-        try:
-            with session.open("r", encoding="utf-8", errors="replace") as handle:
-                for line in handle:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        entry = json.loads(line)
-                    except Exception:
-                        continue
-                    msg = _extract_message(entry, "assistant")
-                    if msg:
-                        last = msg
-        except OSError:
+        log = LogMap.open(session)
+        if log is None:
             return None
-        return last
+        with log:
+            # Newest first: the first assistant line from the end is the answer.
+            for start, end in log.lines_reverse():
+                msg = _extract_message(log.decode(start, end, _ASSISTANT_MARKERS), "assistant")
+                if msg:
+                    return msg
+        return None
 
-    def latest_conversations(self, n: int) -> list[tuple[str, str]]:
+    def latest_conversations(self, n: int = 1, *, skip: int = 0) -> list[tuple[str, str]]:
         session = self._latest_session()
         if not session or not session.exists():
             return []
-        pairs: list[tuple[str, str]] = []
-        last_user: str | None = None
-        try:
-            with session.open("r", encoding="utf-8", errors="replace") as handle:
-                for line in handle:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        entry = json.loads(line)
-                    except Exception:
-                        continue
-                    user_msg = _extract_message(entry, "user")
-                    if user_msg:
-                        last_user = user_msg
-                        continue
-                    assistant_msg = _extract_message(entry, "assistant")
-                    if assistant_msg:
-                        pairs.append((last_user or "", assistant_msg))
-                        last_user = None
-        except OSError:
-            return []
-        return pairs[-max(1, int(n)) :]
+        return claude_turn_index(session).latest(n, skip=skip)
+
+    def conversation_for_req(self, req_id: str) -> Optional[tuple[str, str]]:
+        session = self._latest_session()
+        if not session or not session.exists():
+            return None
+        index = claude_turn_index(session)
+        turn = index.turn_for_req(req_id)
+        return index.conversation(turn) if turn else None
 
     def _read_since(self, state: Dict[str, Any], timeout: float, block: bool) -> Tuple[Optional[str], Dict[str, Any]]:
         deadline = time.time() + max(0.0, float(timeout)) if block else time.time()
         current_state = dict(state or {})
 
         while True:
+            baseline = watch_baseline(self.watch_paths(current_state))
             session = self._latest_session()
             if session is None or not session.exists():
                 if not block or time.time() >= deadline:
                     return None, current_state
-                time.sleep(self._poll_interval)
+                wait_for_change_or_sleep(baseline, self._poll_interval, deadline)
                 continue
 
             if current_state.get("session_path") != session:
@@ -453,7 +431,7 @@ class ClaudeLogReader:
 
             if not block or time.time() >= deadline:
                 return None, current_state
-            time.sleep(self._poll_interval)
+            wait_for_change_or_sleep(baseline, self._poll_interval, deadline)
 
     def _read_new_messages(self, session: Path, state: Dict[str, Any]) -> Tuple[Optional[str], Dict[str, Any]]:
         offset = int(state.get("offset") or 0)
@@ -467,35 +445,23 @@ class ClaudeLogReader:
             offset = 0
             carry = b""
 
-        try:
-            with session.open("rb") as handle:
-                handle.seek(offset)
-                data = handle.read()
-        except OSError:
-            return None, state
-
-        new_offset = offset + len(data)
-        buf = carry + data
-        lines = buf.split(b"\n")
-        if buf and not buf.endswith(b"\n"):
-            carry = lines.pop()
-        else:
-            carry = b""
-
         latest: Optional[str] = None
-        for raw in lines:
-            line = raw.strip()
-            if not line:
-                continue
-            try:
-                entry = json.loads(line.decode("utf-8", errors="replace"))
-            except Exception:
-                continue
+
+        def _on_entry(entry: Any) -> None:
+            nonlocal latest
             msg = _extract_message(entry, "assistant")
             if msg:
                 latest = msg
 
-        new_state = {"session_path": session, "offset": new_offset, "carry": carry}
+        try:
+            # Only the newest reply matters: drain every pending window, one bounded chunk at a time.
+            more = True
+            while more:
+                offset, carry, more = read_jsonl_window(session, offset, carry, _on_entry, markers=_ASSISTANT_MARKERS)
+        except OSError:
+            return None, state
+
+        new_state = {"session_path": session, "offset": offset, "carry": carry}
         return latest, new_state
 
     def _read_since_events(self, state: Dict[str, Any], timeout: float, block: bool) -> Tuple[list[tuple[str, str]], Dict[str, Any]]:
@@ -503,11 +469,12 @@ class ClaudeLogReader:
         current_state = dict(state or {})
 
         while True:
+            baseline = watch_baseline(self.watch_paths(current_state))
             session = self._latest_session()
             if session is None or not session.exists():
                 if not block or time.time() >= deadline:
                     return [], current_state
-                time.sleep(self._poll_interval)
+                wait_for_change_or_sleep(baseline, self._poll_interval, deadline)
                 continue
 
             if current_state.get("session_path") != session:
@@ -521,7 +488,7 @@ class ClaudeLogReader:
 
             if not block or time.time() >= deadline:
                 return [], current_state
-            time.sleep(self._poll_interval)
+            wait_for_change_or_sleep(baseline, self._poll_interval, deadline)
 
     def _read_new_events(self, session: Path, state: Dict[str, Any]) -> Tuple[list[tuple[str, str]], Dict[str, Any]]:
         offset = int(state.get("offset") or 0)
@@ -535,39 +502,23 @@ class ClaudeLogReader:
             offset = 0
             carry = b""
 
+        events: list[tuple[str, str]] = []
+
+        def _on_entry(entry: Any) -> None:
+            event = _extract_event(entry)
+            if event:
+                events.append(event)
+
         try:
-            with session.open("rb") as handle:
-                handle.seek(offset)
-                data = handle.read()
+            # Hand back each window's events as soon as there are some; the next call resumes at `offset`.
+            while True:
+                offset, carry, more = read_jsonl_window(session, offset, carry, _on_entry, markers=_EVENT_MARKERS)
+                if events or not more:
+                    break
         except OSError:
             return [], state
 
-        new_offset = offset + len(data)
-        buf = carry + data
-        lines = buf.split(b"\n")
-        if buf and not buf.endswith(b"\n"):
-            carry = lines.pop()
-        else:
-            carry = b""
-
-        events: list[tuple[str, str]] = []
-        for raw in lines:
-            line = raw.strip()
-            if not line:
-                continue
-            try:
-                entry = json.loads(line.decode("utf-8", errors="replace"))
-            except Exception:
-                continue
-            user_msg = _extract_message(entry, "user")
-            if user_msg:
-                events.append(("user", user_msg))
-                continue
-            assistant_msg = _extract_message(entry, "assistant")
-            if assistant_msg:
-                events.append(("assistant", assistant_msg))
-
-        new_state = {"session_path": session, "offset": new_offset, "carry": carry}
+        new_state = {"session_path": session, "offset": offset, "carry": carry}
         return events, new_state
 
 
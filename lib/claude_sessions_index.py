@@ -0,0 +1,173 @@
+"""
+Process-wide cache of parsed Claude `sessions-index.json` files.
+
+The laskd monitor loop, `lpend` and every `lask` request ask the same question ("newest
+non-sidechain session for this work_dir") of an index that can hold thousands of entries. The
+parsed form is kept per (path, mtime_ns, size): entries are bucketed by normalized `projectPath`
+and pre-sorted newest first, so a lookup is a few dict hits plus one `exists()` on the winner.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+_NO_PROJECT = ""
+_MAX_CACHED = 32
+
+
+@dataclass(frozen=True)
+class IndexedSession:
+    path: Path
+    # `fileMtime` from the index (ms); None when missing and the log must be stat'ed at lookup.
+    mtime_ms: Optional[int]
+
+
+@dataclass(frozen=True)
+class _Bucket:
+    # Entries with `fileMtime`, newest first, and the ones without it (stat'ed at lookup).
+    dated: tuple[IndexedSession, ...]
+    undated: tuple[IndexedSession, ...]
+
+
+@dataclass(frozen=True)
+class ParsedSessionsIndex:
+    buckets: dict[str, _Bucket]
+
+    def select(self, project_paths: Iterable[str]) -> list[_Bucket]:
+        wanted = list(project_paths)
+        if not wanted:
+            return list(self.buckets.values())
+        return [self.buckets[key] for key in dict.fromkeys(wanted) if key in self.buckets]
+
+
+_cache: "OrderedDict[str, tuple[tuple[int, int], ParsedSessionsIndex]]" = OrderedDict()
+_lock = threading.Lock()
+_counters = {"hits": 0, "parses": 0}
+
+
+def _parse_mtime(raw: object) -> Optional[int]:
+    if isinstance(raw, bool):
+        return None
+    if isinstance(raw, (int, float)):
+        return int(raw)
+    if isinstance(raw, str) and raw.strip().isdigit():
+        return int(raw.strip())
+    return None
+
+
+def _mtime(s: IndexedSession) -> int:
+    return s.mtime_ms if s.mtime_ms is not None else -1
+
+
+def _parse(index_path: Path, normalize: Callable[[str], str]) -> Optional[ParsedSessionsIndex]:
+    try:
+        payload = json.loads(index_path.read_text(encoding="utf-8", errors="replace"))
+    except Exception:
+        return None
+    entries = payload.get("entries") if isinstance(payload, dict) else None
+    if not isinstance(entries, list):
+        return None
+
+    project_dir = index_path.parent
+    normalized_cache: dict[str, str] = {}
+    buckets: dict[str, list[IndexedSession]] = {}
+    for entry in entries:
+        if not isinstance(entry, dict) or entry.get("isSidechain") is True:
+            continue
+        full_path = entry.get("fullPath")
+        if not isinstance(full_path, str) or not full_path.strip():
+            continue
+        try:
+            session_path = Path(full_path).expanduser()
+        except Exception:
+            continue
+        if not session_path.is_absolute():
+            session_path = (project_dir / session_path).expanduser()
+        project_path = entry.get("projectPath")
+        if isinstance(project_path, str) and project_path.strip():
+            # Normalizing resolves symlinks; many entries share a projectPath, so do it once per value.
+            key = normalized_cache.get(project_path)
+            if key is None:
+                key = normalize(project_path)
+                normalized_cache[project_path] = key
+        else:
+            key = _NO_PROJECT
+        buckets.setdefault(key, []).append(IndexedSession(session_path, _parse_mtime(entry.get("fileMtime"))))
+
+    return ParsedSessionsIndex(
+        {
+            k: _Bucket(
+                dated=tuple(sorted((s for s in v if s.mtime_ms is not None), key=_mtime, reverse=True)),
+                undated=tuple(s for s in v if s.mtime_ms is None),
+            )
+            for k, v in buckets.items()
+        }
+    )
+
+
+def load_sessions_index(index_path: Path, normalize: Callable[[str], str]) -> Optional[ParsedSessionsIndex]:
+    """Parsed index, reused while the file's (mtime_ns, size) is unchanged. `normalize` must be stable."""
+    try:
+        st = os.stat(index_path)
+    except OSError:
+        return None
+    sig = (int(st.st_mtime_ns), int(st.st_size))
+    key = str(index_path)
+    with _lock:
+        cached = _cache.get(key)
+        if cached is not None and cached[0] == sig:
+            _cache.move_to_end(key)
+            _counters["hits"] += 1
+            return cached[1]
+    parsed = _parse(Path(index_path), normalize)
+    if parsed is None:
+        return None
+    with _lock:
+        _cache[key] = (sig, parsed)
+        _cache.move_to_end(key)
+        while len(_cache) > _MAX_CACHED:
+            _cache.popitem(last=False)
+        _counters["parses"] += 1
+    return parsed
+
+
+def latest_indexed_session(
+    index_path: Path, project_paths: Iterable[str], normalize: Callable[[str], str]
+) -> Optional[Path]:
+    """
+    Newest existing, non-sidechain session for any of `project_paths` (already normalized).
+
+    Entries carry `fileMtime`, so candidates are tried newest first and only the winner is stat'ed;
+    entries without it are stat'ed for their mtime, as before.
+    """
+    parsed = load_sessions_index(index_path, normalize)
+    if parsed is None:
+        return None
+    buckets = parsed.select(project_paths)
+    best_path: Optional[Path] = None
+    best_mtime = -1
+    for session in heapq.merge(*(b.dated for b in buckets), key=_mtime, reverse=True):
+        if session.path.exists():
+            best_mtime, best_path = _mtime(session), session.path
+            break
+    for bucket in buckets:
+        for session in bucket.undated:
+            try:
+                mtime = int(session.path.stat().st_mtime * 1000)
+            except OSError:
+                continue
+            if mtime > best_mtime:
+                best_mtime, best_path = mtime, session.path
+    return best_path
+
+
+def cache_stats() -> dict:
+    with _lock:
+        return {"entries": len(_cache), **_counters}
@@ -11,9 +11,10 @@ import re
 import sys
 import time
 import shlex
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Tuple, Dict, Any, List
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from terminal import get_backend_for_session, get_pane_id_from_session
 from ccb_config import apply_backend_env
@@ -21,6 +22,12 @@ from i18n import t
 from pane_registry import upsert_registry, registry_path_for_session, load_registry_by_session_id
 from session_utils import find_project_session_file
 from project_id import compute_ccb_project_id
+from log_scan import IrregularLayout, iter_date_partitions, scan_dirs
+from session_log_index import LogEntry, SessionLogIndex, get_log_index
+from askd_reactor import wait_for_change_or_sleep, watch_baseline
+from jsonl_tail import decode_json_line
+from log_map import LogMap
+from turn_index import TurnIndex, get_turn_index
 
 apply_backend_env()
 
@@ -29,6 +36,26 @@ SESSION_ID_PATTERN = re.compile(
     r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}",
     re.IGNORECASE,
 )
+# Every line `_extract_message` / `_extract_user_message` can act on contains one of these
+# (payload type "message"/"*_message" or role "assistant"); everything else is skipped undecoded.
+_REPLY_MARKERS = (b"message", b"assistant")
+# Bulky payloads (tool output, encrypted reasoning) say what they are in their first bytes.
+_NOISE_HEADS = tuple(
+    b'"payload":{"type":"%s"' % kind
+    for kind in (
+        b"reasoning",
+        b"function_call",
+        b"function_call_output",
+        b"custom_tool_call",
+        b"custom_tool_call_output",
+        b"local_shell_call",
+        b"web_search_call",
+        b"token_count",
+        b"exec_command_begin",
+        b"exec_command_end",
+        b"exec_command_output_delta",
+    )
+)
 
 
 def _env_float(name: str, default: float) -> float:
@@ -42,6 +69,96 @@ def _env_float(name: str, default: float) -> float:
     return value
 
 
+def _classify_event(entry: Any) -> Optional[Tuple[str, str]]:
+    return CodexLogReader._extract_event(entry) if isinstance(entry, dict) else None
+
+
+def codex_turn_index(log_path: Path) -> TurnIndex:
+    return get_turn_index("codex", log_path, _classify_event, markers=_REPLY_MARKERS, reject=_NOISE_HEADS)
+
+
+def codex_anchor_dirs(log_path: Optional[Path], *, root: Path = SESSION_ROOT) -> List[Path]:
+    """Directories the log receiving the next prompt can live in: the bound log's and today's partitions."""
+    dirs: List[Path] = []
+    if log_path:
+        dirs.append(Path(log_path).expanduser().parent)
+    for now in (datetime.now(), datetime.now(timezone.utc)):
+        dirs.append(Path(root).expanduser() / f"{now:%Y}" / f"{now:%m}" / f"{now:%d}")
+    return dirs
+
+
+def read_codex_session_meta(log_path: Path) -> Tuple[Optional[str], Optional[str], Optional[bool]]:
+    """
+    Best-effort read of session_meta for (cwd, session_id, None).
+
+    Codex logs usually have session_meta on the first line, but we scan a few lines to be robust.
+    """
+    try:
+        with log_path.open("r", encoding="utf-8", errors="ignore") as handle:
+            for _ in range(30):
+                line = handle.readline()
+                if not line:
+                    break
+                entry = decode_json_line(line, (b"session_meta",))
+                if not isinstance(entry, dict) or entry.get("type") != "session_meta":
+                    continue
+                payload = entry.get("payload") if isinstance(entry.get("payload"), dict) else {}
+                cwd = payload.get("cwd")
+                sid = payload.get("id")
+                cwd_str = str(cwd).strip() if isinstance(cwd, str) else None
+                sid_str = str(sid).strip() if isinstance(sid, str) else None
+                return cwd_str or None, sid_str or None, None
+    except OSError:
+        return None, None, None
+    return None, None, None
+
+
+def codex_log_index(root: Path = SESSION_ROOT) -> SessionLogIndex:
+    return get_log_index("codex", root, read_codex_session_meta, include_hidden=True)
+
+
+def latest_codex_log(
+    match: Callable[[LogEntry], bool], *, root: Path = SESSION_ROOT, limit: Optional[int] = None
+) -> Optional[LogEntry]:
+    """
+    Newest log accepted by `match`, walking the YYYY/MM/DD partitions newest-first.
+
+    Once a match is found, older partitions are only visited within
+    CODEX_PARTITION_LOOKBACK_DAYS (default 1) of its mtime: a log in an older partition can only
+    be newer if its session kept running across midnight. `limit` caps how many logs are looked
+    at. Trees that are not date-partitioned fall back to the full discovery index.
+    """
+    root = Path(root).expanduser()
+    index = codex_log_index(root)
+    lookback_days = max(0, int(_env_float("CODEX_PARTITION_LOOKBACK_DAYS", 1)))
+    budget = None if limit is None else max(0, int(limit))
+    best: Optional[LogEntry] = None
+    try:
+        for day, day_path in iter_date_partitions(str(root), lambda name: name.endswith(".jsonl")):
+            if best is not None and (datetime.fromtimestamp(best.mtime).date() - day).days > lookback_days:
+                break
+            if budget is not None and budget <= 0:
+                break
+            files = scan_dirs([day_path], lambda name: name.endswith(".jsonl"), include_hidden=True)
+            if budget is not None:
+                files = sorted(files, key=lambda f: f.mtime_ns, reverse=True)[:budget]
+                budget -= len(files)
+            for entry in index.lookup(files):
+                if (best is None or entry.mtime_ns > best.mtime_ns) and match(entry):
+                    best = entry
+    except IrregularLayout:
+        return index.latest(match, limit=limit)
+    return best
+
+
+@lru_cache(maxsize=4096)
+def _normalize_cwd(cwd: str) -> Optional[str]:
+    try:
+        return str(Path(cwd).resolve()).lower()
+    except Exception:
+        return None
+
+
 class CodexLogReader:
     """Reads Codex official logs from ~/.codex/sessions"""
 
@@ -81,50 +198,6 @@ class CodexLogReader:
         except ValueError:
             return default
 
-    def _iter_lines_reverse(self, log_path: Path, *, max_bytes: int, max_lines: int) -> List[str]:
-        """
-        Read lines from the end of a file (reverse order), bounded by max_bytes/max_lines.
-        Returns a list in reverse chronological order (last line first).
-        """
-        if max_bytes <= 0 or max_lines <= 0:
-            return []
-
-        try:
-            with log_path.open("rb") as handle:
-                handle.seek(0, os.SEEK_END)
-                position = handle.tell()
-                bytes_read = 0
-                lines: List[str] = []
-                buffer = b""
-
-                while position > 0 and bytes_read < max_bytes and len(lines) < max_lines:
-                    remaining = max_bytes - bytes_read
-                    read_size = min(8192, position, remaining)
-                    position -= read_size
-                    handle.seek(position, os.SEEK_SET)
-                    chunk = handle.read(read_size)
-                    bytes_read += len(chunk)
-                    buffer = chunk + buffer
-
-                    parts = buffer.split(b"\n")
-                    buffer = parts[0]
-                    for part in reversed(parts[1:]):
-                        if len(lines) >= max_lines:
-                            break
-                        text = part.decode("utf-8", errors="ignore").strip()
-                        if text:
-                            lines.append(text)
-
-                if position == 0 and buffer and len(lines) < max_lines:
-                    text = buffer.decode("utf-8", errors="ignore").strip()
-                    if text:
-                        lines.append(text)
-
-                return lines
-        except OSError as exc:
-            self._debug(f"Failed reading log tail: {log_path} ({exc})")
-            return []
-
     def set_preferred_log(self, log_path: Optional[Path]) -> None:
         self._preferred_log = self._normalize_path(log_path)
 
@@ -137,22 +210,6 @@ class CodexLogReader:
         except Exception:
             return None
 
-    def _extract_cwd_from_log(self, log_path: Path) -> Optional[str]:
-        """Extract cwd from session_meta in the first line of log file"""
-        try:
-            with log_path.open("r", encoding="utf-8") as f:
-                first_line = f.readline()
-            if not first_line:
-                return None
-            entry = json.loads(first_line)
-            if entry.get("type") == "session_meta":
-                cwd = entry.get("payload", {}).get("cwd")
-                if cwd:
-                    return str(Path(cwd).resolve()).lower()
-        except Exception:
-            pass
-        return None
-
     def _normalize_path(self, value: Optional[Any]) -> Optional[Path]:
         if value in (None, ""):
             return None
@@ -166,32 +223,18 @@ class CodexLogReader:
     def _scan_latest(self) -> Optional[Path]:
         if not self.root.exists():
             return None
-        try:
-            # Avoid sorting the full list (can be slow on large histories / slow filesystems).
-            latest: Optional[Path] = None
-            latest_mtime = -1.0
-            for p in (p for p in self.root.glob("**/*.jsonl") if p.is_file()):
-                if self._session_id_filter:
-                    try:
-                        if str(self._session_id_filter).lower() not in str(p).lower():
-                            continue
-                    except Exception:
-                        pass
-                if self._work_dir:
-                    cwd = self._extract_cwd_from_log(p)
-                    if not cwd or cwd != self._work_dir:
-                        continue
-                try:
-                    mtime = p.stat().st_mtime
-                except OSError:
-                    continue
-                if mtime >= latest_mtime:
-                    latest = p
-                    latest_mtime = mtime
-        except OSError:
-            return None
+        sid_filter = str(self._session_id_filter or "").lower()
 
-        return latest
+        def _match(entry) -> bool:
+            if sid_filter and sid_filter not in entry.path.lower():
+                return False
+            if self._work_dir:
+                return bool(entry.cwd) and _normalize_cwd(entry.cwd) == self._work_dir
+            return True
+
+        # Newest partitions first, headers from the shared discovery index.
+        entry = latest_codex_log(_match, root=self.root)
+        return Path(entry.path) if entry else None
 
     def _latest_log(self) -> Optional[Path]:
         preferred = self._preferred_log
@@ -229,6 +272,24 @@ class CodexLogReader:
     def current_log_path(self) -> Optional[Path]:
         return self._latest_log()
 
+    def watch_paths(self, state: Dict[str, Any]) -> List[Path]:
+        """Files whose changes can produce new events for `state` (used by the daemon reactor)."""
+        log_path = self._normalize_path(state.get("log_path")) or self._preferred_log
+        return [log_path] if log_path else []
+
+    def follow_latest(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Rescan for a newer log (session rotation) and rebind `state` to it from offset 0.
+
+        Non-blocking reads never rescan; callers driving their own wait loop invoke this on timer ticks.
+        """
+        current = self._normalize_path(state.get("log_path"))
+        latest = self._scan_latest()
+        if latest and latest != current:
+            self._preferred_log = latest
+            return {"log_path": latest, "offset": 0}
+        return state
+
     def capture_state(self) -> Dict[str, Any]:
         """Capture current log path and offset"""
         log = self._latest_log()
@@ -245,6 +306,25 @@ class CodexLogReader:
                     offset = -1
         return {"log_path": log, "offset": offset}
 
+    def resume_state(self, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Rebase a cursor left by a previous request to the current end of its log, without rescanning.
+
+        Returns None on evidence of rotation (log missing or shrunk); callers then capture afresh.
+        """
+        log_path = self._normalize_path(state.get("log_path"))
+        offset = state.get("offset")
+        if not log_path or not isinstance(offset, int) or offset < 0:
+            return None
+        try:
+            size = log_path.stat().st_size
+        except OSError:
+            return None
+        if size < offset:
+            return None
+        self._preferred_log = log_path
+        return {"log_path": log_path, "offset": size}
+
     def wait_for_message(self, state: Dict[str, Any], timeout: float) -> Tuple[Optional[str], Dict[str, Any]]:
         """Block and wait for new reply"""
         return self._read_since(state, timeout, block=True)
@@ -274,20 +354,21 @@ class CodexLogReader:
             return None
         tail_bytes = self._env_int("CODEX_LOG_TAIL_BYTES", 1024 * 1024 * 8)
         tail_lines = self._env_int("CODEX_LOG_TAIL_LINES", 5000)
-        lines = self._iter_lines_reverse(log_path, max_bytes=tail_bytes, max_lines=tail_lines)
-        if not lines:
+        if tail_bytes <= 0 or tail_lines <= 0:
             return None
-
-        for line in lines:
-            if not line.startswith("{"):
-                continue
-            try:
-                entry = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-            message = self._extract_message(entry)
-            if message:
-                return message
+        log = LogMap.open(log_path)
+        if log is None:
+            return None
+        with log:
+            for count, (start, end) in enumerate(log.lines_reverse(max_bytes=tail_bytes)):
+                if count >= tail_lines:
+                    break
+                entry = log.decode(start, end, _REPLY_MARKERS, reject=_NOISE_HEADS)
+                if not isinstance(entry, dict):
+                    continue
+                message = self._extract_message(entry)
+                if message:
+                    return message
         self._debug(f"No reply found in tail (bytes={tail_bytes}, lines={tail_lines}) for log: {log_path}")
         return None
 
@@ -316,6 +397,7 @@ class CodexLogReader:
             raise FileNotFoundError("Codex session log not found")
 
         while True:
+            baseline = watch_baseline(self.watch_paths({"log_path": current_path}))
             try:
                 log_path = ensure_log()
             except FileNotFoundError:
@@ -357,12 +439,8 @@ class CodexLogReader:
                         fh.seek(pos_before)
                         break
                     offset = fh.tell()
-                    line = raw_line.decode("utf-8", errors="ignore").strip()
-                    if not line:
-                        continue
-                    try:
-                        entry = json.loads(line)
-                    except json.JSONDecodeError:
+                    entry = decode_json_line(raw_line, _REPLY_MARKERS, reject=_NOISE_HEADS, errors="ignore")
+                    if not isinstance(entry, dict):
                         continue
                     message = self._extract_message(entry)
                     if message is not None:
@@ -387,7 +465,12 @@ class CodexLogReader:
             if not block:
                 return None, {"log_path": log_path, "offset": offset}
 
-            time.sleep(self._poll_interval)
+            wait_for_change_or_sleep(
+                baseline,
+                self._poll_interval,
+                deadline,
+                max_wait=last_rescan + rescan_interval - time.time(),
+            )
             if time.time() >= deadline:
                 return None, {"log_path": log_path, "offset": offset}
 
@@ -420,6 +503,7 @@ class CodexLogReader:
             raise FileNotFoundError("Codex session log not found")
 
         while True:
+            baseline = watch_baseline(self.watch_paths({"log_path": current_path}))
             try:
                 log_path = ensure_log()
             except FileNotFoundError:
@@ -460,12 +544,8 @@ class CodexLogReader:
                         fh.seek(pos_before)
                         break
                     offset = fh.tell()
-                    line = raw_line.decode("utf-8", errors="ignore").strip()
-                    if not line:
-                        continue
-                    try:
-                        entry = json.loads(line)
-                    except json.JSONDecodeError:
+                    entry = decode_json_line(raw_line, _REPLY_MARKERS, reject=_NOISE_HEADS, errors="ignore")
+                    if not isinstance(entry, dict):
                         continue
                     event = self._extract_event(entry)
                     if event is not None:
@@ -487,7 +567,12 @@ class CodexLogReader:
             if not block:
                 return None, {"log_path": log_path, "offset": offset}
 
-            time.sleep(self._poll_interval)
+            wait_for_change_or_sleep(
+                baseline,
+                self._poll_interval,
+                deadline,
+                max_wait=last_rescan + rescan_interval - time.time(),
+            )
             if time.time() >= deadline:
                 return None, {"log_path": log_path, "offset": offset}
 
@@ -572,50 +657,28 @@ class CodexLogReader:
             return "assistant", ai_msg.strip()
         return None
 
-    def latest_conversations(self, n: int = 1) -> List[Tuple[str, str]]:
-        """Get the latest n conversations (question, reply) pairs"""
+    def latest_conversations(self, n: int = 1, *, skip: int = 0) -> List[Tuple[str, str]]:
+        """Get the latest n conversations (question, reply) pairs, older pages via `skip`"""
         # Always use _latest_log() to detect newer sessions
         log_path = self._latest_log()
         if not log_path or not log_path.exists():
             return []
         if n <= 0:
             return []
-
-        tail_bytes = self._env_int("CODEX_LOG_CONV_TAIL_BYTES", 1024 * 1024 * 32)
-        tail_lines = self._env_int("CODEX_LOG_CONV_TAIL_LINES", 20000)
-        lines = self._iter_lines_reverse(log_path, max_bytes=tail_bytes, max_lines=tail_lines)
-        if not lines:
-            return []
-
-        pairs_rev: List[Tuple[str, str]] = []
-        pending_reply: Optional[str] = None
-
-        for line in lines:
-            if not line.startswith("{"):
-                continue
-            try:
-                entry = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-
-            if pending_reply is None:
-                ai_msg = self._extract_message(entry)
-                if ai_msg:
-                    pending_reply = ai_msg
-                continue
-
-            user_msg = self._extract_user_message(entry)
-            if user_msg:
-                pairs_rev.append((user_msg, pending_reply))
-                pending_reply = None
-                if len(pairs_rev) >= n:
-                    break
-
-        pairs = list(reversed(pairs_rev))
+        pairs = codex_turn_index(log_path).latest(n, skip=skip)
         if not pairs:
-            self._debug(f"No conversations found in tail (bytes={tail_bytes}, lines={tail_lines}) for log: {log_path}")
+            self._debug(f"No conversations found in log: {log_path}")
         return pairs
 
+    def conversation_for_req(self, req_id: str) -> Optional[Tuple[str, str]]:
+        """(question, reply) of the turn whose prompt carried `CCB_REQ_ID: <req_id>`"""
+        log_path = self._latest_log()
+        if not log_path or not log_path.exists():
+            return None
+        index = codex_turn_index(log_path)
+        turn = index.turn_for_req(req_id)
+        return index.conversation(turn) if turn else None
+
 
 class CodexCommunicator:
     """Communicates with Codex bridge via FIFO and reads replies from logs"""
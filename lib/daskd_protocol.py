@@ -7,6 +7,7 @@ from pathlib import Path
 
 from ccb_protocol import (
     DONE_PREFIX,
+    PRIORITY_NORMAL,
     REQ_ID_PREFIX,
     is_done_text,
     make_req_id,
@@ -112,6 +113,7 @@ class DaskdRequest:
     quiet: bool
     message: str
     output_path: str | None = None
+    priority: str = PRIORITY_NORMAL
 
 
 @dataclass(frozen=True)
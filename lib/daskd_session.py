@@ -8,6 +8,7 @@ from typing import Optional, Tuple
 
 from ccb_config import apply_backend_env
 from project_id import compute_ccb_project_id
+from session_cache import SessionHandleCache
 from session_utils import find_project_session_file as _find_project_session_file, safe_write_session
 from terminal import get_backend_for_session
 
@@ -182,3 +183,7 @@ def compute_session_key(session: DroidProjectSession) -> str:
         except Exception:
             pid = ""
     return f"droid:{pid}" if pid else "droid:unknown"
+
+
+# Shared by the daemon's submit path, session workers and monitor (see session_cache.SessionHandleCache).
+session_handles: SessionHandleCache[DroidProjectSession] = SessionHandleCache(load_project_session, compute_session_key, locate=find_project_session_file)
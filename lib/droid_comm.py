@@ -7,16 +7,20 @@ sends prompts by injecting text into the Droid pane via the configured backend.
 
 from __future__ import annotations
 
-import heapq
 import json
 import os
 import time
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+from askd_reactor import wait_for_change_or_sleep, watch_baseline
 from ccb_config import apply_backend_env
+from jsonl_tail import decode_json_line, read_jsonl_window
+from log_map import LogMap
+from turn_index import TurnIndex, get_turn_index
 from pane_registry import upsert_registry
 from project_id import compute_ccb_project_id
+from session_log_index import SessionLogIndex, get_log_index
 from session_utils import find_project_session_file, safe_write_session
 from terminal import get_backend_for_session, get_pane_id_from_session
 
@@ -77,13 +81,7 @@ def read_droid_session_start(session_path: Path, *, max_lines: int = 30) -> Tupl
                 line = handle.readline()
                 if not line:
                     break
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    entry = json.loads(line)
-                except Exception:
-                    continue
+                entry = decode_json_line(line, (b"session_start",))
                 if not isinstance(entry, dict) or entry.get("type") != "session_start":
                     continue
                 cwd = entry.get("cwd")
@@ -96,6 +94,15 @@ def read_droid_session_start(session_path: Path, *, max_lines: int = 30) -> Tupl
     return None, None
 
 
+def _read_droid_meta(session_path: Path) -> Tuple[Optional[str], Optional[str], Optional[bool]]:
+    cwd, sid = read_droid_session_start(session_path)
+    return cwd, sid, None
+
+
+def droid_log_index(root: Path) -> SessionLogIndex:
+    return get_log_index("droid", root, _read_droid_meta)
+
+
 def _extract_content_text(content: Any) -> Optional[str]:
     if content is None:
         return None
@@ -120,6 +127,11 @@ def _extract_content_text(content: Any) -> Optional[str]:
     return "\n".join(texts).strip()
 
 
+# Byte prefilters for decode_json_line; roles are compared case-insensitively below.
+_ASSISTANT_MARKERS = (b"assistant", b"Assistant")
+_EVENT_MARKERS = (b'"user"', b'"User"', b"assistant", b"Assistant")
+
+
 def _extract_message(entry: dict, role: str) -> Optional[str]:
     if not isinstance(entry, dict):
         return None
@@ -136,6 +148,20 @@ def _extract_message(entry: dict, role: str) -> Optional[str]:
     return None
 
 
+def _extract_event(entry: Any) -> Optional[Tuple[str, str]]:
+    user_msg = _extract_message(entry, "user")
+    if user_msg:
+        return "user", user_msg
+    assistant_msg = _extract_message(entry, "assistant")
+    if assistant_msg:
+        return "assistant", assistant_msg
+    return None
+
+
+def droid_turn_index(session_path: Path) -> TurnIndex:
+    return get_turn_index("droid", session_path, _extract_event, markers=_EVENT_MARKERS)
+
+
 class DroidLogReader:
     """Reads Droid session logs from ~/.factory/sessions"""
 
@@ -173,78 +199,39 @@ class DroidLogReader:
     def current_session_path(self) -> Optional[Path]:
         return self._latest_session()
 
+    def watch_paths(self, state: Dict[str, Any]) -> List[Path]:
+        """Session log plus its directory (new sessions) for the daemon reactor."""
+        session = state.get("session_path")
+        if isinstance(session, Path):
+            return [session, session.parent]
+        return [self.root]
+
     def _find_session_by_id(self) -> Optional[Path]:
         session_id = (self._session_id_hint or "").strip()
         if not session_id or not self.root.exists():
             return None
-        latest: Optional[Path] = None
-        latest_mtime = -1.0
-        try:
-            for path in self.root.glob(f"**/{session_id}.jsonl"):
-                if not path.is_file():
-                    continue
-                try:
-                    mtime = path.stat().st_mtime
-                except OSError:
-                    continue
-                if mtime >= latest_mtime:
-                    latest_mtime = mtime
-                    latest = path
-        except Exception:
-            return None
-        return latest
+        name = f"{session_id}.jsonl"
+        entry = droid_log_index(self.root).latest(lambda e: os.path.basename(e.path) == name)
+        return Path(entry.path) if entry else None
 
     def _scan_latest_session(self) -> Optional[Path]:
         if not self.root.exists():
             return None
-        heap: List[Tuple[float, str]] = []
-        try:
-            for path in self.root.glob("**/*.jsonl"):
-                if not path.is_file() or path.name.startswith("."):
-                    continue
-                try:
-                    mtime = path.stat().st_mtime
-                except OSError:
-                    continue
-                item = (mtime, str(path))
-                if len(heap) < self._scan_limit:
-                    heapq.heappush(heap, item)
-                else:
-                    if item[0] > heap[0][0]:
-                        heapq.heapreplace(heap, item)
-        except Exception:
-            return None
-
-        candidates = sorted(heap, key=lambda x: x[0], reverse=True)
         work_dir_str = str(self.work_dir)
-        for _, path_str in candidates:
-            path = Path(path_str)
-            cwd, _sid = read_droid_session_start(path)
-            if not cwd:
-                continue
-            if _path_is_same_or_parent(work_dir_str, cwd) or _path_is_same_or_parent(cwd, work_dir_str):
-                return path
-        return None
+
+        def _match(entry) -> bool:
+            if not entry.cwd:
+                return False
+            return _path_is_same_or_parent(work_dir_str, entry.cwd) or _path_is_same_or_parent(entry.cwd, work_dir_str)
+
+        entry = droid_log_index(self.root).latest(_match, limit=self._scan_limit)
+        return Path(entry.path) if entry else None
 
     def _scan_latest_session_any_project(self) -> Optional[Path]:
         if not self.root.exists():
             return None
-        latest: Optional[Path] = None
-        latest_mtime = -1.0
-        try:
-            for path in self.root.glob("**/*.jsonl"):
-                if not path.is_file() or path.name.startswith("."):
-                    continue
-                try:
-                    mtime = path.stat().st_mtime
-                except OSError:
-                    continue
-                if mtime >= latest_mtime:
-                    latest_mtime = mtime
-                    latest = path
-        except Exception:
-            return None
-        return latest
+        entry = droid_log_index(self.root).latest()
+        return Path(entry.path) if entry else None
 
     def _latest_session(self) -> Optional[Path]:
         preferred = self._preferred_session
@@ -288,6 +275,24 @@ class DroidLogReader:
                 offset = 0
         return {"session_path": session, "offset": offset, "carry": b""}
 
+    def resume_state(self, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Rebase a cursor left by a previous request to the current end of its session file, without rediscovery.
+
+        Returns None on evidence of rotation (file missing or shrunk); callers then capture afresh.
+        """
+        session = state.get("session_path")
+        offset = state.get("offset")
+        if not isinstance(session, Path) or not isinstance(offset, int) or offset < 0:
+            return None
+        try:
+            size = session.stat().st_size
+        except OSError:
+            return None
+        if size < offset:
+            return None
+        return {"session_path": session, "offset": size, "carry": b""}
+
     def wait_for_message(self, state: Dict[str, Any], timeout: float) -> Tuple[Optional[str], Dict[str, Any]]:
         return self._read_since(state, timeout=timeout, block=True)
 
@@ -298,62 +303,42 @@ class DroidLogReader:
         session = self._latest_session()
         if not session or not session.exists():
             return None
-        last: Optional[str] = None
-        try:
-            with session.open("r", encoding="utf-8", errors="replace") as handle:
-                for line in handle:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        entry = json.loads(line)
-                    except Exception:
-                        continue
-                    msg = _extract_message(entry, "assistant")
-                    if msg:
-                        last = msg
-        except OSError:
+        log = LogMap.open(session)
+        if log is None:
             return None
-        return last
+        with log:
+            # Newest first: the first assistant line from the end is the answer.
+            for start, end in log.lines_reverse():
+                msg = _extract_message(log.decode(start, end, _ASSISTANT_MARKERS), "assistant")
+                if msg:
+                    return msg
+        return None
 
-    def latest_conversations(self, n: int = 1) -> List[Tuple[str, str]]:
+    def latest_conversations(self, n: int = 1, *, skip: int = 0) -> List[Tuple[str, str]]:
         session = self._latest_session()
         if not session or not session.exists():
             return []
-        pairs: List[Tuple[str, str]] = []
-        last_user: Optional[str] = None
-        try:
-            with session.open("r", encoding="utf-8", errors="replace") as handle:
-                for line in handle:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        entry = json.loads(line)
-                    except Exception:
-                        continue
-                    user_msg = _extract_message(entry, "user")
-                    if user_msg:
-                        last_user = user_msg
-                        continue
-                    assistant_msg = _extract_message(entry, "assistant")
-                    if assistant_msg:
-                        pairs.append((last_user or "", assistant_msg))
-                        last_user = None
-        except OSError:
-            return []
-        return pairs[-max(1, int(n)) :]
+        return droid_turn_index(session).latest(n, skip=skip)
+
+    def conversation_for_req(self, req_id: str) -> Optional[Tuple[str, str]]:
+        session = self._latest_session()
+        if not session or not session.exists():
+            return None
+        index = droid_turn_index(session)
+        turn = index.turn_for_req(req_id)
+        return index.conversation(turn) if turn else None
 
     def _read_since(self, state: Dict[str, Any], timeout: float, block: bool) -> Tuple[Optional[str], Dict[str, Any]]:
         deadline = time.time() + max(0.0, float(timeout)) if block else time.time()
         current_state = dict(state or {})
 
         while True:
+            baseline = watch_baseline(self.watch_paths(current_state))
             session = self._latest_session()
             if session is None or not session.exists():
                 if not block or time.time() >= deadline:
                     return None, current_state
-                time.sleep(self._poll_interval)
+                wait_for_change_or_sleep(baseline, self._poll_interval, deadline)
                 continue
 
             if current_state.get("session_path") != session:
@@ -367,7 +352,7 @@ class DroidLogReader:
 
             if not block or time.time() >= deadline:
                 return None, current_state
-            time.sleep(self._poll_interval)
+            wait_for_change_or_sleep(baseline, self._poll_interval, deadline)
 
     def _read_new_messages(self, session: Path, state: Dict[str, Any]) -> Tuple[Optional[str], Dict[str, Any]]:
         offset = int(state.get("offset") or 0)
@@ -381,35 +366,23 @@ class DroidLogReader:
             offset = 0
             carry = b""
 
-        try:
-            with session.open("rb") as handle:
-                handle.seek(offset)
-                data = handle.read()
-        except OSError:
-            return None, state
-
-        new_offset = offset + len(data)
-        buf = carry + data
-        lines = buf.split(b"\n")
-        if buf and not buf.endswith(b"\n"):
-            carry = lines.pop()
-        else:
-            carry = b""
-
         latest: Optional[str] = None
-        for raw in lines:
-            line = raw.strip()
-            if not line:
-                continue
-            try:
-                entry = json.loads(line.decode("utf-8", errors="replace"))
-            except Exception:
-                continue
+
+        def _on_entry(entry: Any) -> None:
+            nonlocal latest
             msg = _extract_message(entry, "assistant")
             if msg:
                 latest = msg
 
-        new_state = {"session_path": session, "offset": new_offset, "carry": carry}
+        try:
+            # Only the newest reply matters: drain every pending window, one bounded chunk at a time.
+            more = True
+            while more:
+                offset, carry, more = read_jsonl_window(session, offset, carry, _on_entry, markers=_ASSISTANT_MARKERS)
+        except OSError:
+            return None, state
+
+        new_state = {"session_path": session, "offset": offset, "carry": carry}
         return latest, new_state
 
 
@@ -0,0 +1,179 @@
+"""
+Directory watches for the askd reactor: inotify (via ctypes) on Linux, nothing elsewhere.
+
+Watching a directory reports modify/create/delete/rename events for its children, so one watch on
+a log's parent directory covers appends to the log, the log appearing, and sibling logs being
+created (session rotation). Callers fall back to stat polling when `InotifyWatcher.create()` returns
+None or when a path's directory cannot be watched.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import math
+import os
+import select
+import struct
+import sys
+from typing import Iterable, Optional
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+)
+
+
+def _inotify_enabled() -> bool:
+    return (os.environ.get("CCB_INOTIFY") or "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def _load_libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_init1.restype = ctypes.c_int
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_add_watch.restype = ctypes.c_int
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        libc.inotify_rm_watch.restype = ctypes.c_int
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+def watch_dir_for(path: str) -> str:
+    """The directory whose watch covers `path` (itself if a directory, else its parent)."""
+    return path if os.path.isdir(path) else (os.path.dirname(path) or ".")
+
+
+class InotifyWatcher:
+    """One inotify fd plus a self-pipe so another thread can interrupt `wait()`."""
+
+    def __init__(self, libc, fd: int):
+        self._libc = libc
+        self._fd = fd
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._wd_by_dir: dict[str, int] = {}
+        # poll() rather than select(): daemons may hold more than FD_SETSIZE descriptors.
+        self._poller = select.poll()
+        self._poller.register(fd, select.POLLIN)
+        self._poller.register(self._wake_r, select.POLLIN)
+
+    @classmethod
+    def create(cls) -> Optional["InotifyWatcher"]:
+        if not _inotify_enabled():
+            return None
+        libc = _load_libc()
+        if libc is None:
+            return None
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return None
+        return cls(libc, fd)
+
+    def sync(self, paths: Iterable[str]) -> set[str]:
+        """
+        Watch the directories covering `paths` and drop watches no longer needed.
+
+        Returns the subset of `paths` that could not be watched (caller must poll those).
+        """
+        wanted: dict[str, list[str]] = {}
+        for p in paths:
+            wanted.setdefault(watch_dir_for(p), []).append(p)
+        for d in [d for d in self._wd_by_dir if d not in wanted]:
+            self._libc.inotify_rm_watch(self._fd, self._wd_by_dir.pop(d))
+        unwatched: set[str] = set()
+        for d, ps in wanted.items():
+            if d in self._wd_by_dir:
+                continue
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(d), WATCH_MASK)
+            if wd < 0:
+                unwatched.update(ps)
+                continue
+            self._wd_by_dir[d] = wd
+        return unwatched
+
+    def wait(self, timeout: float) -> bool:
+        """Block until an inotify event, a `wake()`, or `timeout`; True if inotify events arrived."""
+        try:
+            ready = {fd for fd, _ev in self._poller.poll(math.ceil(max(0.0, timeout) * 1000))}
+        except OSError:
+            return False
+        if self._wake_r in ready:
+            try:
+                while os.read(self._wake_r, 4096):
+                    pass
+            except OSError:
+                pass
+        if self._fd not in ready:
+            return False
+        self._drain()
+        return True
+
+    def _drain(self) -> None:
+        # Waiters re-stat their paths after any event; we only track watches the kernel dropped
+        # (directory deleted/unmounted) so the next sync() can re-add them.
+        while True:
+            try:
+                buf = os.read(self._fd, 65536)
+            except OSError as exc:
+                if exc.errno == errno.EINTR:
+                    continue
+                return
+            if not buf:
+                return
+            pos = 0
+            while pos + _EVENT_HEADER.size <= len(buf):
+                wd, mask, _cookie, name_len = _EVENT_HEADER.unpack_from(buf, pos)
+                pos += _EVENT_HEADER.size + name_len
+                if mask & IN_IGNORED:
+                    for d, w in list(self._wd_by_dir.items()):
+                        if w == wd:
+                            del self._wd_by_dir[d]
+
+    def wake(self) -> None:
+        try:
+            os.write(self._wake_w, b"\0")
+        except OSError:
+            pass
+
+    def watched_dirs(self) -> int:
+        return len(self._wd_by_dir)
+
+    def close(self) -> None:
+        for fd in (self._fd, self._wake_r, self._wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
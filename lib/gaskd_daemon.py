@@ -10,15 +10,15 @@ from typing import Optional
 
 from worker_pool import BaseSessionWorker, PerSessionWorkerPool
 
+from ccb_protocol import DoneDetector, normalize_priority
 from gaskd_protocol import (
     GaskdRequest,
     GaskdResult,
     extract_reply_for_req,
-    is_done_text,
     make_req_id,
     wrap_gemini_prompt,
 )
-from gaskd_session import compute_session_key, load_project_session
+from gaskd_session import GeminiProjectSession, session_handles
 from gemini_comm import GeminiLogReader
 from pane_registry import upsert_registry
 from project_id import compute_ccb_project_id
@@ -26,6 +26,9 @@ from terminal import get_backend_for_session
 from askd_runtime import state_file_path, log_path, write_log, random_token
 import askd_rpc
 from askd_server import AskDaemonServer
+from askd_reactor import get_reactor
+from poll_schedule import poll_cadence
+import pane_events
 from providers import GASKD_SPEC
 
 
@@ -133,6 +136,10 @@ class _QueuedTask:
     result: Optional[GaskdResult] = None
 
 
+def _reader_key(session: GeminiProjectSession) -> tuple[str, str]:
+    return (session.work_dir, session.gemini_session_path)
+
+
 class _SessionWorker(BaseSessionWorker[_QueuedTask, GaskdResult]):
     def _handle_exception(self, exc: Exception, task: _QueuedTask) -> GaskdResult:
         _write_log(f"[ERROR] session={self.session_key} req_id={task.req_id} {exc}")
@@ -149,9 +156,9 @@ class _SessionWorker(BaseSessionWorker[_QueuedTask, GaskdResult]):
         started_ms = _now_ms()
         req = task.request
         work_dir = Path(req.work_dir)
-        _write_log(f"[INFO] start session={self.session_key} req_id={task.req_id} work_dir={req.work_dir}")
+        _write_log(f"[INFO] start session={self.session_key} req_id={task.req_id} priority={req.priority} work_dir={req.work_dir}")
 
-        session = load_project_session(work_dir)
+        session = session_handles.get(work_dir).session
         if not session:
             return GaskdResult(
                 exit_code=1,
@@ -185,13 +192,16 @@ class _SessionWorker(BaseSessionWorker[_QueuedTask, GaskdResult]):
                 done_ms=None,
             )
 
-        log_reader = GeminiLogReader(work_dir=Path(session.work_dir))
-        if session.gemini_session_path:
-            try:
-                log_reader.set_preferred_session(Path(session.gemini_session_path))
-            except Exception:
-                pass
-        state = log_reader.capture_state()
+        def _new_reader() -> GeminiLogReader:
+            reader = GeminiLogReader(work_dir=Path(session.work_dir))
+            if session.gemini_session_path:
+                try:
+                    reader.set_preferred_session(Path(session.gemini_session_path))
+                except Exception:
+                    pass
+            return reader
+
+        log_reader, state = self._acquire_reader(_reader_key(session), _new_reader)
 
         # Best-effort: persist the latest binding so other processes (gpend, registry routing, etc.)
         # can follow session rotations ("new") without manual intervention.
@@ -224,31 +234,39 @@ class _SessionWorker(BaseSessionWorker[_QueuedTask, GaskdResult]):
         except Exception:
             pass
 
-        prompt = wrap_gemini_prompt(req.message, task.req_id)
+        prompt = wrap_gemini_prompt(self._spool_message(session.work_dir, req.message), task.req_id)
         backend.send_text(pane_id, prompt)
+        cadence = poll_cadence(GASKD_SPEC.daemon_key, self.session_key)
 
         deadline = None if float(req.timeout_s) < 0.0 else (time.time() + float(req.timeout_s))
         done_seen = False
         done_ms: int | None = None
         latest_reply = ""
+        detector = DoneDetector(task.req_id)
 
         pane_check_interval = float(os.environ.get("CCB_GASKD_PANE_CHECK_INTERVAL", "2.0") or "2.0")
         last_pane_check = time.time()
+        reactor = get_reactor()
 
         while True:
             if deadline is not None:
                 remaining = deadline - time.time()
                 if remaining <= 0:
                     break
-                wait_step = min(remaining, 1.0)
+                wait_step = remaining
             else:
-                wait_step = 1.0
+                wait_step = pane_check_interval
 
-            if time.time() - last_pane_check >= pane_check_interval:
+            # A pushed pane-death event (tmux hook -> pane_events) forces the check right away.
+            pane_pushed = pane_events.died_since(pane_id, started_ms / 1000.0)
+            if pane_pushed or time.time() - last_pane_check >= pane_check_interval:
                 try:
                     alive = bool(backend.is_alive(pane_id))
                 except Exception:
                     alive = False
+                if alive and pane_pushed:
+                    # Respawned in place since the event: nothing to fail.
+                    pane_events.clear(pane_id)
                 if not alive:
                     _write_log(f"[ERROR] Pane {pane_id} died during request session={self.session_key} req_id={task.req_id}")
                     return GaskdResult(
@@ -268,7 +286,8 @@ class _SessionWorker(BaseSessionWorker[_QueuedTask, GaskdResult]):
                 scan_from_i = 0
 
             prev_session_path = state.get("session_path")
-            reply, state = log_reader.wait_for_message(state, wait_step)
+            wait_s = max(0.0, min(wait_step, log_reader.force_read_interval, last_pane_check + pane_check_interval - time.time()))
+            reply, state = reactor.read_or_wait(log_reader.try_get_message, log_reader.watch_paths, state, wait_s, cadence=cadence)
 
             # Detect user cancellation via Gemini session JSON info message.
             try:
@@ -293,11 +312,14 @@ class _SessionWorker(BaseSessionWorker[_QueuedTask, GaskdResult]):
             if not reply:
                 continue
             latest_reply = str(reply)
-            if is_done_text(latest_reply, task.req_id):
+            # Each read returns the whole current reply, not a delta.
+            if detector.replace(latest_reply):
                 done_seen = True
                 done_ms = _now_ms() - started_ms
                 break
 
+        cadence.finish(anchor_ms=None, done_ms=done_ms)
+        self._park_reader(_reader_key(session), log_reader, state)
         final_reply = extract_reply_for_req(latest_reply, task.req_id)
         return GaskdResult(
             exit_code=0 if done_seen else 2,
@@ -317,13 +339,16 @@ class _WorkerPool:
         req_id = make_req_id()
         task = _QueuedTask(request=request, created_ms=_now_ms(), req_id=req_id, done_event=threading.Event())
 
-        session = load_project_session(Path(request.work_dir))
-        session_key = compute_session_key(session) if session else "gemini:unknown"
+        session_key = session_handles.get(Path(request.work_dir)).session_key or "gemini:unknown"
 
-        worker = self._pool.get_or_create(session_key, _SessionWorker)
-        worker.enqueue(task)
+        self._pool.submit(session_key, _SessionWorker, task)
         return task
 
+    def stats(self) -> dict:
+        stats = self._pool.stats()
+        stats["session_cache"] = session_handles.stats()
+        return stats
+
 
 class GaskdServer:
     def __init__(self, host: str = "127.0.0.1", port: int = 0, *, state_file: Optional[Path] = None):
@@ -343,6 +368,7 @@ class GaskdServer:
                     quiet=bool(msg.get("quiet") or False),
                     message=str(msg.get("message") or ""),
                     output_path=str(msg.get("output_path")) if msg.get("output_path") else None,
+                    priority=normalize_priority(msg.get("priority")),
                 )
             except Exception as exc:
                 return {"type": "gask.response", "v": 1, "id": msg.get("id"), "exit_code": 1, "reply": f"Bad request: {exc}"}
@@ -363,6 +389,7 @@ class GaskdServer:
                 "reply": result.reply,
                 "meta": {
                     "session_key": result.session_key,
+                    "priority": req.priority,
                     "done_seen": result.done_seen,
                     "done_ms": result.done_ms,
                 },
@@ -375,6 +402,7 @@ class GaskdServer:
             token=self.token,
             state_file=self.state_file,
             request_handler=_handle_request,
+            stats_handler=self.pool.stats,
             request_queue_size=128,
             on_stop=self._cleanup_state_file,
         )
@@ -411,3 +439,8 @@ def ping_daemon(timeout_s: float = 0.5, state_file: Optional[Path] = None) -> bo
 def shutdown_daemon(timeout_s: float = 1.0, state_file: Optional[Path] = None) -> bool:
     state_file = state_file or state_file_path(GASKD_SPEC.state_file_name)
     return askd_rpc.shutdown_daemon("gask", timeout_s, state_file)
+
+
+def request_stats(timeout_s: float = 0.5, state_file: Optional[Path] = None) -> Optional[dict]:
+    state_file = state_file or state_file_path(GASKD_SPEC.state_file_name)
+    return askd_rpc.request_stats("gask", timeout_s, state_file)
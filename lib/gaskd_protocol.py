@@ -5,6 +5,7 @@ from dataclasses import dataclass
 
 from ccb_protocol import (
     DONE_PREFIX,
+    PRIORITY_NORMAL,
     REQ_ID_PREFIX,
     is_done_text,
     make_req_id,
@@ -71,6 +72,7 @@ class GaskdRequest:
     quiet: bool
     message: str
     output_path: str | None = None
+    priority: str = PRIORITY_NORMAL
 
 
 @dataclass(frozen=True)
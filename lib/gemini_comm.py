@@ -10,12 +10,15 @@ import json
 import os
 import sys
 import time
+import zlib
 from pathlib import Path
 from typing import Optional, Tuple, Dict, Any, List
 
 from terminal import get_backend_for_session, get_pane_id_from_session
 from ccb_config import apply_backend_env
+from askd_reactor import wait_for_change_or_sleep, watch_baseline
 from i18n import t
+from log_scan import newest, scan_dirs
 from session_utils import find_project_session_file
 from pane_registry import upsert_registry
 from project_id import compute_ccb_project_id
@@ -37,6 +40,129 @@ def _get_project_hash(work_dir: Optional[Path] = None) -> str:
     return hashlib.sha256(normalized.encode()).hexdigest()
 
 
+_JSON_WS = " \t\r\n"
+
+
+class SessionJsonTail:
+    """
+    Incremental decoder for one Gemini session-*.json.
+
+    Gemini rewrites the whole file on every update, but in practice only appends to `messages` or
+    edits the last message in place. We remember where the messages before the last one end (the
+    stable prefix, as an offset from the array's `[`) plus a CRC of those bytes. The next read
+    re-checks the CRC (far cheaper than decoding) and json-decodes only what follows it. A changed
+    CRC, a file shorter than the prefix, or a structure we cannot follow falls back to a full parse.
+    """
+
+    def __init__(self) -> None:
+        self._path: Optional[Path] = None
+        self._stable: list = []
+        self._stable_rel_end = -1
+        self._prefix_crc = 0
+        self._decoder = json.JSONDecoder()
+        self.counters = {"full": 0, "incremental": 0}
+
+    def reset(self) -> None:
+        self._path = None
+        self._stable = []
+        self._stable_rel_end = -1
+        self._prefix_crc = 0
+
+    @staticmethod
+    def _array_start(data: bytes) -> int:
+        # A quoted "messages" inside a string value is always escaped, so the first raw match is a key.
+        key = data.find(b'"messages"')
+        if key < 0:
+            return -1
+        pos = key + len(b'"messages"')
+        while pos < len(data) and data[pos : pos + 1] in (b" ", b"\t", b"\r", b"\n", b":"):
+            pos += 1
+        return pos if data[pos : pos + 1] == b"[" else -1
+
+    def _decode_elements(self, data: bytes, start: int, first: bool) -> Optional[tuple[list, list[int]]]:
+        """Decode array elements from byte `start` up to `]`; returns (items, absolute byte end of each)."""
+        try:
+            text = data[start:].decode("utf-8")
+        except UnicodeDecodeError:
+            return None
+        items: list = []
+        ends: list[int] = []
+        n = len(text)
+        pos = 0
+        synced_pos, synced_byte = 0, start
+        need_comma = not first
+        try:
+            while True:
+                while pos < n and text[pos] in _JSON_WS:
+                    pos += 1
+                if pos >= n:
+                    return None
+                if text[pos] == "]":
+                    return items, ends
+                if need_comma:
+                    if text[pos] != ",":
+                        return None
+                    pos += 1
+                    while pos < n and text[pos] in _JSON_WS:
+                        pos += 1
+                obj, pos = self._decoder.raw_decode(text, pos)
+                synced_byte += len(text[synced_pos:pos].encode("utf-8"))
+                synced_pos = pos
+                items.append(obj)
+                ends.append(synced_byte)
+                need_comma = True
+        except ValueError:
+            return None
+
+    def read(self, path: Path) -> Optional[dict]:
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        start = self._array_start(data)
+        if (
+            start >= 0
+            and self._path == path
+            and self._stable_rel_end >= 0
+            and len(data) >= start + self._stable_rel_end
+            and zlib.crc32(memoryview(data)[start : start + self._stable_rel_end]) == self._prefix_crc
+        ):
+            decoded = self._decode_elements(data, start + self._stable_rel_end, first=not self._stable)
+            if decoded is not None:
+                self.counters["incremental"] += 1
+                tail, ends = decoded
+                messages = self._stable + tail
+                self._remember(data, start, self._stable, self._stable_rel_end, tail, ends)
+                return {"messages": messages}
+        return self._full(path, data, start)
+
+    def _full(self, path: Path, data: bytes, start: int) -> Optional[dict]:
+        self.reset()
+        try:
+            loaded = json.loads(data.decode("utf-8"))
+        except (UnicodeDecodeError, ValueError):
+            return None
+        if not isinstance(loaded, dict):
+            return None
+        self.counters["full"] += 1
+        messages = loaded.get("messages")
+        if start >= 0 and isinstance(messages, list):
+            decoded = self._decode_elements(data, start + 1, first=True)
+            if decoded is not None and decoded[0] == messages:
+                self._path = path
+                self._remember(data, start, [], 1, decoded[0], decoded[1])
+        return loaded
+
+    def _remember(self, data: bytes, start: int, stable: list, stable_rel_end: int, tail: list, ends: list[int]) -> None:
+        # Everything but the last message is treated as settled; the last one may still be edited in place.
+        if len(tail) >= 2:
+            stable = stable + tail[:-1]
+            stable_rel_end = ends[-2] - start
+        self._stable = stable
+        self._stable_rel_end = stable_rel_end
+        self._prefix_crc = zlib.crc32(memoryview(data)[start : start + stable_rel_end])
+
+
 class GeminiLogReader:
     """Reads Gemini session files from ~/.gemini/tmp/<hash>/chats"""
 
@@ -58,6 +184,7 @@ class GeminiLogReader:
         except Exception:
             force = 1.0
         self._force_read_interval = min(5.0, max(0.2, force))
+        self._tail = SessionJsonTail()
 
     @staticmethod
     def _debug_enabled() -> bool:
@@ -78,13 +205,13 @@ class GeminiLogReader:
         if not self.root.exists():
             return None
         try:
-            sessions = sorted(
-                (p for p in self.root.glob("*/chats/session-*.json") if p.is_file() and not p.name.startswith(".")),
-                key=lambda p: p.stat().st_mtime,
-            )
+            with os.scandir(self.root) as it:
+                chats_dirs = [os.path.join(e.path, "chats") for e in it if e.is_dir()]
         except OSError:
             return None
-        return sessions[-1] if sessions else None
+        files = scan_dirs(chats_dirs, lambda name: name.startswith("session-") and name.endswith(".json"))
+        latest = newest(files, 1)
+        return Path(latest[0].path) if latest else None
 
     def _scan_latest_session(self) -> Optional[Path]:
         chats = self._chats_dir()
@@ -156,31 +283,64 @@ class GeminiLogReader:
     def current_session_path(self) -> Optional[Path]:
         return self._latest_session()
 
+    def watch_paths(self, state: Dict[str, Any]) -> List[Path]:
+        """Session JSON plus chats dir (new session files) for the daemon reactor."""
+        paths: List[Path] = []
+        session = state.get("session_path")
+        if isinstance(session, Path):
+            paths.append(session)
+        chats = self.root / self._project_hash / "chats"
+        paths.append(chats)
+        return paths
+
+    @property
+    def force_read_interval(self) -> float:
+        return self._force_read_interval
+
     def _read_session_json(self, session: Path) -> Optional[dict]:
         """
         Read a Gemini session JSON file with retries.
 
         Gemini CLI may write the session file in-place, causing transient JSONDecodeError.
+        Reads go through SessionJsonTail, so unchanged leading messages are not re-decoded;
+        the returned dict may then carry only "messages".
         """
         if not session or not session.exists():
             return None
         for attempt in range(10):
-            try:
-                with session.open("r", encoding="utf-8") as f:
-                    loaded = json.load(f)
-                return loaded if isinstance(loaded, dict) else None
-            except json.JSONDecodeError:
-                # Transient partial write; retry briefly.
-                if attempt < 9:
-                    time.sleep(min(self._poll_interval, 0.05))
-                continue
-            except OSError:
+            loaded = self._tail.read(session)
+            if loaded is not None:
+                return loaded
+            if not session.exists():
                 return None
+            # Transient partial write; retry briefly.
+            if attempt < 9:
+                time.sleep(min(self._poll_interval, 0.05))
         return None
 
     def capture_state(self) -> Dict[str, Any]:
         """Record current session file and message count"""
-        session = self._latest_session()
+        return self._capture_state_for(self._latest_session())
+
+    def resume_state(self, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Reuse a baseline left by a previous request for the same session file, without rediscovery.
+
+        Unchanged (mtime_ns, size) keeps the baseline as-is; a changed file is re-baselined in place.
+        Returns None when the file is gone, in which case callers capture afresh.
+        """
+        session = state.get("session_path")
+        if not isinstance(session, Path):
+            return None
+        try:
+            stat = session.stat()
+        except OSError:
+            return None
+        if state.get("mtime_ns") == stat.st_mtime_ns and state.get("size") == stat.st_size and state.get("msg_count", -1) >= 0:
+            return dict(state)
+        return self._capture_state_for(session)
+
+    def _capture_state_for(self, session: Optional[Path]) -> Dict[str, Any]:
         msg_count = 0
         mtime = 0.0
         mtime_ns = 0
@@ -293,6 +453,7 @@ class GeminiLogReader:
         last_forced_read = time.time()
 
         while True:
+            baseline = watch_baseline(self.watch_paths({"session_path": self._preferred_session}))
             # Periodically rescan to detect new session files
             if time.time() - last_rescan >= rescan_interval:
                 latest = self._scan_latest_session()
@@ -318,7 +479,12 @@ class GeminiLogReader:
                         "last_gemini_id": prev_last_gemini_id,
                         "last_gemini_hash": prev_last_gemini_hash,
                     }
-                time.sleep(self._poll_interval)
+                wait_for_change_or_sleep(
+                    baseline,
+                    self._poll_interval,
+                    deadline,
+                    max_wait=last_rescan + rescan_interval - time.time(),
+                )
                 if time.time() >= deadline:
                     return None, state
                 continue
@@ -332,7 +498,16 @@ class GeminiLogReader:
                 # Use file size as additional change signal.
                 if block and current_mtime_ns <= prev_mtime_ns and current_size == prev_size:
                     if time.time() - last_forced_read < self._force_read_interval:
-                        time.sleep(self._poll_interval)
+                        wait_for_change_or_sleep(
+                            baseline,
+                            self._poll_interval,
+                            deadline,
+                            max_wait=min(
+                                last_forced_read + self._force_read_interval,
+                                last_rescan + rescan_interval,
+                            )
+                            - time.time(),
+                        )
                         if time.time() >= deadline:
                             return None, {
                                 "session_path": session,
@@ -403,7 +578,12 @@ class GeminiLogReader:
                             "last_gemini_id": prev_last_gemini_id,
                             "last_gemini_hash": prev_last_gemini_hash,
                         }
-                    time.sleep(self._poll_interval)
+                    wait_for_change_or_sleep(
+                        baseline,
+                        self._poll_interval,
+                        deadline,
+                        max_wait=last_rescan + rescan_interval - time.time(),
+                    )
                     if time.time() >= deadline:
                         return None, {
                             "session_path": session,
@@ -486,7 +666,12 @@ class GeminiLogReader:
                     "last_gemini_hash": prev_last_gemini_hash,
                 }
 
-            time.sleep(self._poll_interval)
+            wait_for_change_or_sleep(
+                baseline,
+                self._poll_interval,
+                deadline,
+                max_wait=last_rescan + rescan_interval - time.time(),
+            )
             if time.time() >= deadline:
                 return None, {
                     "session_path": session,
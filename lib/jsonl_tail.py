@@ -0,0 +1,171 @@
+"""
+Shared JSONL helpers for the provider log readers.
+
+`decode_json_line` is the one place lines are turned into objects: cheap byte-substring checks
+reject lines the caller would ignore anyway (most of a Codex/Claude log is tool output, token
+counts and reasoning), and the survivors are decoded with orjson when it is installed
+(CCB_JSON_CODEC=json forces the stdlib).
+
+`read_jsonl_window` gives bounded incremental reads of append-only logs (Claude, Droid). Readers
+keep (offset, carry) in their state: `offset` is how far the file has been consumed and `carry`
+the trailing partial line. A read starting at offset 0 (new binding, rotation, truncation) used to
+load the whole log at once; here the file is consumed in `chunk_bytes` pieces, so peak memory is
+one chunk plus the longest line, whatever the log size.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence, Union
+
+try:
+    import orjson as _orjson
+except ImportError:  # optional speedup
+    _orjson = None
+
+if (os.environ.get("CCB_JSON_CODEC") or "").strip().lower() in ("json", "stdlib"):
+    _orjson = None
+
+
+def json_codec() -> str:
+    return "orjson" if _orjson is not None else "json"
+
+
+# `reject` prefixes are only looked for in this many leading bytes of a line.
+_HEAD_BYTES = 256
+
+
+def decode_json_line(
+    line: Union[bytes, str],
+    markers: Sequence[bytes] = (),
+    *,
+    reject: Sequence[bytes] = (),
+    errors: str = "replace",
+) -> Any:
+    """
+    Decode one JSONL line; None when it is blank, filtered out, or is not JSON.
+
+    A line is filtered out when its head contains one of `reject` or when it contains none of
+    `markers`. Both are plain substring checks on the raw line: markers must be chosen so that every
+    line the caller acts on contains one, and reject entries should be structural (unescaped quotes
+    never occur inside JSON strings), e.g. `"payload":{"type":"reasoning"`.
+    """
+    if isinstance(line, str):
+        head = line[:_HEAD_BYTES]
+        if reject and any(r.decode("ascii") in head for r in reject):
+            return None
+        if markers and not any(m.decode("ascii") in line for m in markers):
+            return None
+    else:
+        head = line[:_HEAD_BYTES]
+        if reject and any(r in head for r in reject):
+            return None
+        if markers and not any(m in line for m in markers):
+            return None
+    if not line.strip():
+        return None
+    if _orjson is not None:
+        try:
+            return _orjson.loads(line)
+        except Exception:
+            # orjson is strict about UTF-8 and a few edge cases; the stdlib path below decides.
+            pass
+    try:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", errors=errors)
+        return json.loads(line)
+    except Exception:
+        return None
+
+
+def decode_json_span(
+    buf: Any,
+    start: int,
+    end: int,
+    markers: Sequence[bytes] = (),
+    *,
+    reject: Sequence[bytes] = (),
+    errors: str = "replace",
+) -> Any:
+    """
+    `decode_json_line` for `buf[start:end]` of a bytes-like buffer (e.g. an mmap), without slicing it.
+
+    Filters run as `find` on the buffer itself; only lines that pass are copied (or, with orjson,
+    handed over as a memoryview).
+    """
+    if reject:
+        head_end = min(end, start + _HEAD_BYTES)
+        if any(buf.find(r, start, head_end) >= 0 for r in reject):
+            return None
+    if markers and not any(buf.find(m, start, end) >= 0 for m in markers):
+        return None
+    if _orjson is not None:
+        try:
+            return _orjson.loads(memoryview(buf)[start:end])
+        except Exception:
+            pass
+    try:
+        return json.loads(bytes(buf[start:end]).decode("utf-8", errors=errors))
+    except Exception:
+        return None
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = (os.environ.get(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except Exception:
+        return default
+
+
+def chunk_bytes() -> int:
+    return max(4096, _env_int("CCB_JSONL_CHUNK_BYTES", 1 << 20))
+
+
+def max_bytes_per_call() -> int:
+    """Upper bound on bytes consumed by one window (CCB_JSONL_MAX_BYTES, default 8 MiB)."""
+    return max(chunk_bytes(), _env_int("CCB_JSONL_MAX_BYTES", 8 << 20))
+
+
+def read_jsonl_window(
+    path: Path,
+    offset: int,
+    carry: bytes,
+    on_entry: Callable[[Any], None],
+    *,
+    max_bytes: Optional[int] = None,
+    markers: Sequence[bytes] = (),
+) -> tuple[int, bytes, bool]:
+    """
+    Feed each complete JSON line after `offset` (and matching `markers`) to `on_entry`, reading at most `max_bytes`.
+
+    Returns (new_offset, new_carry, more_pending). Undecodable lines are skipped. Raises OSError
+    if the file cannot be opened; callers keep their previous state in that case.
+    """
+    limit = max_bytes_per_call() if max_bytes is None else max(1, int(max_bytes))
+    step = min(chunk_bytes(), limit)
+    consumed = 0
+    with path.open("rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        handle.seek(offset)
+        while consumed < limit:
+            data = handle.read(min(step, limit - consumed))
+            if not data:
+                break
+            consumed += len(data)
+            buf = carry + data if carry else data
+            end = buf.rfind(b"\n")
+            if end < 0:
+                carry = buf
+                continue
+            carry = buf[end + 1 :]
+            for raw in buf[:end].split(b"\n"):
+                entry = decode_json_line(raw, markers)
+                if entry is not None:
+                    on_entry(entry)
+    new_offset = offset + consumed
+    return new_offset, carry, new_offset < size
@@ -9,17 +9,15 @@ from typing import Optional
 
 from worker_pool import BaseSessionWorker, PerSessionWorkerPool
 
-from claude_comm import ClaudeLogReader
-from ccb_protocol import REQ_ID_PREFIX
+from claude_comm import ClaudeLogReader, claude_turn_index
+from ccb_protocol import REQ_ID_PREFIX, DoneDetector, normalize_priority
 from laskd_protocol import (
     LaskdRequest,
     LaskdResult,
-    is_done_text,
     make_req_id,
-    strip_done_text,
     wrap_claude_prompt,
 )
-from laskd_session import compute_session_key, load_project_session
+from laskd_session import ClaudeProjectSession, session_handles
 from laskd_registry import get_session_registry
 from pane_registry import upsert_registry
 from project_id import compute_ccb_project_id
@@ -27,8 +25,16 @@ from terminal import get_backend_for_session
 from askd_runtime import state_file_path, log_path, write_log, random_token
 import askd_rpc
 from askd_server import AskDaemonServer
+from askd_reactor import get_reactor
+from anchor_watch import AnchorWatch
+from poll_schedule import poll_cadence
+import pane_events
+import pane_tap
+from turn_index import sync_in_background
 from providers import LASKD_SPEC
 
+_INTERRUPT_MARKER = "■ Conversation interrupted"
+
 
 def _now_ms() -> int:
     return int(time.time() * 1000)
@@ -38,17 +44,6 @@ def _write_log(line: str) -> None:
     write_log(log_path(LASKD_SPEC.log_file_name), line)
 
 
-def _tail_state_for_log(log_path: Optional[Path], *, tail_bytes: int) -> dict:
-    if not log_path or not log_path.exists():
-        return {"session_path": log_path if log_path else None, "offset": 0, "carry": b""}
-    try:
-        size = log_path.stat().st_size
-    except OSError:
-        size = 0
-    offset = max(0, size - max(0, int(tail_bytes)))
-    return {"session_path": log_path, "offset": offset, "carry": b""}
-
-
 @dataclass
 class _QueuedTask:
     request: LaskdRequest
@@ -58,6 +53,10 @@ class _QueuedTask:
     result: Optional[LaskdResult] = None
 
 
+def _reader_key(session: ClaudeProjectSession) -> tuple[str, str]:
+    return (session.work_dir, session.claude_session_path)
+
+
 class _SessionWorker(BaseSessionWorker[_QueuedTask, LaskdResult]):
     def _handle_exception(self, exc: Exception, task: _QueuedTask) -> LaskdResult:
         _write_log(f"[ERROR] session={self.session_key} req_id={task.req_id} {exc}")
@@ -77,9 +76,9 @@ class _SessionWorker(BaseSessionWorker[_QueuedTask, LaskdResult]):
         started_ms = _now_ms()
         req = task.request
         work_dir = Path(req.work_dir)
-        _write_log(f"[INFO] start session={self.session_key} req_id={task.req_id} work_dir={req.work_dir}")
+        _write_log(f"[INFO] start session={self.session_key} req_id={task.req_id} priority={req.priority} work_dir={req.work_dir}")
 
-        session = load_project_session(work_dir)
+        session = session_handles.get(work_dir).session
         if not session:
             return LaskdResult(
                 exit_code=1,
@@ -122,46 +121,66 @@ class _SessionWorker(BaseSessionWorker[_QueuedTask, LaskdResult]):
                 anchor_ms=None,
             )
 
-        log_reader = ClaudeLogReader(work_dir=Path(session.work_dir))
-        if session.claude_session_path:
-            try:
-                log_reader.set_preferred_session(Path(session.claude_session_path))
-            except Exception:
-                pass
-        state = log_reader.capture_state()
+        def _new_reader() -> ClaudeLogReader:
+            reader = ClaudeLogReader(work_dir=Path(session.work_dir))
+            if session.claude_session_path:
+                try:
+                    reader.set_preferred_session(Path(session.claude_session_path))
+                except Exception:
+                    pass
+            return reader
 
-        prompt = wrap_claude_prompt(req.message, task.req_id)
+        log_reader, state = self._acquire_reader(_reader_key(session), _new_reader)
+
+        prompt = wrap_claude_prompt(self._spool_message(session.work_dir, req.message), task.req_id)
+        # Armed before sending: after /clear or a restart the prompt lands in a new session log, and
+        # whichever log receives our anchor first becomes the binding.
+        anchor_dirs = log_reader.session_dirs()
+        if session.claude_session_path:
+            anchor_dirs.append(Path(session.claude_session_path).expanduser().parent)
+        anchor_watch = AnchorWatch(anchor_dirs, f"{REQ_ID_PREFIX} {task.req_id}")
+        # Opt-in (CCB_PANE_TAP): pane output since this mark replaces periodic pane captures.
+        tap = pane_tap.tap_for(backend, pane_id, watch=(_INTERRUPT_MARKER,))
+        tap_mark = tap.mark() if tap is not None else 0
         backend.send_text(pane_id, prompt)
+        cadence = poll_cadence(LASKD_SPEC.daemon_key, self.session_key)
 
         deadline = None if float(req.timeout_s) < 0.0 else (time.time() + float(req.timeout_s))
-        chunks: list[str] = []
+        detector = DoneDetector(task.req_id)
         anchor_seen = False
         fallback_scan = False
         anchor_ms: int | None = None
         done_seen = False
         done_ms: int | None = None
-        anchor_grace_deadline = min(deadline, time.time() + 1.5) if deadline is not None else (time.time() + 1.5)
         anchor_collect_grace = min(deadline, time.time() + 2.0) if deadline is not None else (time.time() + 2.0)
         rebounded = False
-        tail_bytes = int(os.environ.get("CCB_LASKD_REBIND_TAIL_BYTES", str(1024 * 1024 * 2)) or (1024 * 1024 * 2))
 
         pane_check_interval = float(os.environ.get("CCB_LASKD_PANE_CHECK_INTERVAL", "2.0") or "2.0")
         last_pane_check = time.time()
+        reactor = get_reactor()
 
         while True:
             if deadline is not None:
                 remaining = deadline - time.time()
                 if remaining <= 0:
                     break
-                wait_step = min(remaining, 0.5)
+                wait_step = remaining
             else:
-                wait_step = 0.5
+                wait_step = pane_check_interval
+
+            # With a tap, the output since send is already in memory: check it on every wakeup.
+            interrupted = tap is not None and tap.seen(_INTERRUPT_MARKER, since=tap_mark)
 
-            if time.time() - last_pane_check >= pane_check_interval:
+            # A pushed pane-death event (tmux hook -> pane_events) forces the check right away.
+            pane_pushed = pane_events.died_since(pane_id, started_ms / 1000.0)
+            if pane_pushed or time.time() - last_pane_check >= pane_check_interval:
                 try:
                     alive = bool(backend.is_alive(pane_id))
                 except Exception:
                     alive = False
+                if alive and pane_pushed:
+                    # Respawned in place since the event: nothing to fail.
+                    pane_events.clear(pane_id)
                 if not alive:
                     _write_log(f"[ERROR] Pane {pane_id} died during request session={self.session_key} req_id={task.req_id}")
                     return LaskdResult(
@@ -176,45 +195,58 @@ class _SessionWorker(BaseSessionWorker[_QueuedTask, LaskdResult]):
                         anchor_ms=anchor_ms,
                     )
 
-                if hasattr(backend, "get_text"):
+                if tap is None and hasattr(backend, "get_text"):
                     try:
                         pane_text = backend.get_text(pane_id, lines=15)
-                        if pane_text and "■ Conversation interrupted" in pane_text:
+                        if pane_text and _INTERRUPT_MARKER in pane_text:
                             req_id_pos = pane_text.find(task.req_id)
-                            interrupt_pos = pane_text.find("■ Conversation interrupted")
-                            is_current = (req_id_pos >= 0 and interrupt_pos > req_id_pos) or (
+                            interrupt_pos = pane_text.find(_INTERRUPT_MARKER)
+                            interrupted = (req_id_pos >= 0 and interrupt_pos > req_id_pos) or (
                                 req_id_pos < 0 and interrupt_pos >= 0
                             )
-                            if is_current:
-                                return LaskdResult(
-                                    exit_code=1,
-                                    reply="❌ Claude interrupted",
-                                    req_id=task.req_id,
-                                    session_key=self.session_key,
-                                    done_seen=False,
-                                    done_ms=None,
-                                    anchor_seen=anchor_seen,
-                                    fallback_scan=fallback_scan,
-                                    anchor_ms=anchor_ms,
-                                )
                     except Exception:
                         pass
                 last_pane_check = time.time()
+            if interrupted:
+                return LaskdResult(
+                    exit_code=1,
+                    reply="❌ Claude interrupted",
+                    req_id=task.req_id,
+                    session_key=self.session_key,
+                    done_seen=False,
+                    done_ms=None,
+                    anchor_seen=anchor_seen,
+                    fallback_scan=fallback_scan,
+                    anchor_ms=anchor_ms,
+                )
 
-            events, state = log_reader.wait_for_events(state, wait_step)
+            watching = (not rebounded) and (not anchor_seen)
+            watch_paths = log_reader.watch_paths(state) + (anchor_watch.watch_paths() if watching else [])
+            baseline = reactor.snapshot(watch_paths)
+            events, state = log_reader.try_get_events(state)
             if not events:
-                if (not rebounded) and (not anchor_seen) and time.time() >= anchor_grace_deadline:
+                hit = anchor_watch.poll() if watching else None
+                if hit is not None and hit.path != state.get("session_path"):
+                    # The prompt landed in another session log: read it from where it stood when armed.
                     log_reader = ClaudeLogReader(work_dir=Path(session.work_dir), use_sessions_index=False)
-                    log_hint = log_reader.current_session_path()
-                    state = _tail_state_for_log(log_hint, tail_bytes=tail_bytes)
+                    log_reader.set_preferred_session(hit.path)
+                    state = {"session_path": hit.path, "offset": hit.offset, "carry": b""}
                     fallback_scan = True
                     rebounded = True
+                    continue
+                wake_at = last_pane_check + pane_check_interval
+                wait_s = max(0.0, min(wait_step, wake_at - time.time()))
+                if reactor.wait_for_change(watch_paths, wait_s, baseline=baseline, poll_interval=cadence.interval):
+                    cadence.activity()
                 continue
 
+            cadence.activity()
+
             for role, text in events:
                 if role == "user":
                     if f"{REQ_ID_PREFIX} {task.req_id}" in text:
                         anchor_seen = True
+                        cadence.anchor()
                         if anchor_ms is None:
                             anchor_ms = _now_ms() - started_ms
                     continue
@@ -222,9 +254,7 @@ class _SessionWorker(BaseSessionWorker[_QueuedTask, LaskdResult]):
                     continue
                 if (not anchor_seen) and time.time() < anchor_collect_grace:
                     continue
-                chunks.append(text)
-                combined = "\n".join(chunks)
-                if is_done_text(combined, task.req_id):
+                if detector.feed(text):
                     done_seen = True
                     done_ms = _now_ms() - started_ms
                     break
@@ -232,14 +262,15 @@ class _SessionWorker(BaseSessionWorker[_QueuedTask, LaskdResult]):
             if done_seen:
                 break
 
-        combined = "\n".join(chunks)
-        final_reply = strip_done_text(combined, task.req_id)
+        cadence.finish(anchor_ms=anchor_ms, done_ms=done_ms)
+        final_reply = detector.reply()
 
         if done_seen:
             session_path = state.get("session_path") if isinstance(state, dict) else None
             session_id = None
             if isinstance(session_path, Path):
                 session_id = session_path.stem
+                sync_in_background(claude_turn_index(session_path))
             session.update_claude_binding(session_path=session_path if isinstance(session_path, Path) else None, session_id=session_id)
             try:
                 ccb_pid = str(session.data.get("ccb_project_id") or "").strip()
@@ -270,6 +301,8 @@ class _SessionWorker(BaseSessionWorker[_QueuedTask, LaskdResult]):
                 get_session_registry().register_session(Path(session.work_dir), session)
             except Exception:
                 pass
+        if not rebounded:
+            self._park_reader(_reader_key(session), log_reader, state)
 
         result = LaskdResult(
             exit_code=0 if done_seen else 2,
@@ -298,13 +331,16 @@ class _WorkerPool:
         req_id = make_req_id()
         task = _QueuedTask(request=request, created_ms=_now_ms(), req_id=req_id, done_event=threading.Event())
 
-        session = load_project_session(Path(request.work_dir))
-        session_key = compute_session_key(session) if session else "claude:unknown"
+        session_key = session_handles.get(Path(request.work_dir)).session_key or "claude:unknown"
 
-        worker = self._pool.get_or_create(session_key, _SessionWorker)
-        worker.enqueue(task)
+        self._pool.submit(session_key, _SessionWorker, task)
         return task
 
+    def stats(self) -> dict:
+        stats = self._pool.stats()
+        stats["session_cache"] = session_handles.stats()
+        return stats
+
 
 class LaskdServer:
     def __init__(self, host: str = "127.0.0.1", port: int = 0, *, state_file: Optional[Path] = None):
@@ -324,6 +360,7 @@ class LaskdServer:
                     quiet=bool(msg.get("quiet") or False),
                     message=str(msg.get("message") or ""),
                     output_path=str(msg.get("output_path")) if msg.get("output_path") else None,
+                    priority=normalize_priority(msg.get("priority")),
                 )
             except Exception as exc:
                 return {"type": "lask.response", "v": 1, "id": msg.get("id"), "exit_code": 1, "reply": f"Bad request: {exc}"}
@@ -344,6 +381,7 @@ class LaskdServer:
                 "reply": result.reply,
                 "meta": {
                     "session_key": result.session_key,
+                    "priority": req.priority,
                     "done_seen": result.done_seen,
                     "done_ms": result.done_ms,
                     "anchor_seen": result.anchor_seen,
@@ -359,11 +397,16 @@ class LaskdServer:
             token=self.token,
             state_file=self.state_file,
             request_handler=_handle_request,
+            stats_handler=self.pool.stats,
             request_queue_size=128,
-            on_stop=self._cleanup_state_file,
+            on_stop=self._on_stop,
         )
         return server.serve_forever()
 
+    def _on_stop(self) -> None:
+        pane_tap.close_all()
+        self._cleanup_state_file()
+
     def _cleanup_state_file(self) -> None:
         try:
             st = read_state(self.state_file)
@@ -395,3 +438,8 @@ def ping_daemon(timeout_s: float = 0.5, state_file: Optional[Path] = None) -> bo
 def shutdown_daemon(timeout_s: float = 1.0, state_file: Optional[Path] = None) -> bool:
     state_file = state_file or state_file_path(LASKD_SPEC.state_file_name)
     return askd_rpc.shutdown_daemon("lask", timeout_s, state_file)
+
+
+def request_stats(timeout_s: float = 0.5, state_file: Optional[Path] = None) -> Optional[dict]:
+    state_file = state_file or state_file_path(LASKD_SPEC.state_file_name)
+    return askd_rpc.request_stats("lask", timeout_s, state_file)
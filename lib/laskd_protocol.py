@@ -4,6 +4,7 @@ from dataclasses import dataclass
 
 from ccb_protocol import (
     DONE_PREFIX,
+    PRIORITY_NORMAL,
     REQ_ID_PREFIX,
     is_done_text,
     make_req_id,
@@ -31,6 +32,7 @@ class LaskdRequest:
     quiet: bool
     message: str
     output_path: str | None = None
+    priority: str = PRIORITY_NORMAL
 
 
 @dataclass(frozen=True)
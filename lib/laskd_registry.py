@@ -6,8 +6,6 @@ Monitors active sessions and refreshes log bindings periodically to adapt to ses
 
 from __future__ import annotations
 
-import heapq
-import json
 import os
 import re
 import threading
@@ -16,8 +14,13 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
 
-from laskd_session import ClaudeProjectSession, load_project_session
+from claude_sessions_index import latest_indexed_session
+from jsonl_tail import decode_json_line
+from laskd_session import ClaudeProjectSession, session_handles
+from session_log_index import SessionLogIndex, get_log_index
 from session_utils import find_project_session_file
+from terminal import pane_sweep
+import pane_events
 
 
 CLAUDE_PROJECTS_ROOT = Path(
@@ -103,29 +106,8 @@ def _find_log_for_session_id(session_id: str, *, root: Path = CLAUDE_PROJECTS_RO
     root = Path(root).expanduser()
     if not session_id or not root.exists():
         return None
-    latest: Optional[Path] = None
-    latest_mtime = -1.0
-    try:
-        patterns = [f"**/{session_id}.jsonl", f"**/*{session_id}*.jsonl"]
-        seen: set[str] = set()
-        for pattern in patterns:
-            for p in root.glob(pattern):
-                if not p.is_file():
-                    continue
-                path_str = str(p)
-                if path_str in seen:
-                    continue
-                seen.add(path_str)
-                try:
-                    mtime = p.stat().st_mtime
-                except OSError:
-                    continue
-                if mtime >= latest_mtime:
-                    latest = p
-                    latest_mtime = mtime
-    except Exception:
-        return None
-    return latest
+    entry = claude_log_index(root).latest(lambda e: session_id in os.path.basename(e.path))
+    return Path(entry.path) if entry else None
 
 
 def _read_session_meta(log_path: Path) -> tuple[Optional[str], Optional[str], Optional[bool]]:
@@ -139,13 +121,7 @@ def _read_session_meta(log_path: Path) -> tuple[Optional[str], Optional[str], Op
                 line = handle.readline()
                 if not line:
                     break
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    entry = json.loads(line)
-                except Exception:
-                    continue
+                entry = decode_json_line(line, (b'"cwd"', b'"projectPath"', b'"sessionId"', b'"id"'))
                 if not isinstance(entry, dict):
                     continue
                 cwd = entry.get("cwd") or entry.get("projectPath")
@@ -195,12 +171,16 @@ def _path_within(child: str, parent: str) -> bool:
     return child.startswith(parent + "/")
 
 
+def claude_log_index(root: Path = CLAUDE_PROJECTS_ROOT) -> SessionLogIndex:
+    return get_log_index("claude", root, _read_session_meta)
+
+
 def _scan_latest_log_for_work_dir(
     work_dir: Path, *, root: Path = CLAUDE_PROJECTS_ROOT, scan_limit: int
 ) -> tuple[Optional[Path], Optional[str]]:
     """
-    Scan Claude projects and find the latest log whose cwd/projectPath is within work_dir.
-    Uses a bounded heap so we only inspect the N most recently modified logs.
+    Find the latest log whose cwd/projectPath is within work_dir.
+    Only the N most recently modified logs are considered (metadata comes from the discovery index).
     """
     root = Path(root).expanduser()
     if not root.exists():
@@ -208,113 +188,36 @@ def _scan_latest_log_for_work_dir(
 
     work_dir_str = str(work_dir)
 
-    heap: list[tuple[float, str]] = []
-    try:
-        for p in root.glob("**/*.jsonl"):
-            if not p.is_file() or p.name.startswith("."):
-                continue
-            try:
-                mtime = p.stat().st_mtime
-            except OSError:
-                continue
-            item = (mtime, str(p))
-            if len(heap) < scan_limit:
-                heapq.heappush(heap, item)
-            else:
-                if item[0] > heap[0][0]:
-                    heapq.heapreplace(heap, item)
-    except Exception:
-        return None, None
+    def _match(entry) -> bool:
+        if entry.sidechain is True or not entry.cwd:
+            return False
+        return _path_within(entry.cwd, work_dir_str)
 
-    candidates = sorted(heap, key=lambda x: x[0], reverse=True)
-    for _, path_str in candidates:
-        path = Path(path_str)
-        cwd, sid, is_sidechain = _read_session_meta(path)
-        if is_sidechain is True:
-            continue
-        if not cwd:
-            continue
-        if _path_within(cwd, work_dir_str):
-            return path, sid
-    return None, None
+    entry = claude_log_index(root).latest(_match, limit=scan_limit)
+    if entry is None:
+        return None, None
+    return Path(entry.path), entry.session_id
 
 
 def _parse_sessions_index(work_dir: Path, *, root: Path = CLAUDE_PROJECTS_ROOT) -> Optional[Path]:
     """
     Parse sessions-index.json to find the correct session for work_dir.
-    Returns the log path if found.
+    Returns the log path if found. The parsed index is cached process-wide (claude_sessions_index).
     """
-    candidates = set(_candidate_project_paths(work_dir))
+    candidates = _candidate_project_paths(work_dir)
 
-    project_key = _project_key_for_path(work_dir)
-    project_dir = root / project_key
-    index_path = project_dir / "sessions-index.json"
+    index_path = root / _project_key_for_path(work_dir) / "sessions-index.json"
     if not index_path.exists():
         try:
             resolved = work_dir.resolve()
         except Exception:
             resolved = work_dir
         if resolved != work_dir:
-            alt_key = _project_key_for_path(resolved)
-            index_path = root / alt_key / "sessions-index.json"
-            project_dir = root / alt_key
+            index_path = root / _project_key_for_path(resolved) / "sessions-index.json"
     if not index_path.exists():
         return None
 
-    try:
-        payload = json.loads(index_path.read_text(encoding="utf-8", errors="replace"))
-    except Exception:
-        return None
-
-    entries = payload.get("entries") if isinstance(payload, dict) else None
-    if not isinstance(entries, list):
-        return None
-
-    best_path: Optional[Path] = None
-    best_mtime = -1
-    for entry in entries:
-        if not isinstance(entry, dict):
-            continue
-        if entry.get("isSidechain") is True:
-            continue
-        project_path = entry.get("projectPath")
-        if isinstance(project_path, str) and project_path.strip():
-            normalized = _normalize_project_path(project_path)
-            if candidates and normalized and normalized not in candidates:
-                continue
-        elif candidates:
-            continue
-        full_path = entry.get("fullPath")
-        if not isinstance(full_path, str) or not full_path.strip():
-            continue
-        try:
-            session_path = Path(full_path).expanduser()
-        except Exception:
-            continue
-        if not session_path.is_absolute():
-            session_path = (project_dir / session_path).expanduser()
-        if not session_path.exists():
-            continue
-        mtime_raw = entry.get("fileMtime")
-        mtime = None
-        if isinstance(mtime_raw, (int, float)):
-            mtime = int(mtime_raw)
-        elif isinstance(mtime_raw, str) and mtime_raw.strip().isdigit():
-            try:
-                mtime = int(mtime_raw.strip())
-            except Exception:
-                mtime = None
-        if mtime is None:
-            try:
-                mtime = int(session_path.stat().st_mtime * 1000)
-            except OSError:
-                mtime = None
-        if mtime is None:
-            continue
-        if mtime > best_mtime:
-            best_mtime = mtime
-            best_path = session_path
-    return best_path
+    return latest_indexed_session(index_path, candidates, _normalize_project_path)
 
 
 def _should_overwrite_binding(current: Optional[Path], candidate: Path) -> bool:
@@ -414,16 +317,23 @@ class LaskdSessionRegistry:
         self._lock = threading.Lock()
         self._sessions: dict[str, _SessionEntry] = {}  # work_dir -> entry
         self._stop = threading.Event()
+        # Set by pushed pane-death events (pane_events) to run the next check immediately.
+        self._wake = threading.Event()
         self._monitor_thread: Optional[threading.Thread] = None
         self._claude_root = claude_root
 
     def start_monitor(self) -> None:
         if self._monitor_thread is None:
+            pane_events.subscribe(self._on_pane_event)
             self._monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
             self._monitor_thread.start()
 
     def stop_monitor(self) -> None:
         self._stop.set()
+        self._wake.set()
+
+    def _on_pane_event(self, pane_id: str, event: str) -> None:
+        self._wake.set()
 
     def get_session(self, work_dir: Path) -> Optional[ClaudeProjectSession]:
         key = str(work_dir)
@@ -474,7 +384,7 @@ class LaskdSessionRegistry:
             self._sessions[key] = entry
 
     def _load_and_cache(self, work_dir: Path) -> Optional[_SessionEntry]:
-        session = load_project_session(work_dir)
+        session = session_handles.get(work_dir).session
         session_file = session.session_file if session else (find_project_session_file(work_dir) or (work_dir / ".ccb_config" / ".claude-session"))
         mtime = 0.0
         if session_file.exists():
@@ -519,7 +429,11 @@ class LaskdSessionRegistry:
                 _write_log(f"[INFO] Session removed: {work_dir}")
 
     def _monitor_loop(self) -> None:
-        while not self._stop.wait(self.CHECK_INTERVAL):
+        while not self._stop.is_set():
+            self._wake.wait(self.CHECK_INTERVAL)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
             self._check_all_sessions()
 
     def _check_all_sessions(self) -> None:
@@ -530,11 +444,13 @@ class LaskdSessionRegistry:
         with self._lock:
             snapshot = [(key, entry.work_dir) for key, entry in self._sessions.items() if entry.valid]
 
-        for key, work_dir in snapshot:
-            try:
-                self._check_one(key, work_dir, now=now, refresh_interval_s=refresh_interval_s, scan_limit=scan_limit)
-            except Exception:
-                continue
+        # Every session's pane check is answered from one pane listing taken for this sweep.
+        with pane_sweep():
+            for key, work_dir in snapshot:
+                try:
+                    self._check_one(key, work_dir, now=now, refresh_interval_s=refresh_interval_s, scan_limit=scan_limit)
+                except Exception:
+                    continue
 
         with self._lock:
             keys_to_remove: list[str] = []
@@ -574,7 +490,7 @@ class LaskdSessionRegistry:
                 return
             file_changed = bool((entry.session_file != session_file) or (entry.file_mtime != current_mtime))
             if file_changed or (entry.session is None):
-                session = load_project_session(work_dir)
+                session = session_handles.get(work_dir).session
                 entry.session = session
                 entry.session_file = session_file
                 entry.file_mtime = current_mtime
@@ -8,13 +8,19 @@ from typing import Optional, Tuple
 
 from ccb_config import apply_backend_env
 from claude_session_resolver import resolve_claude_session
+from pane_registry import registry_signature
 from project_id import compute_ccb_project_id
-from session_utils import safe_write_session
+from session_cache import SessionHandleCache
+from session_utils import find_project_session_file as _find_project_session_file, safe_write_session
 from terminal import get_backend_for_session
 
 apply_backend_env()
 
 
+def find_project_session_file(work_dir: Path) -> Optional[Path]:
+    return _find_project_session_file(work_dir, ".claude-session")
+
+
 def _now_str() -> str:
     return time.strftime("%Y-%m-%d %H:%M:%S")
 
@@ -136,3 +142,13 @@ def compute_session_key(session: ClaudeProjectSession) -> str:
         except Exception:
             pid = ""
     return f"claude:{pid}" if pid else "claude:unknown"
+
+
+# Shared by the daemon's submit path, session workers and monitor (see session_cache.SessionHandleCache).
+# Resolution merges the pane registry, so a registry write also invalidates the cached session.
+session_handles: SessionHandleCache[ClaudeProjectSession] = SessionHandleCache(
+    load_project_session,
+    compute_session_key,
+    locate=find_project_session_file,
+    extra_sig=lambda _work_dir: registry_signature(),
+)
@@ -0,0 +1,159 @@
+"""
+Zero-copy line access to append-only JSONL session logs via mmap.
+
+Whole-log and tail scans (`latest_message`, the turn index behind `cpend`/`lpend`/`dpend`) used to
+read the file in chunks and glue them together (`buffer = chunk + buffer`), allocating the scanned
+region several times over. `LogMap` maps the file read-only and hands out (start, end) line spans;
+filters run as `find` on the mapping and only lines that pass are decoded (see
+`jsonl_tail.decode_json_span`), so the scan itself allocates next to nothing.
+
+A map covers the file as it was when opened: bytes appended later are simply not seen (open a new
+map to pick them up). Touching a mapped page past the end of a truncated file raises SIGBUS, which
+would kill the whole daemon, so a scan re-checks the file size (one fstat) before its first access
+and every time it resumes after yielding a line, since the caller may have paused there for any
+length of time; `view`/`decode` of anything but the line just yielded check it too.
+Once the file is seen to have shrunk, the mapping is dropped for a plain read of what is left,
+`size` is clamped to the new end and `truncated` is set; a scan that notices it mid-way stops early.
+CCB_LOG_MMAP=0 (or a platform/file that cannot be mapped) falls back to one plain read.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+from pathlib import Path
+from typing import Any, Iterator, Optional, Sequence
+
+from jsonl_tail import decode_json_span
+
+
+def _mmap_enabled() -> bool:
+    return (os.environ.get("CCB_LOG_MMAP") or "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+class LogMap:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._fh = open(self.path, "rb")
+        self.size = os.fstat(self._fh.fileno()).st_size
+        self.mapped = False
+        self.truncated = False
+        self.buf: Any = b""
+        self._map: Optional[mmap.mmap] = None
+        # Span of the line just yielded by a scan, whose pages were confirmed to lie within the file.
+        self._window = (0, 0)
+        if self.size and _mmap_enabled():
+            try:
+                self._map = self.buf = mmap.mmap(self._fh.fileno(), self.size, access=mmap.ACCESS_READ)
+                self.mapped = True
+            except (OSError, ValueError):
+                self.buf = b""
+        if not self.mapped and self.size:
+            self.buf = self._fh.read(self.size)
+            self.size = len(self.buf)
+
+    @classmethod
+    def open(cls, path: Path) -> Optional["LogMap"]:
+        try:
+            return cls(path)
+        except OSError:
+            return None
+
+    def close(self) -> None:
+        if self._map is not None:
+            try:
+                self._map.close()
+            except Exception:
+                pass
+            self._map = None
+        self.buf = b""
+        try:
+            self._fh.close()
+        except Exception:
+            pass
+
+    def __enter__(self) -> "LogMap":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _clamp(self) -> bool:
+        """Re-read the file size; True if it shrank just now (`size` clamped, mapping dropped)."""
+        if self._map is None:
+            return False
+        try:
+            current = os.fstat(self._fh.fileno()).st_size
+        except OSError:
+            current = 0
+        if current >= self.size:
+            return False
+        self.size = current
+        self.truncated = True
+        if self.mapped:
+            self._unmap()
+        return True
+
+    def _unmap(self) -> None:
+        # The mapping itself stays open until close(): views handed out earlier may still export it.
+        try:
+            self._fh.seek(0)
+            data = self._fh.read(self.size)
+        except OSError:
+            data = b""
+        self.buf = data
+        self.size = len(data)
+        self.mapped = False
+
+    def _check(self, start: int, end: int) -> None:
+        """Confirm [start, end) is still backed by the file before touching the mapping."""
+        lo, hi = self._window
+        if self.mapped and not (lo <= start and end <= hi):
+            self._clamp()
+
+    def _shrunk(self) -> bool:
+        self._clamp()
+        return self.truncated
+
+    def view(self, start: int, end: int) -> memoryview:
+        self._check(start, end)
+        return memoryview(self.buf)[start : min(end, self.size)]
+
+    def decode(self, start: int, end: int, markers: Sequence[bytes] = (), *, reject: Sequence[bytes] = ()) -> Any:
+        self._check(start, end)
+        return decode_json_span(self.buf, start, min(end, self.size), markers, reject=reject)
+
+    def lines(self, start: int = 0) -> Iterator[tuple[int, int]]:
+        """(start, end) of each complete line from `start` on, oldest first; a final partial line is skipped."""
+        self._clamp()
+        pos = max(0, int(start))
+        while pos < self.size:
+            nl = self.buf.find(b"\n", pos, self.size)
+            if nl < 0:
+                return
+            self._window = (pos, nl)
+            yield pos, nl
+            pos = nl + 1
+            if self._clamp():
+                return
+
+    def lines_reverse(self, *, max_bytes: Optional[int] = None) -> Iterator[tuple[int, int]]:
+        """(start, end) of each line, newest first, within the last `max_bytes` (a cut-off first line is skipped)."""
+        # The tail is touched first, so the size is checked before any access.
+        self._clamp()
+        floor = 0 if max_bytes is None else max(0, self.size - int(max_bytes))
+        end = self.size
+        if end and self.buf[end - 1 : end] == b"\n":
+            end -= 1
+        while True:
+            nl = self.buf.rfind(b"\n", floor, end)
+            if nl < 0:
+                if floor == 0 and end > 0:
+                    self._window = (0, end)
+                    yield 0, end
+                return
+            self._window = (nl + 1, end)
+            yield nl + 1, end
+            end = nl
+            if self._clamp():
+                return
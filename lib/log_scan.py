@@ -0,0 +1,184 @@
+"""
+Cold scans of provider session-log trees built on os.scandir and a small thread pool.
+
+On WSL `/mnt/c` and network home directories every readdir/stat/open is a round trip, so the
+old `Path.glob("**/*.jsonl")` + `stat()` + header-open pattern was bound by serial syscall
+latency. Here each directory of a level is listed (and its files stat'ed) in parallel, and
+per-file metadata reads go through the same bounded pool. Results are plain data, so callers
+pick their top-N by mtime exactly as before.
+"""
+
+from __future__ import annotations
+
+import heapq
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = (os.environ.get(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except Exception:
+        return default
+
+
+def scan_workers() -> int:
+    """Pool size for cold scans (CCB_SCAN_WORKERS, default 8; 1 scans serially)."""
+    return max(1, min(64, _env_int("CCB_SCAN_WORKERS", 8)))
+
+
+@dataclass(frozen=True)
+class ScannedFile:
+    path: str
+    mtime_ns: int
+    size: int
+
+
+def scan_dir(
+    path: str, match: Callable[[str], bool], include_hidden: bool = False
+) -> tuple[list[str], list[ScannedFile]]:
+    """(subdirectories, matching files) directly inside `path`; an unreadable directory is empty."""
+    subdirs: list[str] = []
+    files: list[ScannedFile] = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    # Like Path.rglob, symlinked directories are not descended into (a link cycle
+                    # would otherwise recurse forever); symlinked files still match.
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                        continue
+                    if not match(entry.name):
+                        continue
+                    if not include_hidden and entry.name.startswith("."):
+                        continue
+                    if not entry.is_file():
+                        continue
+                    # DirEntry caches the stat result (free on Windows, one call here otherwise).
+                    st = entry.stat()
+                except OSError:
+                    continue
+                files.append(ScannedFile(entry.path, int(st.st_mtime_ns), int(st.st_size)))
+    except OSError:
+        pass
+    return subdirs, files
+
+
+_pools: dict[int, ThreadPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def _pool(workers: int) -> ThreadPoolExecutor:
+    # Shared and long-lived: index refreshes run every second and must not pay for thread start-up.
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ccb-scan")
+            _pools[workers] = pool
+        return pool
+
+
+def map_bounded(fn: Callable[[T], R], items: Iterable[T], *, workers: Optional[int] = None) -> list[R]:
+    """
+    `[fn(x) for x in items]`, run on a bounded pool when there is more than one item.
+
+    `fn` must not call map_bounded itself (the pool is shared).
+    """
+    items = list(items)
+    workers = scan_workers() if workers is None else max(1, int(workers))
+    if workers <= 1 or len(items) <= 1:
+        return [fn(x) for x in items]
+    return list(_pool(workers).map(fn, items))
+
+
+def scan_dirs(
+    dirs: Iterable[str],
+    match: Callable[[str], bool],
+    *,
+    include_hidden: bool = False,
+    workers: Optional[int] = None,
+) -> list[ScannedFile]:
+    """Matching files directly inside each of `dirs` (non-recursive), listed in parallel."""
+    out: list[ScannedFile] = []
+    for _subdirs, files in map_bounded(lambda d: scan_dir(d, match, include_hidden), dirs, workers=workers):
+        out.extend(files)
+    return out
+
+
+def scan_tree(
+    root: str,
+    match: Callable[[str], bool],
+    *,
+    include_hidden: bool = False,
+    workers: Optional[int] = None,
+) -> list[ScannedFile]:
+    """Every matching file under `root`, walking one directory level at a time in parallel."""
+    out: list[ScannedFile] = []
+    level = [str(root)]
+    while level:
+        next_level: list[str] = []
+        for subdirs, files in map_bounded(lambda d: scan_dir(d, match, include_hidden), level, workers=workers):
+            next_level.extend(subdirs)
+            out.extend(files)
+        level = next_level
+    return out
+
+
+def newest(files: Iterable[ScannedFile], n: int) -> list[ScannedFile]:
+    """Top `n` files by mtime, newest first."""
+    return heapq.nlargest(max(0, int(n)), files, key=lambda f: f.mtime_ns)
+
+
+class IrregularLayout(ValueError):
+    """The tree is not (only) YYYY/MM/DD partitions; callers fall back to a full scan."""
+
+
+def _numeric_subdirs(path: str, width: int, match: Callable[[str], bool]) -> list[tuple[int, str]]:
+    out: list[tuple[int, str]] = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    continue
+                if not is_dir:
+                    if match(entry.name):
+                        raise IrregularLayout(entry.path)
+                    continue
+                if len(entry.name) != width or not entry.name.isdigit():
+                    raise IrregularLayout(entry.path)
+                out.append((int(entry.name), entry.path))
+    except OSError:
+        return []
+    out.sort(reverse=True)
+    return out
+
+
+def iter_date_partitions(root: str, match: Callable[[str], bool]) -> Iterator[tuple[date, str]]:
+    """
+    Day directories of a `root/YYYY/MM/DD/` tree, newest first, listed lazily.
+
+    Only the year/month directories actually reached are read, so a caller that stops after
+    today's partition pays for a handful of scandir calls. Raises IrregularLayout when a
+    matching file or a non-date directory sits above the day level.
+    """
+    for year, year_path in _numeric_subdirs(root, 4, match):
+        for month, month_path in _numeric_subdirs(year_path, 2, match):
+            for day, day_path in _numeric_subdirs(month_path, 2, match):
+                try:
+                    day_date = date(year, month, day)
+                except ValueError:
+                    raise IrregularLayout(day_path) from None
+                yield day_date, day_path
@@ -10,8 +10,9 @@ from typing import Optional
 
 from worker_pool import BaseSessionWorker, PerSessionWorkerPool
 
-from oaskd_protocol import OaskdRequest, OaskdResult, is_done_text, make_req_id, strip_done_text, wrap_opencode_prompt
-from oaskd_session import load_project_session
+from oaskd_protocol import OaskdRequest, OaskdResult, make_req_id, wrap_opencode_prompt
+from ccb_protocol import DoneDetector, normalize_priority
+from oaskd_session import OpenCodeProjectSession, session_handles
 from opencode_comm import OpenCodeLogReader
 from process_lock import ProviderLock
 from terminal import get_backend_for_session
@@ -19,6 +20,9 @@ from askd_runtime import state_file_path, log_path, write_log, random_token
 from env_utils import env_bool
 import askd_rpc
 from askd_server import AskDaemonServer
+from askd_reactor import get_reactor
+from poll_schedule import poll_cadence
+import pane_events
 from providers import OASKD_SPEC
 from project_id import compute_ccb_project_id
 
@@ -33,9 +37,9 @@ def _cancel_detection_enabled(default: bool = False) -> bool:
     return env_bool("CCB_OASKD_CANCEL_DETECT", default)
 
 
-def _tail_state_for_session(log_reader: OpenCodeLogReader) -> dict:
-    # OpenCode reader uses storage files, not an append-only log; a fresh capture_state is enough.
-    return log_reader.capture_state()
+def _reader_key(session: OpenCodeProjectSession) -> tuple[str, str | None]:
+    # OpenCode reader uses storage files, not an append-only log; the session id filter is its binding.
+    return (session.work_dir, session.opencode_session_id_filter)
 
 
 @dataclass
@@ -63,7 +67,7 @@ class _SessionWorker(BaseSessionWorker[_QueuedTask, OaskdResult]):
         started_ms = _now_ms()
         req = task.request
         work_dir = Path(req.work_dir)
-        write_log(log_path(OASKD_SPEC.log_file_name), f"[INFO] start session={self.session_key} req_id={task.req_id} work_dir={req.work_dir}")
+        write_log(log_path(OASKD_SPEC.log_file_name), f"[INFO] start session={self.session_key} req_id={task.req_id} priority={req.priority} work_dir={req.work_dir}")
 
         # Cross-process serialization: if another client falls back to direct mode, it uses the same
         # per-session ProviderLock ("opencode", cwd=f"session:{session_key}"). Without this, daemon and
@@ -84,7 +88,7 @@ class _SessionWorker(BaseSessionWorker[_QueuedTask, OaskdResult]):
             )
 
         try:
-            session = load_project_session(work_dir)
+            session = session_handles.get(work_dir).session
             if not session:
                 return OaskdResult(
                     exit_code=1,
@@ -118,14 +122,16 @@ class _SessionWorker(BaseSessionWorker[_QueuedTask, OaskdResult]):
                     done_ms=None,
                 )
 
-            log_reader = OpenCodeLogReader(
-                work_dir=Path(session.work_dir),
-                # Prefer storage-based autodetection for robustness across OpenCode restarts/updates and
-                # to avoid relying on git-derived project ids when possible.
-                project_id="global",
-                session_id_filter=session.opencode_session_id_filter,
+            log_reader, state = self._acquire_reader(
+                _reader_key(session),
+                lambda: OpenCodeLogReader(
+                    work_dir=Path(session.work_dir),
+                    # Prefer storage-based autodetection for robustness across OpenCode restarts/updates and
+                    # to avoid relying on git-derived project ids when possible.
+                    project_id="global",
+                    session_id_filter=session.opencode_session_id_filter,
+                ),
             )
-            state = _tail_state_for_session(log_reader)
             # Persist OpenCode storage bindings for future runs (best-effort).
             try:
                 storage_sid = state.get("session_id")
@@ -138,8 +144,9 @@ class _SessionWorker(BaseSessionWorker[_QueuedTask, OaskdResult]):
             cancel_cursor = log_reader.open_cancel_log_cursor() if cancel_enabled and session_id else None
             cancel_since_s = time.time() if cancel_enabled else 0.0
 
-            prompt = wrap_opencode_prompt(req.message, task.req_id)
+            prompt = wrap_opencode_prompt(self._spool_message(session.work_dir, req.message), task.req_id)
             backend.send_text(pane_id, prompt)
+            cadence = poll_cadence(OASKD_SPEC.daemon_key, self.session_key)
 
             # Async mode: when timeout_s == 0, only ensure the prompt is injected (serialized via the lock)
             # and return immediately without waiting for OpenCode storage to update.
@@ -154,27 +161,33 @@ class _SessionWorker(BaseSessionWorker[_QueuedTask, OaskdResult]):
                 )
 
             deadline = None if float(req.timeout_s) < 0.0 else (time.time() + float(req.timeout_s))
-            chunks: list[str] = []
+            detector = DoneDetector(task.req_id)
             done_seen = False
             done_ms: int | None = None
 
             pane_check_interval = float(os.environ.get("CCB_OASKD_PANE_CHECK_INTERVAL", "2.0") or "2.0")
             last_pane_check = time.time()
+            reactor = get_reactor()
 
             while True:
                 if deadline is not None:
                     remaining = deadline - time.time()
                     if remaining <= 0:
                         break
-                    wait_step = min(remaining, 1.0)
+                    wait_step = remaining
                 else:
-                    wait_step = 1.0
+                    wait_step = pane_check_interval
 
-                if time.time() - last_pane_check >= pane_check_interval:
+                # A pushed pane-death event (tmux hook -> pane_events) forces the check right away.
+                pane_pushed = pane_events.died_since(pane_id, started_ms / 1000.0)
+                if pane_pushed or time.time() - last_pane_check >= pane_check_interval:
                     try:
                         alive = bool(backend.is_alive(pane_id))
                     except Exception:
                         alive = False
+                    if alive and pane_pushed:
+                        # Respawned in place since the event: nothing to fail.
+                        pane_events.clear(pane_id)
                     if not alive:
                         write_log(log_path(OASKD_SPEC.log_file_name), f"[ERROR] Pane {pane_id} died during request session={self.session_key} req_id={task.req_id}")
                         return OaskdResult(
@@ -187,7 +200,8 @@ class _SessionWorker(BaseSessionWorker[_QueuedTask, OaskdResult]):
                         )
                     last_pane_check = time.time()
 
-                reply, state = log_reader.wait_for_message(state, wait_step)
+                wait_s = max(0.0, min(wait_step, log_reader.force_read_interval, last_pane_check + pane_check_interval - time.time()))
+                reply, state = reactor.read_or_wait(log_reader.try_get_message, log_reader.watch_paths, state, wait_s, cadence=cadence)
 
                 # Detect user cancellation using OpenCode server logs (handles the race where storage isn't updated).
                 if cancel_enabled and session_id and cancel_cursor is not None:
@@ -235,15 +249,14 @@ class _SessionWorker(BaseSessionWorker[_QueuedTask, OaskdResult]):
 
                 if not reply:
                     continue
-                chunks.append(reply)
-                combined = "\n".join(chunks)
-                if is_done_text(combined, task.req_id):
+                if detector.feed(reply):
                     done_seen = True
                     done_ms = _now_ms() - started_ms
                     break
 
-            combined = "\n".join(chunks)
-            final_reply = strip_done_text(combined, task.req_id)
+            cadence.finish(anchor_ms=None, done_ms=done_ms)
+            final_reply = detector.reply()
+            self._park_reader(_reader_key(session), log_reader, state)
 
             return OaskdResult(
                 exit_code=0 if done_seen else 2,
@@ -265,7 +278,7 @@ class _WorkerPool:
         req_id = make_req_id()
         task = _QueuedTask(request=request, created_ms=_now_ms(), req_id=req_id, done_event=threading.Event())
 
-        session = load_project_session(Path(request.work_dir))
+        session = session_handles.get(Path(request.work_dir)).session
         ccb_project_id = ""
         try:
             if session:
@@ -282,15 +295,19 @@ class _WorkerPool:
             ccb_project_id = ""
         session_key = f"opencode:{ccb_project_id}" if ccb_project_id else "opencode:unknown"
 
-        worker = self._pool.get_or_create(session_key, _SessionWorker)
-        worker.enqueue(task)
+        worker = self._pool.submit(session_key, _SessionWorker, task)
         try:
             qsize = int(worker._q.qsize())
         except Exception:
             qsize = -1
-        write_log(log_path(OASKD_SPEC.log_file_name), f"[INFO] enqueued session={session_key} req_id={req_id} qsize={qsize} client_id={request.client_id}")
+        write_log(log_path(OASKD_SPEC.log_file_name), f"[INFO] enqueued session={session_key} req_id={req_id} qsize={qsize} priority={request.priority} client_id={request.client_id}")
         return task
 
+    def stats(self) -> dict:
+        stats = self._pool.stats()
+        stats["session_cache"] = session_handles.stats()
+        return stats
+
 
 class OaskdServer:
     def __init__(self, host: str = "127.0.0.1", port: int = 0, *, state_file: Optional[Path] = None):
@@ -310,6 +327,7 @@ class OaskdServer:
                     quiet=bool(msg.get("quiet") or False),
                     message=str(msg.get("message") or ""),
                     output_path=str(msg.get("output_path")) if msg.get("output_path") else None,
+                    priority=normalize_priority(msg.get("priority")),
                 )
             except Exception as exc:
                 return {"type": "oask.response", "v": 1, "id": msg.get("id"), "exit_code": 1, "reply": f"Bad request: {exc}"}
@@ -334,6 +352,7 @@ class OaskdServer:
                 "reply": result.reply,
                 "meta": {
                     "session_key": result.session_key,
+                    "priority": req.priority,
                     "done_seen": result.done_seen,
                     "done_ms": result.done_ms,
                 },
@@ -346,6 +365,7 @@ class OaskdServer:
             token=self.token,
             state_file=self.state_file,
             request_handler=_handle_request,
+            stats_handler=self.pool.stats,
             request_queue_size=128,
             on_stop=self._cleanup_state_file,
         )
@@ -381,3 +401,8 @@ def ping_daemon(timeout_s: float = 0.5, state_file: Optional[Path] = None) -> bo
 def shutdown_daemon(timeout_s: float = 1.0, state_file: Optional[Path] = None) -> bool:
     state_file = state_file or state_file_path(OASKD_SPEC.state_file_name)
     return askd_rpc.shutdown_daemon("oask", timeout_s, state_file)
+
+
+def request_stats(timeout_s: float = 0.5, state_file: Optional[Path] = None) -> Optional[dict]:
+    state_file = state_file or state_file_path(OASKD_SPEC.state_file_name)
+    return askd_rpc.request_stats("oask", timeout_s, state_file)
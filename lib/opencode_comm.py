@@ -13,12 +13,14 @@ import re
 import shutil
 import sys
 import time
+from collections import OrderedDict
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 from ccb_protocol import REQ_ID_PREFIX
 from ccb_config import apply_backend_env
+from askd_reactor import wait_for_change_or_sleep, watch_baseline
 from i18n import t
 from terminal import get_backend_for_session, get_pane_id_from_session
 from session_utils import find_project_session_file, safe_write_session
@@ -315,6 +317,111 @@ def _parse_opencode_log_epoch_s(line: str) -> float | None:
         return None
 
 
+class _DirListing:
+    __slots__ = ("dir_mtime_ns", "listed_at_ns", "verified_at", "files", "order")
+
+    def __init__(self) -> None:
+        self.dir_mtime_ns = -1
+        self.listed_at_ns = 0
+        self.verified_at = 0.0
+        self.files: dict[str, tuple[int, int, dict]] = {}
+        self.order: list[str] = []
+
+
+class _JsonDirCache:
+    """
+    Parsed `<prefix>*.json` files per storage directory, revalidated with as few stats as possible.
+
+    OpenCode ids (msg_/prt_) are time-sortable, so file names give creation order. While a
+    directory's mtime is unchanged nothing was added or removed, and only the newest `recheck`
+    files (the ones still rewritten while a reply streams) are re-stat'ed. A changed (or too recent
+    to trust) directory mtime re-lists it, and only files whose (mtime_ns, size) moved are parsed
+    again. Every `full_interval` seconds all files are re-stat'ed to catch older in-place edits.
+    """
+
+    def __init__(self, prefix: str, loader, *, recheck: int = 2, full_interval: float = 1.0, max_dirs: int = 64):
+        self._prefix = prefix
+        self._loader = loader
+        self._recheck = max(1, int(recheck))
+        self._full_interval = max(0.0, float(full_interval))
+        self._max_dirs = max(1, int(max_dirs))
+        self._dirs: "OrderedDict[str, _DirListing]" = OrderedDict()
+        self.counters = {"lists": 0, "parses": 0, "stats": 0}
+
+    def load(self, directory: Path) -> list[dict]:
+        key = str(directory)
+        try:
+            dir_mtime_ns = os.stat(key).st_mtime_ns
+        except OSError:
+            self._dirs.pop(key, None)
+            return []
+        self.counters["stats"] += 1
+        listing = self._dirs.get(key)
+        if listing is None:
+            listing = _DirListing()
+            self._dirs[key] = listing
+            while len(self._dirs) > self._max_dirs:
+                self._dirs.popitem(last=False)
+        else:
+            self._dirs.move_to_end(key)
+
+        now = time.monotonic()
+        # Coarse (1s) directory mtimes cannot prove nothing was added in the second we listed in.
+        racy = dir_mtime_ns >= listing.listed_at_ns - 1_000_000_000
+        if dir_mtime_ns != listing.dir_mtime_ns or racy:
+            self._relist(key, listing, dir_mtime_ns)
+            listing.verified_at = now
+        elif now - listing.verified_at >= self._full_interval:
+            self._refresh(key, listing, listing.order)
+            listing.verified_at = now
+        else:
+            self._refresh(key, listing, listing.order[-self._recheck :])
+        return [listing.files[name][2] for name in listing.order if name in listing.files]
+
+    def _relist(self, key: str, listing: _DirListing, dir_mtime_ns: int) -> None:
+        self.counters["lists"] += 1
+        listed_at_ns = time.time_ns()
+        files: dict[str, tuple[int, int, dict]] = {}
+        try:
+            with os.scandir(key) as it:
+                entries = [e for e in it if e.name.startswith(self._prefix) and e.name.endswith(".json")]
+        except OSError:
+            entries = []
+        for entry in entries:
+            try:
+                if not entry.is_file():
+                    continue
+                st = entry.stat()
+            except OSError:
+                continue
+            self.counters["stats"] += 1
+            files[entry.name] = self._entry(entry.path, st, listing.files.get(entry.name))
+        listing.files = files
+        listing.order = sorted(files)
+        listing.dir_mtime_ns = dir_mtime_ns
+        listing.listed_at_ns = listed_at_ns
+
+    def _refresh(self, key: str, listing: _DirListing, names: list[str]) -> None:
+        for name in names:
+            path = os.path.join(key, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                listing.files.pop(name, None)
+                continue
+            self.counters["stats"] += 1
+            listing.files[name] = self._entry(path, st, listing.files.get(name))
+
+    def _entry(self, path: str, st: os.stat_result, cached: Optional[tuple[int, int, dict]]) -> tuple[int, int, dict]:
+        sig = (int(st.st_mtime_ns), int(st.st_size))
+        if cached is not None and cached[:2] == sig:
+            return cached
+        self.counters["parses"] += 1
+        payload = self._loader(Path(path))
+        payload["_path"] = path
+        return sig[0], sig[1], payload
+
+
 class OpenCodeLogReader:
     """
     Reads OpenCode session/message/part JSON files.
@@ -361,6 +468,8 @@ class OpenCodeLogReader:
         except Exception:
             force = 1.0
         self._force_read_interval = min(5.0, max(0.2, force))
+        self._message_cache = _JsonDirCache("msg_", self._load_json, full_interval=self._force_read_interval)
+        self._part_cache = _JsonDirCache("prt_", self._load_json, full_interval=self._force_read_interval)
 
     def _session_dir(self) -> Path:
         return self.root / "session" / self.project_id
@@ -561,65 +670,33 @@ class OpenCodeLogReader:
         return None
 
     def _read_messages(self, session_id: str) -> List[dict]:
-        message_dir = self._message_dir(session_id)
-        if not message_dir.exists():
-            return []
-        messages: list[dict] = []
-        try:
-            paths = [p for p in message_dir.glob("msg_*.json") if p.is_file()]
-        except Exception:
-            paths = []
-        for path in paths:
-            payload = self._load_json(path)
-            if payload.get("sessionID") != session_id:
-                continue
-            payload["_path"] = str(path)
-            messages.append(payload)
-        # Sort by created time (ms), fallback to mtime
-        def _key(m: dict) -> tuple[int, float, str]:
+        # Cached payloads are shared between polls: callers must not mutate them.
+        messages = [m for m in self._message_cache.load(self._message_dir(session_id)) if m.get("sessionID") == session_id]
+
+        # Sort by created time (ms), then by the time-sortable message id
+        def _key(m: dict) -> tuple[int, str]:
             created = (m.get("time") or {}).get("created")
             try:
                 created_i = int(created)
             except Exception:
                 created_i = -1
-            try:
-                mtime = Path(m.get("_path", "")).stat().st_mtime if m.get("_path") else 0.0
-            except Exception:
-                mtime = 0.0
             mid = m.get("id") if isinstance(m.get("id"), str) else ""
-            return created_i, mtime, mid
+            return created_i, mid
 
         messages.sort(key=_key)
         return messages
 
     def _read_parts(self, message_id: str) -> List[dict]:
-        part_dir = self._part_dir(message_id)
-        if not part_dir.exists():
-            return []
-        parts: list[dict] = []
-        try:
-            paths = [p for p in part_dir.glob("prt_*.json") if p.is_file()]
-        except Exception:
-            paths = []
-        for path in paths:
-            payload = self._load_json(path)
-            if payload.get("messageID") != message_id:
-                continue
-            payload["_path"] = str(path)
-            parts.append(payload)
+        parts = [p for p in self._part_cache.load(self._part_dir(message_id)) if p.get("messageID") == message_id]
 
-        def _key(p: dict) -> tuple[int, float, str]:
+        def _key(p: dict) -> tuple[int, str]:
             ts = (p.get("time") or {}).get("start")
             try:
                 ts_i = int(ts)
             except Exception:
                 ts_i = -1
-            try:
-                mtime = Path(p.get("_path", "")).stat().st_mtime if p.get("_path") else 0.0
-            except Exception:
-                mtime = 0.0
             pid = p.get("id") if isinstance(p.get("id"), str) else ""
-            return ts_i, mtime, pid
+            return ts_i, pid
 
         parts.sort(key=_key)
         return parts
@@ -647,7 +724,31 @@ class OpenCodeLogReader:
         return ""
 
     def capture_state(self) -> Dict[str, Any]:
-        session_entry = self._get_latest_session()
+        return self._capture_state_for(self._get_latest_session())
+
+    def resume_state(self, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Reuse a baseline left by a previous request for the same storage session, without rescanning sessions.
+
+        Only the bound session file is re-read: an unchanged `time.updated` keeps the baseline as-is, a newer
+        one re-baselines that session. Returns None when the session file is gone or no longer matches.
+        """
+        path = state.get("session_path")
+        session_id = state.get("session_id")
+        if not isinstance(path, Path) or not isinstance(session_id, str) or not session_id:
+            return None
+        payload = self._load_json(path)
+        if payload.get("id") != session_id:
+            return None
+        try:
+            updated_i = int((payload.get("time") or {}).get("updated"))
+        except Exception:
+            updated_i = -1
+        if updated_i == state.get("session_updated"):
+            return dict(state)
+        return self._capture_state_for({"path": path, "payload": payload})
+
+    def _capture_state_for(self, session_entry: Optional[dict]) -> Dict[str, Any]:
         if not session_entry:
             return {"session_id": None, "session_updated": -1, "assistant_count": 0, "last_assistant_id": None}
 
@@ -738,11 +839,12 @@ class OpenCodeLogReader:
             session_id = None
 
         while True:
+            baseline = watch_baseline(self.watch_paths(state))
             session_entry = self._get_latest_session()
             if not session_entry:
                 if not block:
                     return None, state
-                time.sleep(self._poll_interval)
+                wait_for_change_or_sleep(baseline, self._poll_interval, deadline)
                 if time.time() >= deadline:
                     return None, state
                 continue
@@ -764,7 +866,7 @@ class OpenCodeLogReader:
             if not current_session_id:
                 if not block:
                     return None, state
-                time.sleep(self._poll_interval)
+                wait_for_change_or_sleep(baseline, self._poll_interval, deadline)
                 if time.time() >= deadline:
                     return None, state
                 continue
@@ -797,7 +899,13 @@ class OpenCodeLogReader:
             if not block:
                 return None, state
 
-            time.sleep(self._poll_interval)
+            # Part files land in per-message dirs we do not watch; the forced-read cadence covers them.
+            wait_for_change_or_sleep(
+                baseline,
+                self._poll_interval,
+                deadline,
+                max_wait=last_forced_read + self._force_read_interval - time.time(),
+            )
             if time.time() >= deadline:
                 return None, state
 
@@ -807,6 +915,21 @@ class OpenCodeLogReader:
     def try_get_message(self, state: Dict[str, Any]) -> Tuple[Optional[str], Dict[str, Any]]:
         return self._read_since(state, timeout=0.0, block=False)
 
+    def watch_paths(self, state: Dict[str, Any]) -> List[Path]:
+        """Session file plus its message dir for the daemon reactor (parts are caught by force reads)."""
+        paths: List[Path] = [self._session_dir()]
+        session_path = state.get("session_path")
+        if session_path:
+            paths.append(Path(str(session_path)))
+        session_id = state.get("session_id")
+        if isinstance(session_id, str) and session_id:
+            paths.append(self._message_dir(session_id))
+        return paths
+
+    @property
+    def force_read_interval(self) -> float:
+        return self._force_read_interval
+
     def latest_message(self) -> Optional[str]:
         session_entry = self._get_latest_session()
         if not session_entry:
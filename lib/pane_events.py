@@ -0,0 +1,135 @@
+"""
+Push-based pane death events.
+
+`ccb up` installs tmux `pane-died` / `pane-exited` hooks on its session that run this module as a
+script (with the project's CCB_RUN_DIR):
+
+    python lib/pane_events.py died %12
+
+which sends `<prefix>.pane_event` to every running ask daemon over its local socket (the same
+token-authenticated RPC as ping/stats). In the daemon, `notify` records the death, drops the cached
+pane snapshot, wakes every reactor wait and tells the session registries to re-check their panes
+right away, so an in-flight request on that pane fails fast (see `died_since`) and the session is
+re-validated (or self-healed) without waiting for the next poll.
+
+Polling stays in place as the fallback: WezTerm has no CLI-installable pane-exit hook, and a tmux
+server started without the hooks behaves as before.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+HOOK_EVENTS = {"pane-died": "died", "pane-exited": "exited"}
+# Array slot used for our hooks, so user-defined hooks on the same events are left alone.
+HOOK_INDEX = 77
+
+_lock = threading.Lock()
+_dead: dict[str, float] = {}
+_listeners: list[Callable[[str, str], None]] = []
+
+
+def subscribe(listener: Callable[[str, str], None]) -> None:
+    with _lock:
+        if listener not in _listeners:
+            _listeners.append(listener)
+
+
+def notify(pane_id: str, event: str = "died") -> None:
+    """Record that `pane_id` died/exited and wake everything that may be waiting on it."""
+    pane_id = (pane_id or "").strip()
+    if not pane_id:
+        return
+    with _lock:
+        _dead[pane_id] = time.time()
+        listeners = list(_listeners)
+    try:
+        from terminal import invalidate_pane_snapshots
+
+        invalidate_pane_snapshots()
+    except Exception:
+        pass
+    try:
+        from askd_reactor import get_reactor
+
+        get_reactor().interrupt()
+    except Exception:
+        pass
+    for listener in listeners:
+        try:
+            listener(pane_id, event)
+        except Exception:
+            pass
+
+
+def clear(pane_id: str) -> None:
+    """Forget a death (the pane was respawned in place and keeps its id)."""
+    with _lock:
+        _dead.pop((pane_id or "").strip(), None)
+
+
+def died_since(pane_id: str, since: float) -> bool:
+    """True if a death event for `pane_id` arrived at or after wall-clock time `since`."""
+    with _lock:
+        at = _dead.get((pane_id or "").strip())
+    return at is not None and at >= since
+
+
+def pane_hook_command(
+    event: str,
+    *,
+    python: Optional[str] = None,
+    script: Optional[str] = None,
+    run_dir: Optional[str] = None,
+) -> str:
+    """tmux command (for `set-hook`) that reports the hook's pane to the daemons in the background.
+
+    `run_dir` pins CCB_RUN_DIR for the script: hooks run in the tmux server's environment, not the
+    project's, and the daemons' state files live under the project run dir.
+    """
+    import shlex
+
+    from tmux_control import quote_arg
+
+    python = python or sys.executable or "python3"
+    script = script or str(Path(__file__).resolve())
+    shell_cmd = f"{shlex.quote(python)} {shlex.quote(script)} {event} #{{hook_pane}}"
+    if run_dir:
+        shell_cmd = f"CCB_RUN_DIR={shlex.quote(str(run_dir))} {shell_cmd}"
+    return f"run-shell -b {quote_arg(shell_cmd)}"
+
+
+def notify_daemons(pane_id: str, event: str, *, timeout_s: float = 0.5) -> int:
+    """Send the event to every daemon with a state file; returns how many acknowledged it."""
+    import os
+
+    from askd_rpc import send_pane_event
+    from askd_runtime import state_file_path
+    from providers import CASKD_SPEC, DASKD_SPEC, GASKD_SPEC, LASKD_SPEC, OASKD_SPEC
+
+    delivered = 0
+    for spec in (CASKD_SPEC, LASKD_SPEC, GASKD_SPEC, OASKD_SPEC, DASKD_SPEC):
+        override = (os.environ.get(f"CCB_{spec.daemon_key.upper()}_STATE_FILE") or "").strip()
+        state_file = Path(override).expanduser() if override else state_file_path(spec.state_file_name)
+        if not state_file.exists():
+            continue
+        if send_pane_event(spec.protocol_prefix, timeout_s, state_file, pane_id=pane_id, event=event):
+            delivered += 1
+    return delivered
+
+
+def main(argv: list[str]) -> int:
+    if len(argv) < 3 or not argv[2].strip():
+        print("usage: pane_events.py <died|exited> <pane_id>", file=sys.stderr)
+        return 2
+    notify_daemons(argv[2].strip(), argv[1].strip())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    raise SystemExit(main(sys.argv))
@@ -9,7 +9,7 @@ from typing import Optional, Dict, Any, Iterable
 
 from cli_output import atomic_write_text
 from project_id import compute_ccb_project_id
-from terminal import get_backend_for_session
+from terminal import get_backend_for_session, pane_sweep
 
 REGISTRY_PREFIX = "ccb-session-"
 REGISTRY_SUFFIX = ".json"
@@ -41,6 +41,24 @@ def _iter_registry_files() -> Iterable[Path]:
     return sorted(registry_dir.glob(f"{REGISTRY_PREFIX}*{REGISTRY_SUFFIX}"))
 
 
+def registry_signature() -> tuple[tuple[str, int, int], ...]:
+    """(name, mtime_ns, size) of every registry file: changes whenever a record is written, added or removed."""
+    out: list[tuple[str, int, int]] = []
+    try:
+        entries = list(os.scandir(_registry_dir()))
+    except OSError:
+        return ()
+    for entry in entries:
+        if not (entry.name.startswith(REGISTRY_PREFIX) and entry.name.endswith(REGISTRY_SUFFIX)):
+            continue
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        out.append((entry.name, int(st.st_mtime_ns), int(st.st_size)))
+    return tuple(sorted(out))
+
+
 def _coerce_updated_at(value: Any, fallback_path: Optional[Path] = None) -> int:
     if isinstance(value, (int, float)):
         return int(value)
@@ -228,37 +246,39 @@ def load_registry_by_project_id(ccb_project_id: str, provider: str) -> Optional[
     best_ts = -1
     best_needs_migration = False
 
-    for path in _iter_registry_files():
-        data = _load_registry_file(path)
-        if not data:
-            continue
-        updated_at = _coerce_updated_at(data.get("updated_at"), path)
-        if _is_stale(updated_at):
-            continue
+    # One pane listing answers the liveness check of every scanned record.
+    with pane_sweep():
+        for path in _iter_registry_files():
+            data = _load_registry_file(path)
+            if not data:
+                continue
+            updated_at = _coerce_updated_at(data.get("updated_at"), path)
+            if _is_stale(updated_at):
+                continue
 
-        existing = (data.get("ccb_project_id") or "").strip()
-        inferred = ""
-        if not existing:
-            # Back-compat: infer from work_dir (no side effects while scanning).
-            wd = (data.get("work_dir") or "").strip()
-            if wd:
-                try:
-                    inferred = compute_ccb_project_id(Path(wd))
-                except Exception:
-                    inferred = ""
-        effective = existing or inferred
-
-        if effective != proj:
-            continue
+            existing = (data.get("ccb_project_id") or "").strip()
+            inferred = ""
+            if not existing:
+                # Back-compat: infer from work_dir (no side effects while scanning).
+                wd = (data.get("work_dir") or "").strip()
+                if wd:
+                    try:
+                        inferred = compute_ccb_project_id(Path(wd))
+                    except Exception:
+                        inferred = ""
+            effective = existing or inferred
 
-        if not _provider_pane_alive(data, prov):
-            continue
+            if effective != proj:
+                continue
 
-        # Prefer the newest record for this project+provider.
-        if updated_at > best_ts:
-            best = data
-            best_ts = updated_at
-            best_needs_migration = (not existing) and bool(inferred)
+            if not _provider_pane_alive(data, prov):
+                continue
+
+            # Prefer the newest record for this project+provider.
+            if updated_at > best_ts:
+                best = data
+                best_ts = updated_at
+                best_needs_migration = (not existing) and bool(inferred)
 
     if best and best_needs_migration:
         # Best-effort persistence: update only the winning record to include ccb_project_id.
@@ -0,0 +1,229 @@
+"""
+Opt-in pane output tap: `tmux pipe-pane` into a per-pane in-memory ring buffer.
+
+caskd/laskd detect "■ Conversation interrupted" by capturing the pane every pane-check interval
+(2s), and on WezTerm that capture is the whole scrollback. With CCB_PANE_TAP=1 the daemon instead
+pipes the provider pane's output (tmux `pipe-pane`) through a FIFO into a reader thread that keeps
+the last CCB_PANE_TAP_BYTES of it. Marks are absolute byte offsets, so "output since this request
+was sent" is exact, and a registered needle (e.g. the interrupt marker) showing up in new output
+wakes the reactor immediately.
+
+FIFOs live under `<run_dir>/pane-tap/` named `<pid>-<pane>.fifo`. The daemon closes its taps on
+shutdown; FIFOs left behind by daemons that died are swept when the first tap is attached.
+
+The tap is only used where it can work: tmux panes, POSIX (mkfifo), and panes that have no pipe of
+their own (an existing user `pipe-pane` is left alone). Everything else keeps capturing the pane.
+WezTerm has no output tap in its CLI.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import select
+import shlex
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+_ANSI_RE = re.compile(r"\x1b\[[0-?]*[ -/]*[@-~]|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)|\x1b[()][0-9A-Za-z]|\x1b[=>78]")
+# Bytes re-scanned before new output, so a needle split across reads is still found.
+_SCAN_OVERLAP = 512
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = (os.environ.get(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except Exception:
+        return default
+
+
+def tap_enabled() -> bool:
+    return (os.environ.get("CCB_PANE_TAP") or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def strip_ansi(text: str) -> str:
+    return _ANSI_RE.sub("", text)
+
+
+class PaneTap:
+    """Reader side of one pane's pipe: a FIFO drained by a thread into a bounded buffer."""
+
+    def __init__(self, pane_id: str, fifo: Path, *, capacity: Optional[int] = None):
+        self.pane_id = pane_id
+        self.fifo = fifo
+        self.capacity = max(4096, capacity if capacity is not None else _env_int("CCB_PANE_TAP_BYTES", 64 * 1024))
+        self._lock = threading.Lock()
+        self._buf = bytearray()
+        # Total bytes ever received; the buffer holds [written - len(_buf), written).
+        self.written = 0
+        self._scanned = 0
+        self._needles: set[str] = set()
+        self._stop = threading.Event()
+        # O_RDWR keeps a writer open on our side, so reads block instead of hitting EOF while the
+        # pipe command has not opened the FIFO yet (or between re-attaches).
+        self._fd = os.open(str(fifo), os.O_RDWR | os.O_NONBLOCK)
+        self._thread = threading.Thread(target=self._read_loop, name=f"pane-tap-{pane_id}", daemon=True)
+        self._thread.start()
+
+    def watch(self, needles: Iterable[str]) -> None:
+        with self._lock:
+            self._needles.update(n for n in needles if n)
+
+    def mark(self) -> int:
+        with self._lock:
+            return self.written
+
+    def feed(self, data: bytes) -> None:
+        if not data:
+            return
+        with self._lock:
+            self._buf += data
+            self.written += len(data)
+            if len(self._buf) > self.capacity:
+                del self._buf[: len(self._buf) - self.capacity]
+            needles = tuple(self._needles)
+            start = max(self._scanned - _SCAN_OVERLAP, self.written - len(self._buf))
+            fresh = bytes(self._buf[start - (self.written - len(self._buf)) :]) if needles else b""
+            self._scanned = self.written
+        if needles:
+            text = strip_ansi(fresh.decode("utf-8", errors="replace"))
+            if any(n in text for n in needles):
+                try:
+                    from askd_reactor import get_reactor
+
+                    get_reactor().interrupt()
+                except Exception:
+                    pass
+
+    def text_since(self, mark: int) -> str:
+        """Output received after `mark` (as much of it as the ring still holds), escape sequences removed."""
+        with self._lock:
+            base = self.written - len(self._buf)
+            data = bytes(self._buf[max(0, mark - base) :])
+        return strip_ansi(data.decode("utf-8", errors="replace"))
+
+    def seen(self, needle: str, *, since: int) -> bool:
+        return needle in self.text_since(since)
+
+    def _read_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                ready, _, _ = select.select([self._fd], [], [], 1.0)
+                if not ready:
+                    continue
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                continue
+            except Exception:
+                break
+            self.feed(data)
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=2.0)
+        for closer in (lambda: os.close(self._fd), self.fifo.unlink):
+            try:
+                closer()
+            except Exception:
+                pass
+
+
+_taps: dict[tuple[str, str], PaneTap] = {}
+_taps_lock = threading.Lock()
+_swept = False
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except Exception:
+        # EPERM: the pid exists but belongs to someone else.
+        return True
+    return True
+
+
+def sweep_stale(directory: Path) -> int:
+    """Remove FIFOs whose owning daemon (the `<pid>-` prefix) is no longer running; returns how many."""
+    removed = 0
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return 0
+    for entry in entries:
+        pid_text, sep, _rest = entry.name.partition("-")
+        if not sep or not entry.name.endswith(".fifo") or not pid_text.isdigit():
+            continue
+        pid = int(pid_text)
+        if pid == os.getpid() or _pid_alive(pid):
+            continue
+        try:
+            os.unlink(entry.path)
+            removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+def close_all() -> None:
+    """Close every tap this process opened (reader threads, fds and FIFOs); called on daemon shutdown."""
+    with _taps_lock:
+        taps = list(_taps.values())
+        _taps.clear()
+    for tap in taps:
+        try:
+            tap.close()
+        except Exception:
+            pass
+
+
+def _fifo_path(pane_id: str) -> Path:
+    from askd_runtime import run_dir
+
+    safe = re.sub(r"[^A-Za-z0-9_.-]", "_", pane_id)
+    return run_dir() / "pane-tap" / f"{os.getpid()}-{safe}.fifo"
+
+
+def tap_for(backend: object, pane_id: str, *, watch: Iterable[str] = ()) -> Optional[PaneTap]:
+    """The pane's tap (attached on first use, re-attached if the pipe closed), or None when not tapping."""
+    global _swept
+    if not tap_enabled() or not pane_id or not hasattr(os, "mkfifo"):
+        return None
+    pipe_open = getattr(backend, "pane_pipe_open", None)
+    pipe_pane = getattr(backend, "pipe_pane", None)
+    if pipe_open is None or pipe_pane is None:
+        return None
+    key = (" ".join(getattr(backend, "_tmux_base", lambda: ["tmux"])()), pane_id)
+    with _taps_lock:
+        tap = _taps.get(key)
+        try:
+            state = pipe_open(pane_id)
+            if state is None:
+                return None
+            if tap is None:
+                if state:
+                    # Someone else's pipe-pane: taking it over would cut them off.
+                    return None
+                fifo = _fifo_path(pane_id)
+                fifo.parent.mkdir(parents=True, exist_ok=True)
+                if not _swept:
+                    _swept = True
+                    sweep_stale(fifo.parent)
+                try:
+                    fifo.unlink()
+                except FileNotFoundError:
+                    pass
+                os.mkfifo(str(fifo), 0o600)
+                tap = PaneTap(pane_id, fifo)
+                _taps[key] = tap
+            if not state and not pipe_pane(pane_id, f"exec cat > {shlex.quote(str(tap.fifo))}"):
+                return None
+        except Exception:
+            return None
+    tap.watch(watch)
+    return tap
@@ -0,0 +1,93 @@
+"""
+Wait for a bracketed paste to be absorbed by the TUI before pressing Enter.
+
+Backends used to sleep a fixed delay between the paste and Enter (CCB_TMUX_ENTER_DELAY=0.5s,
+CCB_WEZTERM_PASTE_DELAY=0.1s), the full delay on every multi-line ask even when the TUI had long
+absorbed the paste, and under load sometimes still too short. Instead the backend probes a pane
+signature before the paste and then every CCB_PASTE_SETTLE_STEP seconds: the paste has landed once
+the signature differs from the pre-paste one and then stays unchanged for CCB_PASTE_SETTLE_QUIET
+seconds. The signature is, on tmux, the cursor position and history size plus a hash of the visible
+screen (`capture-pane`), so a paste that collapses into "[Pasted Content]" without moving the cursor
+still counts as a change; on WezTerm, a hash of `get-text`.
+
+Two bounds apply. If the pane shows no change at all, the wait ends at the old fixed delay
+(CCB_PASTE_SETTLE_NO_CHANGE overrides), so a pane that can't show the paste is never slower than
+before. Once a change has been seen, the wait may run past that delay until the pane goes quiet,
+up to CCB_PASTE_SETTLE_MAX (default 3s) for a pane that never does (spinner, clock).
+
+Setting the legacy delay variable explicitly keeps the fixed sleep, as does a pane that can't be
+probed.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Callable, Optional
+
+Probe = Callable[[], Optional[str]]
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = (os.environ.get(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except Exception:
+        return default
+
+
+def fixed_delay(legacy_env: str) -> Optional[float]:
+    """The legacy fixed delay when `legacy_env` is set explicitly, else None (settle adaptively)."""
+    raw = (os.environ.get(legacy_env) or "").strip()
+    if not raw:
+        return None
+    try:
+        return max(0.0, float(raw))
+    except Exception:
+        return None
+
+
+def wait_for_settle(
+    probe: Probe,
+    before: Optional[str],
+    *,
+    max_s: Optional[float] = None,
+    no_change_s: Optional[float] = None,
+    quiet_s: Optional[float] = None,
+    step_s: Optional[float] = None,
+    default_no_change_s: float = 0.5,
+) -> float:
+    """
+    Block until the pane settles after a paste; returns the time waited.
+
+    Gives up after `no_change_s` (default: the backend's old fixed delay) if the pane never changed,
+    and after `max_s` if it changed but never went quiet.
+    """
+    max_s = max(0.0, max_s if max_s is not None else _env_float("CCB_PASTE_SETTLE_MAX", 3.0))
+    if no_change_s is None:
+        no_change_s = _env_float("CCB_PASTE_SETTLE_NO_CHANGE", default_no_change_s)
+    no_change_s = min(max_s, max(0.0, no_change_s))
+    quiet_s = max(0.0, quiet_s if quiet_s is not None else _env_float("CCB_PASTE_SETTLE_QUIET", 0.05))
+    step_s = max(0.005, step_s if step_s is not None else _env_float("CCB_PASTE_SETTLE_STEP", 0.02))
+    start = time.monotonic()
+    last = before
+    changed_at: Optional[float] = None
+    while True:
+        now = time.monotonic()
+        deadline = start + (max_s if changed_at is not None else no_change_s)
+        if now >= deadline:
+            break
+        time.sleep(min(step_s, deadline - now))
+        sig = probe()
+        now = time.monotonic()
+        if sig is None:
+            # Lost the pane mid-wait: nothing left to wait for.
+            break
+        if sig != last:
+            last = sig
+            changed_at = now
+        elif changed_at is not None and now - changed_at >= quiet_s:
+            break
+    return time.monotonic() - start
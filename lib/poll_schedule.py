@@ -0,0 +1,176 @@
+"""
+Adaptive poll cadence for provider waits, driven by recorded reply timings.
+
+Without file notifications the reactor stat-polls every watched log at a fixed 50ms for the whole
+request, even when the model typically needs 30s+ to answer. A `PollCadence` is created per request
+and handed to the reactor as the wait's poll interval:
+
+- fast right after send, until the anchor is expected to have landed;
+- fast again around the expected completion (the session's / provider's recorded `done_ms` spread);
+- in between, backing off with the time since the log last grew (idle/8, capped at `slow`);
+- and fast again on any log growth (`activity()`), so a streaming reply is always followed closely.
+
+Timings are kept per (provider, session) in memory; sessions with too few samples fall back to the
+provider-wide history, and with no history at all only the post-send window and backoff apply.
+Tunables: CCB_POLL_FAST (default: the reactor interval), CCB_POLL_SLOW, CCB_POLL_HISTORY;
+CCB_POLL_ADAPTIVE=0 keeps the fixed interval.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+_MIN_SAMPLES = 3
+_SEND_WINDOW_S = 2.0
+_BACKOFF_DIVISOR = 8.0
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = (os.environ.get(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except Exception:
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = (os.environ.get(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except Exception:
+        return default
+
+
+def adaptive_enabled() -> bool:
+    return (os.environ.get("CCB_POLL_ADAPTIVE") or "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def _quantile(values: list[int], q: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return float(ordered[idx])
+
+
+class ReplyTimings:
+    """Recent (anchor_ms, done_ms) per provider and per (provider, session)."""
+
+    def __init__(self, history: Optional[int] = None):
+        self.history = max(_MIN_SAMPLES, history if history is not None else _env_int("CCB_POLL_HISTORY", 32))
+        self._lock = threading.Lock()
+        self._anchor: dict[tuple[str, str], deque[int]] = {}
+        self._done: dict[tuple[str, str], deque[int]] = {}
+
+    def record(self, provider: str, session_key: str, *, anchor_ms: Optional[int], done_ms: Optional[int]) -> None:
+        with self._lock:
+            for key in ((provider, session_key), (provider, "")):
+                if anchor_ms is not None and anchor_ms >= 0:
+                    self._anchor.setdefault(key, deque(maxlen=self.history)).append(int(anchor_ms))
+                if done_ms is not None and done_ms >= 0:
+                    self._done.setdefault(key, deque(maxlen=self.history)).append(int(done_ms))
+
+    def _samples(self, table: dict[tuple[str, str], deque[int]], provider: str, session_key: str) -> list[int]:
+        with self._lock:
+            for key in ((provider, session_key), (provider, "")):
+                samples = table.get(key)
+                if samples is not None and len(samples) >= _MIN_SAMPLES:
+                    return list(samples)
+        return []
+
+    def anchor_window_s(self, provider: str, session_key: str) -> float:
+        """How long after send the anchor is expected: p90 with 50% headroom, at least the send window."""
+        samples = self._samples(self._anchor, provider, session_key)
+        if not samples:
+            return _SEND_WINDOW_S
+        return max(_SEND_WINDOW_S, 1.5 * _quantile(samples, 0.9) / 1000.0)
+
+    def done_window_s(self, provider: str, session_key: str) -> Optional[tuple[float, float]]:
+        """(start, end) of the expected completion window, or None without enough history."""
+        samples = self._samples(self._done, provider, session_key)
+        if not samples:
+            return None
+        return 0.8 * _quantile(samples, 0.1) / 1000.0, 1.25 * _quantile(samples, 0.9) / 1000.0
+
+
+class PollCadence:
+    """Poll interval for one request; pass `interval` to the reactor and call `activity()` on log growth."""
+
+    def __init__(
+        self,
+        timings: ReplyTimings,
+        provider: str,
+        session_key: str,
+        *,
+        fast: Optional[float] = None,
+        slow: Optional[float] = None,
+        adaptive: Optional[bool] = None,
+    ):
+        self.timings = timings
+        self.provider = provider
+        self.session_key = session_key
+        self.fast = max(0.01, fast if fast is not None else _env_float("CCB_POLL_FAST", _env_float("CCB_REACTOR_POLL_INTERVAL", 0.05)))
+        self.slow = max(self.fast, slow if slow is not None else _env_float("CCB_POLL_SLOW", 0.5))
+        self.adaptive = adaptive_enabled() if adaptive is None else bool(adaptive)
+        self.started = time.monotonic()
+        self.anchor_seen = False
+        self._last_activity = self.started
+        self._anchor_window = timings.anchor_window_s(provider, session_key)
+        self._done_window = timings.done_window_s(provider, session_key)
+
+    def activity(self) -> None:
+        self._last_activity = time.monotonic()
+
+    def anchor(self) -> None:
+        self.anchor_seen = True
+        self.activity()
+
+    def interval(self, now: Optional[float] = None) -> float:
+        if not self.adaptive:
+            return self.fast
+        now = time.monotonic() if now is None else now
+        elapsed = now - self.started
+        if not self.anchor_seen and elapsed < self._anchor_window:
+            return self.fast
+        if self._done_window is not None:
+            lo, hi = self._done_window
+            if lo <= elapsed <= hi:
+                return self.fast
+        # Idle since the last growth (or since the end of the done window, once past it).
+        since = self._last_activity
+        if self._done_window is not None and elapsed > self._done_window[1]:
+            since = max(since, self.started + self._done_window[1])
+        idle = max(0.0, now - since)
+        interval = max(self.fast, min(self.slow, idle / _BACKOFF_DIVISOR))
+        if self._done_window is not None and elapsed < self._done_window[0]:
+            # Never sleep past the start of the expected completion window.
+            interval = max(self.fast, min(interval, self._done_window[0] - elapsed))
+        return interval
+
+    def finish(self, *, anchor_ms: Optional[int], done_ms: Optional[int]) -> None:
+        """Record a completed request's timings for the next cadence (timeouts are not recorded)."""
+        if done_ms is None:
+            return
+        self.timings.record(self.provider, self.session_key, anchor_ms=anchor_ms, done_ms=done_ms)
+
+
+_timings: Optional[ReplyTimings] = None
+_timings_lock = threading.Lock()
+
+
+def reply_timings() -> ReplyTimings:
+    global _timings
+    with _timings_lock:
+        if _timings is None:
+            _timings = ReplyTimings()
+        return _timings
+
+
+def poll_cadence(provider: str, session_key: str) -> PollCadence:
+    return PollCadence(reply_timings(), provider, session_key)
@@ -0,0 +1,136 @@
+"""
+Hand large prompts to the provider as a file instead of pasting them.
+
+Pasting hundreds of KB (diffs, logs) through `tmux load-buffer`/`paste-buffer` or
+`wezterm cli send-text` is slow, ties up the pane and trips the TUIs' "[Pasted Content]"
+collapsing. Above CCB_PROMPT_SPOOL_BYTES (default 64 KiB, 0 disables) the worker writes the
+message to a content-addressed file under `<project>/.ccb_config/spool/` and the wrapped prompt
+(still carrying CCB_REQ_ID / CCB_DONE) only tells the provider to read it.
+
+Spool files are removed when the request completes (done marker seen). A request that timed out or
+failed keeps its file, since the provider may still be reading it; those are swept once older than
+CCB_PROMPT_SPOOL_TTL_S (default 1 day) by the next spool into the same directory.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from session_utils import project_config_dir
+
+SPOOL_DIRNAME = "spool"
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = (os.environ.get(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except Exception:
+        return default
+
+
+def spool_threshold() -> int:
+    return max(0, _env_int("CCB_PROMPT_SPOOL_BYTES", 64 * 1024))
+
+
+@dataclass(frozen=True)
+class SpooledPrompt:
+    path: Path
+    size: int
+    # mtime_ns after this request wrote/touched the file; a newer mtime means another process reused it.
+    mtime_ns: int
+
+
+_lock = threading.Lock()
+# path -> number of in-flight requests in this process using it.
+_holders: dict[str, int] = {}
+
+
+def sweep(directory: Path, ttl_s: Optional[float] = None) -> int:
+    """Delete spool files older than `ttl_s` that no request in this process holds; returns how many."""
+    ttl_s = float(_env_int("CCB_PROMPT_SPOOL_TTL_S", 86400) if ttl_s is None else ttl_s)
+    cutoff = time.time() - max(0.0, ttl_s)
+    removed = 0
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.stat().st_mtime >= cutoff:
+                continue
+            with _lock:
+                if _holders.get(entry.path):
+                    continue
+                os.unlink(entry.path)
+            removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+def spool(work_dir: str | Path, message: str) -> Optional[SpooledPrompt]:
+    """Write `message` to the project's spool if it is over the threshold; None means paste it inline."""
+    threshold = spool_threshold()
+    data = (message or "").encode("utf-8")
+    if threshold <= 0 or len(data) <= threshold:
+        return None
+    config_dir = project_config_dir(Path(work_dir))
+    if not config_dir.is_dir():
+        return None
+    directory = config_dir / SPOOL_DIRNAME
+    try:
+        directory.mkdir(exist_ok=True)
+        sweep(directory)
+        path = directory / f"{hashlib.sha256(data).hexdigest()[:32]}.txt"
+        with _lock:
+            if path.exists():
+                # Same content already spooled: reuse it and refresh its mtime.
+                os.utime(path)
+            else:
+                tmp = directory / f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+                fd = os.open(str(tmp), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                with os.fdopen(fd, "wb") as handle:
+                    handle.write(data)
+                os.replace(tmp, path)
+            _holders[str(path)] = _holders.get(str(path), 0) + 1
+            mtime_ns = path.stat().st_mtime_ns
+    except OSError:
+        return None
+    return SpooledPrompt(path=path, size=len(data), mtime_ns=mtime_ns)
+
+
+def spooled_message(spooled: SpooledPrompt) -> str:
+    """The short message sent in place of the spooled one."""
+    return (
+        f"The full request ({spooled.size} bytes) is too large to paste and was saved to this file:\n"
+        f"{spooled.path}\n\n"
+        "Read the whole file and treat its contents as my message."
+    )
+
+
+def release(spooled: SpooledPrompt, *, completed: bool) -> None:
+    """Drop this request's hold; a completed request's file is deleted unless still in use."""
+    key = str(spooled.path)
+    with _lock:
+        left = _holders.get(key, 0) - 1
+        if left > 0:
+            _holders[key] = left
+            return
+        _holders.pop(key, None)
+        if not completed:
+            return
+        try:
+            if spooled.path.stat().st_mtime_ns > spooled.mtime_ns:
+                return
+            spooled.path.unlink()
+        except OSError:
+            pass
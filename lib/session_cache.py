@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+S = TypeVar("S")
+
+FileSig = Optional[tuple[int, int, int]]
+
+
+def _file_sig(path: Optional[Path]) -> FileSig:
+    if path is None:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return int(st.st_mtime_ns), int(st.st_size), int(getattr(st, "st_ino", 0) or 0)
+
+
+@dataclass(frozen=True)
+class SessionHandle(Generic[S]):
+    session: Optional[S]
+    session_key: Optional[str]
+
+
+@dataclass
+class _Entry(Generic[S]):
+    session: S
+    session_file: Path
+    sig: FileSig
+    extra: Hashable = None
+    session_key: Optional[str] = None
+
+
+class SessionHandleCache(Generic[S]):
+    """
+    Process-wide cache of parsed project sessions, keyed by work_dir.
+
+    A hit costs one stat of the session file: the cached object is reused while the file's
+    (mtime_ns, size, inode) is unchanged, so the daemon submit path, the session worker and the
+    monitor all share a single parse. Any write (ours via `_write_back`, or ccb's) changes the
+    signature and the next lookup reloads.
+
+    Sessions resolved from more than the session file (e.g. Claude merges the pane registry) pass
+    `extra_sig`, a cheap signature of those other inputs that must also be unchanged for a hit.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[Path], Optional[S]],
+        key_fn: Callable[[S], str],
+        *,
+        locate: Optional[Callable[[Path], Optional[Path]]] = None,
+        extra_sig: Optional[Callable[[Path], Hashable]] = None,
+    ):
+        self._loader = loader
+        self._key_fn = key_fn
+        self._locate = locate
+        self._extra_sig = extra_sig
+        self._lock = threading.Lock()
+        self._entries: dict[str, _Entry[S]] = {}
+        self._counters = {"hits": 0, "loads": 0, "misses": 0}
+
+    def get(self, work_dir: Path) -> SessionHandle[S]:
+        key = str(work_dir)
+        with self._lock:
+            entry = self._entries.get(key)
+        extra = self._extra(Path(work_dir))
+        if entry is not None:
+            sig = _file_sig(entry.session_file)
+            if sig is not None and sig == entry.sig and extra == entry.extra:
+                with self._lock:
+                    self._counters["hits"] += 1
+                return SessionHandle(entry.session, self._session_key(entry))
+            pre_path: Optional[Path] = entry.session_file
+        else:
+            pre_path = None
+            if self._locate is not None:
+                try:
+                    pre_path = self._locate(Path(work_dir))
+                except Exception:
+                    pre_path = None
+        pre_sig = _file_sig(pre_path)
+
+        session = self._loader(Path(work_dir))
+        if session is None:
+            with self._lock:
+                self._entries.pop(key, None)
+                self._counters["misses"] += 1
+            return SessionHandle(None, None)
+
+        session_file = Path(getattr(session, "session_file"))
+        sig = _file_sig(session_file)
+        if pre_path is None or Path(pre_path) != session_file or sig != pre_sig or self._extra(Path(work_dir)) != extra:
+            # The inputs may have changed while we were reading them; revalidate on the next lookup.
+            sig = None
+        new_entry: _Entry[S] = _Entry(session=session, session_file=session_file, sig=sig, extra=extra)
+        with self._lock:
+            self._entries[key] = new_entry
+            self._counters["loads"] += 1
+        return SessionHandle(session, self._session_key(new_entry))
+
+    def _extra(self, work_dir: Path) -> Hashable:
+        if self._extra_sig is None:
+            return None
+        try:
+            return self._extra_sig(work_dir)
+        except Exception:
+            # Unknown: never equal to itself, so the entry is reloaded every time.
+            return object()
+
+    def _session_key(self, entry: _Entry[S]) -> str:
+        if entry.session_key is None:
+            entry.session_key = self._key_fn(entry.session)
+        return entry.session_key
+
+    def invalidate(self, work_dir: Path) -> None:
+        with self._lock:
+            self._entries.pop(str(work_dir), None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), **self._counters}
@@ -0,0 +1,369 @@
+"""
+Persistent discovery index over provider session-log trees (Codex / Claude / Droid *.jsonl).
+
+"Which log is the newest one for this work_dir / session id?" used to be a full glob of the log
+tree plus opening every candidate to read its header. The index keeps, per log path,
+(mtime_ns, size, cwd, session_id, sidechain) in memory and in a JSON file under `run_dir()`,
+shared by the daemons and the `ccb` launcher. Headers are read for new or rewritten files only,
+in parallel (see log_scan) so cold scans on slow filesystems are not bound by serial syscall latency.
+
+Refreshes are incremental. The first one walks the tree and remembers every directory's mtime.
+After that a refresh stats only the directories: one whose mtime changed (or is too recent to
+trust) is re-listed, and a new subdirectory is walked. Appends don't touch a directory's mtime, so
+the CCB_LOG_INDEX_RECHECK newest logs, the ones still being written, are re-stat'ed on every
+refresh. Every CCB_LOG_INDEX_FULL_S seconds a full walk catches appends to older logs
+(e.g. a resumed session).
+
+The JSON file is rewritten only when logs were added or removed or headers were read. Stat drift
+from logs still being written is kept in memory and persisted by the next full walk, so a streaming
+session does not rewrite the index every refresh.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from askd_runtime import run_dir
+from log_scan import ScannedFile, map_bounded, scan_dir
+
+INDEX_VERSION = 1
+
+# (cwd, session_id, is_sidechain) read from a log's first lines.
+MetaReader = Callable[[Path], "tuple[Optional[str], Optional[str], Optional[bool]]"]
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = (os.environ.get(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except Exception:
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = (os.environ.get(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except Exception:
+        return default
+
+
+def _persist_enabled() -> bool:
+    return (os.environ.get("CCB_LOG_INDEX") or "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+@dataclass
+class LogEntry:
+    path: str
+    mtime_ns: int
+    size: int
+    cwd: Optional[str] = None
+    session_id: Optional[str] = None
+    sidechain: Optional[bool] = None
+
+    @property
+    def mtime(self) -> float:
+        return self.mtime_ns / 1_000_000_000
+
+
+def _dir_mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+@dataclass
+class _DirState:
+    mtime_ns: int
+    listed_at_ns: int
+    files: set[str]
+    subdirs: set[str]
+
+
+class SessionLogIndex:
+    def __init__(
+        self,
+        root: Path,
+        *,
+        name: str,
+        meta_reader: MetaReader,
+        include_hidden: bool = False,
+        index_path: Optional[Path] = None,
+        ttl_s: Optional[float] = None,
+    ):
+        self.root = Path(root).expanduser()
+        self.name = name
+        self._meta_reader = meta_reader
+        self._include_hidden = include_hidden
+        if index_path is None and _persist_enabled():
+            digest = hashlib.sha1(str(self.root).encode("utf-8", errors="ignore")).hexdigest()[:12]
+            index_path = run_dir() / "log-index" / f"{name}-{digest}.json"
+        self.index_path = index_path
+        if ttl_s is None:
+            ttl_s = _env_float("CCB_LOG_INDEX_TTL_S", 1.0)
+        self.ttl_s = max(0.0, float(ttl_s))
+        self.full_interval_s = max(0.0, _env_float("CCB_LOG_INDEX_FULL_S", 30.0))
+        self.recheck = max(0, _env_int("CCB_LOG_INDEX_RECHECK", 32))
+        self._lock = threading.Lock()
+        self._entries: dict[str, LogEntry] = {}
+        self._order: list[LogEntry] = []
+        self._dirs: dict[str, _DirState] = {}
+        self._loaded = False
+        # Entries added/removed or headers read since the last save; `_drift`: only mtime/size moved.
+        self._changed = False
+        self._drift = False
+        self._last_refresh = 0.0
+        self._last_full = 0.0
+        self._counters = {"refreshes": 0, "meta_reads": 0, "full_walks": 0, "dir_lists": 0, "file_stats": 0}
+
+    # ---- queries ----
+
+    def iter_newest(self, *, limit: Optional[int] = None) -> Iterator[LogEntry]:
+        """Entries newest-first (by mtime), after a refresh if the index is older than `ttl_s`."""
+        self.refresh()
+        order = self._order
+        if limit is not None:
+            order = order[: max(0, int(limit))]
+        return iter(order)
+
+    def latest(self, match: Optional[Callable[[LogEntry], bool]] = None, *, limit: Optional[int] = None) -> Optional[LogEntry]:
+        for entry in self.iter_newest(limit=limit):
+            if match is None or match(entry):
+                return entry
+        return None
+
+    def lookup(self, files: list[ScannedFile]) -> list[LogEntry]:
+        """
+        Entries for files the caller already listed (e.g. one date partition), without a tree walk.
+
+        Cached headers are reused; only new or rewritten files are opened. The index is saved only
+        when headers were read, since bare mtime/size drift is cheap to rediscover.
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load()
+                self._loaded = True
+            if self._merge(files):
+                self._order = sorted(self._entries.values(), key=lambda e: e.mtime_ns, reverse=True)
+            self._save_if_changed()
+            return [self._entries[f.path] for f in files if f.path in self._entries]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), **self._counters}
+
+    # ---- maintenance ----
+
+    def refresh(self, *, force: bool = False) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._loaded and now - self._last_refresh < self.ttl_s:
+                return
+            if not self._loaded:
+                self._load()
+                self._loaded = True
+            dirty = self._rescan()
+            self._last_refresh = time.monotonic()
+            self._counters["refreshes"] += 1
+            if dirty:
+                self._order = sorted(self._entries.values(), key=lambda e: e.mtime_ns, reverse=True)
+            self._save_if_changed()
+
+    def _save_if_changed(self) -> None:
+        if self._changed:
+            self._save()
+            self._changed = self._drift = False
+
+    def _rescan(self) -> bool:
+        if not self.root.exists():
+            dirty = bool(self._entries)
+            self._entries.clear()
+            self._dirs.clear()
+            self._changed |= dirty
+            return dirty
+        now = time.monotonic()
+        if not self._dirs or now - self._last_full >= self.full_interval_s:
+            return self._full_walk(now)
+        return self._incremental()
+
+    def _match(self, name: str) -> bool:
+        return name.endswith(".jsonl")
+
+    def _list(self, dirs: list[str]) -> list[ScannedFile]:
+        """(Re)list `dirs` and every directory below them not listed yet; returns their files."""
+        out: list[ScannedFile] = []
+        level = list(dirs)
+        while level:
+            listed_at_ns = time.time_ns()
+            stats = map_bounded(lambda d: (d, _dir_mtime(d)), level)
+            listings = map_bounded(lambda d: scan_dir(d, self._match, self._include_hidden), level)
+            next_level: list[str] = []
+            for (path, mtime_ns), (subdirs, files) in zip(stats, listings):
+                self._counters["dir_lists"] += 1
+                self._counters["file_stats"] += len(files)
+                if mtime_ns is None:
+                    self._drop_dir(path)
+                    continue
+                old = self._dirs.get(path)
+                for gone in (old.subdirs - set(subdirs)) if old else ():
+                    self._drop_dir(gone)
+                self._dirs[path] = _DirState(mtime_ns, listed_at_ns, {f.path for f in files}, set(subdirs))
+                next_level.extend(d for d in subdirs if d not in self._dirs)
+                out.extend(files)
+            level = next_level
+        return out
+
+    def _drop_dir(self, path: str) -> None:
+        state = self._dirs.pop(path, None)
+        if state is None:
+            return
+        for sub in state.subdirs:
+            self._drop_dir(sub)
+
+    def _full_walk(self, now: float) -> bool:
+        self._dirs.clear()
+        files = self._list([str(self.root)])
+        self._last_full = now
+        self._counters["full_walks"] += 1
+        dirty = self._replace_with(files, {f.path for f in files})
+        # Persist the stat drift accumulated since the last save.
+        self._changed |= self._drift
+        return dirty
+
+    def _incremental(self) -> bool:
+        known = list(self._dirs.items())
+        mtimes = map_bounded(lambda item: _dir_mtime(item[0]), known)
+        changed: list[str] = []
+        for (path, state), mtime_ns in zip(known, mtimes):
+            if path not in self._dirs:
+                continue  # dropped with a missing parent
+            if mtime_ns is None:
+                self._drop_dir(path)
+                continue
+            # Coarse directory mtimes cannot prove nothing was added in the tick we listed in.
+            if mtime_ns != state.mtime_ns or mtime_ns >= state.listed_at_ns - 1_000_000_000:
+                changed.append(path)
+        relisted = self._list(changed)
+
+        # Appends leave directory mtimes alone: re-stat the logs most likely still being written.
+        fresh = {f.path for f in relisted}
+        hot = [e.path for e in self._order[: self.recheck] if e.path not in fresh]
+
+        def _stat(path: str) -> Optional[ScannedFile]:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return None
+            return ScannedFile(path, int(st.st_mtime_ns), int(st.st_size))
+
+        rechecked = map_bounded(_stat, hot)
+        self._counters["file_stats"] += len(hot)
+        files = relisted + [f for f in rechecked if f is not None]
+        live: set[str] = set()
+        for state in self._dirs.values():
+            live |= state.files
+        live -= {path for path, f in zip(hot, rechecked) if f is None}
+        return self._replace_with(files, live)
+
+    def _replace_with(self, files: list[ScannedFile], live: set[str]) -> bool:
+        """Merge `files`, then drop entries that are no longer in `live`."""
+        dirty = self._merge(files)
+        for path in [p for p in self._entries if p not in live]:
+            del self._entries[path]
+            dirty = self._changed = True
+        return dirty
+
+    def _merge(self, files: list[ScannedFile]) -> bool:
+        dirty = False
+        need_meta: list[tuple[str, int, int]] = []
+        for f in files:
+            path = f.path
+            old = self._entries.get(path)
+            if old is not None and old.mtime_ns == f.mtime_ns and old.size == f.size:
+                continue
+            dirty = True
+            # Headers never change once written: re-read only for new, rewritten (shrunk) or still headerless logs.
+            if old is not None and f.size >= old.size and old.cwd is not None:
+                old.mtime_ns, old.size = f.mtime_ns, f.size
+                self._drift = True
+                continue
+            need_meta.append((path, f.mtime_ns, f.size))
+
+        metas = map_bounded(lambda item: self._read_meta(Path(item[0])), need_meta)
+        self._counters["meta_reads"] += len(need_meta)
+        if need_meta:
+            self._changed = True
+        for (path, mtime_ns, size), (cwd, sid, sidechain) in zip(need_meta, metas):
+            self._entries[path] = LogEntry(path, mtime_ns, size, cwd, sid, sidechain)
+        return dirty
+
+    def _read_meta(self, path: Path) -> tuple[Optional[str], Optional[str], Optional[bool]]:
+        try:
+            return self._meta_reader(path)
+        except Exception:
+            return None, None, None
+
+    def _load(self) -> None:
+        if not self.index_path:
+            return
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except Exception:
+            return
+        if not isinstance(data, dict) or data.get("v") != INDEX_VERSION or data.get("root") != str(self.root):
+            return
+        rows = data.get("entries")
+        if not isinstance(rows, dict):
+            return
+        for path, row in rows.items():
+            try:
+                mtime_ns, size, cwd, sid, sidechain = row
+                self._entries[str(path)] = LogEntry(str(path), int(mtime_ns), int(size), cwd, sid, sidechain)
+            except Exception:
+                continue
+        self._order = sorted(self._entries.values(), key=lambda e: e.mtime_ns, reverse=True)
+
+    def _save(self) -> None:
+        if not self.index_path:
+            return
+        payload = {
+            "v": INDEX_VERSION,
+            "root": str(self.root),
+            "entries": {p: [e.mtime_ns, e.size, e.cwd, e.session_id, e.sidechain] for p, e in self._entries.items()},
+        }
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.index_path)
+        except Exception:
+            # The on-disk copy is only a warm start; never fail discovery because of it.
+            pass
+
+
+_indexes: dict[tuple[str, str], SessionLogIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_log_index(name: str, root: Path, meta_reader: MetaReader, *, include_hidden: bool = False) -> SessionLogIndex:
+    """Process-wide index for (`name`, `root`)."""
+    root = Path(root).expanduser()
+    key = (name, str(root))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = SessionLogIndex(root, name=name, meta_reader=meta_reader, include_hidden=include_hidden)
+            _indexes[key] = index
+        return index
@@ -1,4 +1,5 @@
 from __future__ import annotations
+import hashlib
 import json
 import os
 import platform
@@ -6,12 +7,18 @@ import re
 import shlex
 import shutil
 import subprocess
+import threading
 import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
 
+import pane_events
+from paste_settle import fixed_delay, wait_for_settle
+from tmux_control import control_enabled, get_control_client
+
 
 def _env_float(name: str, default: float) -> float:
     raw = os.environ.get(name)
@@ -202,7 +209,97 @@ def get_shell_type() -> str:
     return "bash"
 
 
+# Pane-state snapshots: one `list-panes -a` / `wezterm cli list` per backend and TTL answers every
+# liveness and title-marker lookup in the process. Cached "alive" answers are trusted for the TTL;
+# "missing/dead" answers older than `_SNAPSHOT_CONFIRM_AGE_S` are confirmed with a fresh listing, so a
+# pane created elsewhere moments ago is never reported dead. Backends drop the snapshot whenever they
+# create, kill, respawn or retitle a pane. CCB_PANE_SNAPSHOT_TTL=0 disables the cache.
+_SNAPSHOT_CONFIRM_AGE_S = 0.2
+
+
+@dataclass
+class PaneSnapshot:
+    taken_at: float
+    generation: int
+    # pane_id -> (alive, title), in listing order.
+    panes: dict[str, tuple[bool, str]] = field(default_factory=dict)
+    sessions: frozenset[str] = frozenset()
+
+    def find_by_title_marker(self, marker: str, *, id_prefix: str = "") -> Optional[str]:
+        for pane_id, (_alive, title) in self.panes.items():
+            if title.startswith(marker) and pane_id.startswith(id_prefix):
+                return pane_id
+        return None
+
+
+_pane_snapshots: dict[tuple, PaneSnapshot] = {}
+_pane_snapshots_lock = threading.Lock()
+_pane_snapshot_generation = 0
+_sweep_local = threading.local()
+
+
+def invalidate_pane_snapshots() -> None:
+    global _pane_snapshot_generation
+    with _pane_snapshots_lock:
+        _pane_snapshot_generation += 1
+        _pane_snapshots.clear()
+
+
+@contextmanager
+def pane_sweep():
+    """
+    Pin one fresh snapshot per backend for this thread's lookups inside the block (registry monitors
+    sweep every session against it); a backend mutation anywhere in the process still drops the pin.
+    """
+    previous = getattr(_sweep_local, "snapshots", None)
+    _sweep_local.snapshots = {} if previous is None else previous
+    try:
+        yield
+    finally:
+        _sweep_local.snapshots = previous
+
+
 class TerminalBackend(ABC):
+    def _snapshot_key(self) -> tuple:
+        return (type(self).__name__,)
+
+    def _take_pane_snapshot(self, generation: int) -> Optional[PaneSnapshot]:
+        return None
+
+    def pane_snapshot(self, *, fresh: bool = False) -> Optional[PaneSnapshot]:
+        """Cached pane listing for this backend, or None when disabled / the listing failed."""
+        ttl = _env_float("CCB_PANE_SNAPSHOT_TTL", 1.0)
+        if ttl <= 0:
+            return None
+        key = self._snapshot_key()
+        pinned = getattr(_sweep_local, "snapshots", None)
+        with _pane_snapshots_lock:
+            generation = _pane_snapshot_generation
+            cached = _pane_snapshots.get(key)
+        if not fresh:
+            snap = pinned.get(key) if pinned is not None else None
+            if snap is not None and snap.generation == generation:
+                return snap
+            # A sweep pins a listing taken when it starts, so its negative answers need no confirmation.
+            if pinned is None and cached is not None and time.monotonic() - cached.taken_at < ttl:
+                return cached
+        snap = self._take_pane_snapshot(generation)
+        if snap is None:
+            return None
+        with _pane_snapshots_lock:
+            if snap.generation == _pane_snapshot_generation:
+                _pane_snapshots[key] = snap
+        if pinned is not None:
+            pinned[key] = snap
+        return snap
+
+    def _confirmed_snapshot(self, snap: PaneSnapshot) -> Optional[PaneSnapshot]:
+        """A fresh listing to confirm a negative answer from `snap`, or `snap` if it is fresh enough."""
+        pinned = getattr(_sweep_local, "snapshots", None)
+        if time.monotonic() - snap.taken_at <= _SNAPSHOT_CONFIRM_AGE_S or (pinned and pinned.get(self._snapshot_key()) is snap):
+            return snap
+        return self.pane_snapshot(fresh=True)
+
     @abstractmethod
     def send_text(self, pane_id: str, text: str) -> None: ...
     @abstractmethod
@@ -229,6 +326,16 @@ class TmuxBackend(TerminalBackend):
     """
 
     _ANSI_RE = re.compile(r"\x1b\[[0-?]*[ -/]*[@-~]")
+    # Commands that mean the same from any client; everything else goes over the control connection
+    # only with an explicit `-t` (the control client's own session would otherwise be the target).
+    _CONTEXT_FREE_COMMANDS = frozenset({"load-buffer", "set-buffer", "delete-buffer", "new-session", "list-sessions"})
+    _INTERACTIVE_COMMANDS = frozenset({"attach", "attach-session", "detach-client", "kill-server"})
+    # Commands that change which panes exist, whether they are dead, or their titles.
+    _PANE_MUTATING_COMMANDS = frozenset({
+        "kill-pane", "kill-session", "kill-window", "kill-server", "respawn-pane", "split-window",
+        "new-session", "new-window", "select-pane", "break-pane", "join-pane",
+    })
+    _SNAPSHOT_FORMAT = "#{pane_id}\t#{pane_dead}\t#{session_name}\t#{pane_title}"
 
     def __init__(self, *, socket_name: str | None = None):
         # Optional tmux server socket isolation (like `tmux -L <name>`). Useful for daemon mode.
@@ -254,8 +361,68 @@ class TmuxBackend(TerminalBackend):
             kwargs["input"] = input_bytes
         if timeout is not None:
             kwargs["timeout"] = timeout
+        if args and args[0] in self._PANE_MUTATING_COMMANDS:
+            invalidate_pane_snapshots()
+        if control_enabled():
+            cp = self._tmux_run_control(args, input_bytes=input_bytes, timeout=timeout)
+            if cp is not None:
+                if check and cp.returncode != 0:
+                    raise subprocess.CalledProcessError(cp.returncode, cp.args, output=cp.stdout, stderr=cp.stderr)
+                return cp
         return _run([*self._tmux_base(), *args], check=check, **kwargs)
 
+    def _tmux_run_control(self, args: list[str], *, input_bytes: bytes | None,
+                          timeout: float | None) -> subprocess.CompletedProcess | None:
+        """Run `args` over the persistent control connection; None means "use a subprocess"."""
+        if not args or args[0] in self._INTERACTIVE_COMMANDS:
+            return None
+        if "-t" not in args and args[0] not in self._CONTEXT_FREE_COMMANDS:
+            if not (args[0] == "list-panes" and "-a" in args) and not (args[0] == "show-option" and "-g" in args):
+                return None
+        if input_bytes is not None:
+            # Control mode has no stdin per command: `load-buffer -b NAME -` becomes `set-buffer`.
+            if args[0] != "load-buffer" or args[-1] != "-" or "-b" not in args:
+                return None
+            try:
+                data = input_bytes.decode("utf-8")
+            except UnicodeDecodeError:
+                return None
+            args = ["set-buffer", "-b", args[args.index("-b") + 1], "--", data]
+        try:
+            return get_control_client(self._tmux_base()).run(args, timeout=timeout)
+        except Exception:
+            return None
+
+    def _snapshot_key(self) -> tuple:
+        return ("tmux", self._socket_name)
+
+    def _take_pane_snapshot(self, generation: int) -> Optional[PaneSnapshot]:
+        try:
+            cp = self._tmux_run(["list-panes", "-a", "-F", self._SNAPSHOT_FORMAT], capture=True, timeout=2.0)
+        except Exception:
+            return None
+        if cp.returncode != 0:
+            return None
+        snap = PaneSnapshot(taken_at=time.monotonic(), generation=generation)
+        sessions: set[str] = set()
+        for line in (cp.stdout or "").splitlines():
+            parts = line.split("\t", 3)
+            if len(parts) < 4 or not parts[0].startswith("%"):
+                continue
+            snap.panes[parts[0]] = (parts[1].strip() == "0", parts[3])
+            sessions.add(parts[2])
+        snap.sessions = frozenset(sessions)
+        return snap
+
+    def _snapshot_alive(self, snap: PaneSnapshot, target: str) -> Optional[bool]:
+        if target.startswith("%"):
+            pane = snap.panes.get(target)
+            return bool(pane and pane[0])
+        if self._looks_like_tmux_target(target):
+            return None
+        # Legacy session names: only exact matches are answered (has-session also accepts prefixes).
+        return True if target in snap.sessions else None
+
     @staticmethod
     def _looks_like_pane_id(value: str) -> bool:
         v = (value or "").strip()
@@ -393,6 +560,14 @@ class TmuxBackend(TerminalBackend):
         marker = (marker or "").strip()
         if not marker:
             return None
+        snap = self.pane_snapshot()
+        if snap is not None:
+            found = snap.find_by_title_marker(marker, id_prefix="%")
+            if found is None:
+                snap = self._confirmed_snapshot(snap)
+                found = snap.find_by_title_marker(marker, id_prefix="%") if snap is not None else None
+            if snap is not None:
+                return found
         cp = self._tmux_run(["list-panes", "-a", "-F", "#{pane_id}\t#{pane_title}"], capture=True)
         if cp.returncode != 0:
             return None
@@ -455,10 +630,9 @@ class TmuxBackend(TerminalBackend):
             buffer_name = f"ccb-tb-{os.getpid()}-{int(time.time() * 1000)}"
             self._tmux_run(["load-buffer", "-b", buffer_name, "-"], check=True, input_bytes=sanitized.encode("utf-8"))
             try:
+                before = self._paste_settle_begin(session)
                 self._tmux_run(["paste-buffer", "-t", session, "-b", buffer_name, "-p"], check=True)
-                enter_delay = _env_float("CCB_TMUX_ENTER_DELAY", 0.5)
-                if enter_delay:
-                    time.sleep(enter_delay)
+                self._paste_settle_wait(session, before)
                 self._tmux_run(["send-keys", "-t", session, "Enter"], check=True)
             finally:
                 self._tmux_run(["delete-buffer", "-b", buffer_name], check=False)
@@ -469,14 +643,42 @@ class TmuxBackend(TerminalBackend):
         buffer_name = f"ccb-tb-{os.getpid()}-{int(time.time() * 1000)}"
         self._tmux_run(["load-buffer", "-b", buffer_name, "-"], check=True, input_bytes=sanitized.encode("utf-8"))
         try:
+            before = self._paste_settle_begin(pane_id)
             self._tmux_run(["paste-buffer", "-p", "-t", pane_id, "-b", buffer_name], check=True)
-            enter_delay = _env_float("CCB_TMUX_ENTER_DELAY", 0.5)
-            if enter_delay:
-                time.sleep(enter_delay)
+            self._paste_settle_wait(pane_id, before)
             self._tmux_run(["send-keys", "-t", pane_id, "Enter"], check=True)
         finally:
             self._tmux_run(["delete-buffer", "-b", buffer_name], check=False)
 
+    def _settle_signature(self, target: str) -> Optional[str]:
+        """Cursor position, history size and a hash of the visible screen; None if the pane can't be read."""
+        try:
+            cp = self._tmux_run(
+                ["display-message", "-p", "-t", target, "#{cursor_x},#{cursor_y},#{history_size}"], capture=True, timeout=1.0
+            )
+            screen = self._tmux_run(["capture-pane", "-p", "-t", target], capture=True, timeout=1.0)
+        except Exception:
+            return None
+        cursor = (cp.stdout or "").strip()
+        if cp.returncode != 0 or screen.returncode != 0 or not cursor:
+            return None
+        digest = hashlib.blake2b((screen.stdout or "").encode("utf-8", errors="replace"), digest_size=8).hexdigest()
+        return f"{cursor}:{digest}"
+
+    def _paste_settle_begin(self, target: str) -> Optional[str]:
+        """Pre-paste signature, or None to use the fixed CCB_TMUX_ENTER_DELAY."""
+        if fixed_delay("CCB_TMUX_ENTER_DELAY") is not None:
+            return None
+        return self._settle_signature(target)
+
+    def _paste_settle_wait(self, target: str, before: Optional[str]) -> None:
+        if before is None:
+            enter_delay = _env_float("CCB_TMUX_ENTER_DELAY", 0.5)
+            if enter_delay:
+                time.sleep(enter_delay)
+            return
+        wait_for_settle(lambda: self._settle_signature(target), before, default_no_change_s=0.5)
+
     def send_key(self, pane_id: str, key: str) -> bool:
         key = (key or "").strip()
         if not pane_id or not key:
@@ -491,6 +693,14 @@ class TmuxBackend(TerminalBackend):
         # Backward-compatible: pane_id may be a session name.
         if not pane_id:
             return False
+        snap = self.pane_snapshot()
+        if snap is not None:
+            alive = self._snapshot_alive(snap, pane_id)
+            if alive is False:
+                snap = self._confirmed_snapshot(snap)
+                alive = self._snapshot_alive(snap, pane_id) if snap is not None else None
+            if alive is not None:
+                return alive
         if self._looks_like_tmux_target(pane_id):
             return self.is_pane_alive(pane_id)
         cp = self._tmux_run(["has-session", "-t", pane_id], capture=True)
@@ -586,9 +796,36 @@ class TmuxBackend(TerminalBackend):
             tmux_args.extend(["-c", start_dir])
         tmux_args.append(full)
         self._tmux_run(tmux_args, check=True)
+        pane_events.clear(pane_id)
         if remain_on_exit:
             self._tmux_run(["set-option", "-p", "-t", pane_id, "remain-on-exit", "on"], check=False)
 
+    def pane_pipe_open(self, pane_id: str) -> Optional[bool]:
+        """Whether the pane has a `pipe-pane` running; None if the pane can't be queried."""
+        if not pane_id:
+            return None
+        cp = self._tmux_run(["display-message", "-p", "-t", pane_id, "#{pane_pipe}"], capture=True, timeout=2.0)
+        if cp.returncode != 0:
+            return None
+        return (cp.stdout or "").strip() == "1"
+
+    def pipe_pane(self, pane_id: str, shell_cmd: str) -> bool:
+        """Pipe the pane's output to `shell_cmd` unless a pipe is already open (`pipe-pane -o`)."""
+        try:
+            cp = self._tmux_run(["pipe-pane", "-o", "-t", pane_id, shell_cmd], capture=True, timeout=2.0)
+            return cp.returncode == 0
+        except Exception:
+            return False
+
+    def set_hook(self, hook: str, index: int, command: str, *, target: Optional[str] = None) -> bool:
+        """Set one slot of a hook array (`set-hook -t target|-g hook[index] command`); other slots are untouched."""
+        scope = ["-t", target] if target else ["-g"]
+        try:
+            cp = self._tmux_run(["set-hook", *scope, f"{hook}[{int(index)}]", command], capture=True, timeout=2.0)
+            return cp.returncode == 0
+        except Exception:
+            return False
+
     def save_crash_log(self, pane_id: str, crash_log_path: str, *, lines: int = 1000) -> None:
         text = self.get_pane_content(pane_id, lines=lines) or ""
         p = Path(crash_log_path).expanduser()
@@ -760,6 +997,7 @@ class WeztermBackend(TerminalBackend):
             return
 
         # Slow path: multiline or long text -> use paste mode (bracketed paste)
+        before = None if fixed_delay("CCB_WEZTERM_PASTE_DELAY") is not None else self._settle_signature(pane_id)
         _run(
             [*self._cli_base_args(), "send-text", "--pane-id", pane_id],
             input=sanitized.encode("utf-8"),
@@ -767,13 +1005,30 @@ class WeztermBackend(TerminalBackend):
         )
 
         # Wait for TUI to process bracketed paste content
-        paste_delay = _env_float("CCB_WEZTERM_PASTE_DELAY", 0.1)
-        if paste_delay:
-            time.sleep(paste_delay)
+        if before is not None:
+            wait_for_settle(lambda: self._settle_signature(pane_id), before, default_no_change_s=0.1)
+        else:
+            paste_delay = _env_float("CCB_WEZTERM_PASTE_DELAY", 0.1)
+            if paste_delay:
+                time.sleep(paste_delay)
 
         self._send_enter(pane_id)
 
-    def _list_panes(self) -> list[dict]:
+    def _settle_signature(self, pane_id: str) -> Optional[str]:
+        """Hash of the pane's visible screen; None if it can't be read."""
+        try:
+            result = _run(
+                [*self._cli_base_args(), "get-text", "--pane-id", pane_id],
+                capture_output=True,
+                timeout=1.0,
+            )
+        except Exception:
+            return None
+        if result.returncode != 0:
+            return None
+        return hashlib.blake2b(result.stdout or b"", digest_size=8).hexdigest()
+
+    def _list_panes_or_none(self) -> Optional[list[dict]]:
         try:
             result = _run(
                 [*self._cli_base_args(), "list", "--format", "json"],
@@ -783,11 +1038,34 @@ class WeztermBackend(TerminalBackend):
                 errors="replace",
             )
             if result.returncode != 0:
-                return []
+                return None
             panes = json.loads(result.stdout)
-            return panes if isinstance(panes, list) else []
+            return panes if isinstance(panes, list) else None
         except Exception:
-            return []
+            return None
+
+    def _list_panes(self) -> list[dict]:
+        return self._list_panes_or_none() or []
+
+    def _snapshot_key(self) -> tuple:
+        return ("wezterm", *self._cli_base_args())
+
+    def _take_pane_snapshot(self, generation: int) -> Optional[PaneSnapshot]:
+        panes = self._list_panes_or_none()
+        if panes is None:
+            return None
+        snap = PaneSnapshot(taken_at=time.monotonic(), generation=generation)
+        for pane in panes:
+            if isinstance(pane, dict) and pane.get("pane_id") is not None:
+                snap.panes[str(pane.get("pane_id"))] = (True, str(pane.get("title") or ""))
+        return snap
+
+    @staticmethod
+    def _snapshot_alive(snap: PaneSnapshot, pane_id: str) -> bool:
+        # Like the listing-based check: a known pane id, or a title-marker prefix.
+        if not snap.panes:
+            return False
+        return str(pane_id) in snap.panes or snap.find_by_title_marker(str(pane_id)) is not None
 
     def _pane_id_by_title_marker(self, panes: list[dict], marker: str) -> Optional[str]:
         if not marker:
@@ -801,10 +1079,25 @@ class WeztermBackend(TerminalBackend):
         return None
 
     def find_pane_by_title_marker(self, marker: str) -> Optional[str]:
+        snap = self.pane_snapshot()
+        if snap is not None and marker:
+            found = snap.find_by_title_marker(marker)
+            if found is None:
+                snap = self._confirmed_snapshot(snap)
+                found = snap.find_by_title_marker(marker) if snap is not None else None
+            if snap is not None:
+                return found
         panes = self._list_panes()
         return self._pane_id_by_title_marker(panes, marker)
 
     def is_alive(self, pane_id: str) -> bool:
+        snap = self.pane_snapshot()
+        if snap is not None:
+            if self._snapshot_alive(snap, pane_id):
+                return True
+            snap = self._confirmed_snapshot(snap)
+            if snap is not None:
+                return self._snapshot_alive(snap, pane_id)
         panes = self._list_panes()
         if not panes:
             return False
@@ -849,12 +1142,14 @@ class WeztermBackend(TerminalBackend):
             return False
 
     def kill_pane(self, pane_id: str) -> None:
+        invalidate_pane_snapshots()
         _run([*self._cli_base_args(), "kill-pane", "--pane-id", pane_id], stderr=subprocess.DEVNULL)
 
     def activate(self, pane_id: str) -> None:
         _run([*self._cli_base_args(), "activate-pane", "--pane-id", pane_id])
 
     def create_pane(self, cmd: str, cwd: str, direction: str = "right", percent: int = 50, parent_pane: Optional[str] = None) -> str:
+        invalidate_pane_snapshots()
         args = [*self._cli_base_args(), "split-pane"]
         force_wsl = os.environ.get("CCB_BACKEND_ENV", "").lower() == "wsl"
         wsl_unc_cwd = _extract_wsl_path_from_unc_like_path(cwd)
@@ -0,0 +1,209 @@
+"""
+Persistent tmux control-mode (`tmux -C`) client for TmuxBackend.
+
+Every TmuxBackend operation used to fork a `tmux` process; a single `send_text` costs four
+(load-buffer, paste-buffer, send-keys, delete-buffer). With CCB_TMUX_CONTROL=1 the backend
+instead keeps one `tmux -C attach` connection per tmux server (socket) and daemon process, writes
+commands to its stdin and reads the `%begin`/`%end` (or `%error`) block each command produces.
+
+The client attaches with `-f no-output,ignore-size` so it never receives pane output or affects
+window sizes. Commands run one at a time under a lock. A timeout, EOF or a failed attach closes the
+connection, and the next call reconnects (after `_RECONNECT_BACKOFF_S` if attaching failed, e.g.
+while the server has no sessions yet). A command that never reached tmux reports None and
+TmuxBackend falls back to the subprocess path; one that was written but got no reply reports a
+failed result instead, since it may have run and repeating paste-buffer or `send-keys Enter`
+would paste or submit a prompt twice.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import subprocess
+import threading
+import time
+from typing import Optional
+
+_ATTACH_TIMEOUT_S = 2.0
+_DEFAULT_TIMEOUT_S = 5.0
+_RECONNECT_BACKOFF_S = 5.0
+# Larger payloads (load-buffer data becomes a single command line) keep using a subprocess.
+_MAX_LINE_BYTES = 1 << 20
+
+
+def control_enabled() -> bool:
+    return (os.environ.get("CCB_TMUX_CONTROL") or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def quote_arg(value: str) -> str:
+    """Quote one argument for tmux's command parser as a double-quoted string on a single line."""
+    out = ['"']
+    for ch in value:
+        if ch in '"\\$':
+            out.append("\\" + ch)
+        elif ch == "\n":
+            out.append("\\n")
+        elif ch == "\r":
+            out.append("\\r")
+        elif ch == "\t":
+            out.append("\\t")
+        elif ch < " " or ch == "\x7f":
+            out.append(f"\\{ord(ch):03o}")
+        else:
+            out.append(ch)
+    out.append('"')
+    return "".join(out)
+
+
+def command_line(args: list[str]) -> str:
+    return " ".join(quote_arg(str(a)) for a in args)
+
+
+class TmuxControlClient:
+    def __init__(self, base_cmd: list[str]):
+        self.base_cmd = list(base_cmd)
+        self._lock = threading.Lock()
+        self._proc: Optional[subprocess.Popen] = None
+        self._blocks: "queue.Queue[Optional[tuple[bool, list[str]]]]" = queue.Queue()
+        self._retry_at = 0.0
+        self.counters = {"commands": 0, "connects": 0, "failures": 0}
+
+    @property
+    def connected(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def _connect(self) -> bool:
+        if self.connected:
+            return True
+        if time.monotonic() < self._retry_at:
+            return False
+        self._close()
+        self._blocks = queue.Queue()
+        try:
+            proc = subprocess.Popen(
+                [*self.base_cmd, "-C", "attach-session", "-f", "no-output,ignore-size"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except Exception:
+            self._retry_at = time.monotonic() + _RECONNECT_BACKOFF_S
+            return False
+        self._proc = proc
+        threading.Thread(target=self._read_loop, args=(proc, self._blocks), name="tmux-control", daemon=True).start()
+        # A no-op round trip proves the attach succeeded (it fails when the server has no sessions).
+        if self._roundtrip("refresh-client", _ATTACH_TIMEOUT_S)[1] is None:
+            self._close()
+            self._retry_at = time.monotonic() + _RECONNECT_BACKOFF_S
+            return False
+        self.counters["connects"] += 1
+        return True
+
+    @staticmethod
+    def _read_loop(proc: subprocess.Popen, blocks: "queue.Queue[Optional[tuple[bool, list[str]]]]") -> None:
+        stdout = proc.stdout
+        current: Optional[tuple[str, bool]] = None
+        lines: list[str] = []
+        try:
+            for raw in iter(stdout.readline, b""):
+                line = raw.decode("utf-8", errors="replace").rstrip("\n")
+                if current is None:
+                    if line.startswith("%begin "):
+                        parts = line.split(" ")
+                        # "%begin <time> <number> <flags>": flags bit 0 marks commands sent by this client
+                        # (the attach itself reports 0).
+                        tag = " ".join(parts[1:3])
+                        mine = len(parts) > 3 and parts[3].isdigit() and int(parts[3]) & 1 == 1
+                        current = (tag, mine)
+                        lines = []
+                    continue
+                # Pane text can itself look like "%end ...": only the line echoing the block's tag closes it.
+                head, _, rest = line.partition(" ")
+                if head in ("%end", "%error") and " ".join(rest.split(" ")[:2]) == current[0]:
+                    if current[1]:
+                        blocks.put((head == "%end", lines))
+                    current = None
+                    continue
+                lines.append(line)
+        except Exception:
+            pass
+        blocks.put(None)
+
+    def _roundtrip(self, line: str, timeout: float) -> tuple[bool, Optional[tuple[bool, list[str]]]]:
+        """(sent, block): `sent` is False only if the line never reached tmux; block is None on timeout/EOF."""
+        proc = self._proc
+        if proc is None or proc.stdin is None:
+            return False, None
+        try:
+            proc.stdin.write(line.encode("utf-8") + b"\n")
+            proc.stdin.flush()
+        except Exception:
+            return False, None
+        try:
+            return True, self._blocks.get(timeout=timeout)
+        except Exception:
+            return True, None
+
+    def _close(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        for closer in (lambda: proc.stdin and proc.stdin.close(), proc.kill, lambda: proc.wait(timeout=1.0)):
+            try:
+                closer()
+            except Exception:
+                pass
+
+    def run(self, args: list[str], *, timeout: Optional[float] = None) -> Optional[subprocess.CompletedProcess]:
+        """
+        Run one tmux command.
+
+        None means the command was never sent (no connection, or the write failed) and the caller may
+        run it another way. Once sent, a timeout or disconnect returns a failed result instead: the
+        command may have run, and re-running e.g. paste-buffer or send-keys Enter would repeat it.
+        """
+        line = command_line(args)
+        if len(line) > _MAX_LINE_BYTES:
+            return None
+        with self._lock:
+            if not self._connect():
+                return None
+            sent, block = self._roundtrip(line, _DEFAULT_TIMEOUT_S if timeout is None else max(0.05, float(timeout)))
+            if block is None:
+                # Timed out or disconnected: the reply stream can no longer be trusted.
+                self.counters["failures"] += 1
+                self._close()
+                if not sent:
+                    return None
+                return subprocess.CompletedProcess(
+                    args=[*self.base_cmd, *args],
+                    returncode=1,
+                    stdout="",
+                    stderr="tmux control: no reply (command may or may not have run)\n",
+                )
+            self.counters["commands"] += 1
+        ok, lines = block
+        text = "".join(f"{ln}\n" for ln in lines)
+        return subprocess.CompletedProcess(
+            args=[*self.base_cmd, *args],
+            returncode=0 if ok else 1,
+            stdout=text if ok else "",
+            stderr="" if ok else text,
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+
+_clients: dict[tuple[str, ...], TmuxControlClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_control_client(base_cmd: list[str]) -> TmuxControlClient:
+    key = tuple(base_cmd)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = TmuxControlClient(base_cmd)
+        return client
@@ -0,0 +1,289 @@
+"""
+Per-log sidecar index of conversation turns (Codex / Claude / Droid JSONL logs).
+
+`cpend N` / `lpend N` / `dpend N` used to reverse-read a bounded tail window and decode every line
+in it, so older turns were either out of reach or cost a bigger window. The index records, per
+turn, where its user line and final assistant line live in the log plus the turn's CCB_REQ_ID:
+
+    (turn number, user offset, user length, assistant offset, assistant length, req_id)
+
+It is extended incrementally from the last indexed byte (the daemons sync it after each reply,
+pend commands sync whatever is left), persisted as JSON under `run_dir()/turn-index`, and a turn or
+the reply for a req_id is then a single seek + read of one line.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence
+
+from askd_runtime import run_dir
+from jsonl_tail import decode_json_line
+from log_map import LogMap
+
+INDEX_VERSION = 1
+# Bytes of the log head checksummed to notice a log replaced under the same path.
+_HEAD_BYTES = 4096
+_REQ_ID_RE = re.compile(r"CCB_REQ_ID:\s*([0-9a-fA-F]{32})")
+
+# Maps a decoded log entry to ("user" | "assistant", text), or None for anything else.
+Classifier = Callable[[Any], "Optional[tuple[str, str]]"]
+
+
+def _persist_enabled() -> bool:
+    raw = os.environ.get("CCB_TURN_INDEX")
+    if raw is None:
+        raw = os.environ.get("CCB_LOG_INDEX") or "1"
+    return raw.strip().lower() not in ("0", "false", "no", "off")
+
+
+@dataclass
+class Turn:
+    n: int
+    # -1 when the turn has no such line (assistant output before the first user line, or no reply yet).
+    user_offset: int
+    user_len: int
+    assistant_offset: int = -1
+    assistant_len: int = 0
+    req_id: Optional[str] = None
+
+    def row(self) -> list:
+        return [self.n, self.user_offset, self.user_len, self.assistant_offset, self.assistant_len, self.req_id]
+
+
+class TurnIndex:
+    def __init__(
+        self,
+        log_path: Path,
+        *,
+        name: str,
+        classify: Classifier,
+        markers: Sequence[bytes] = (),
+        reject: Sequence[bytes] = (),
+        index_path: Optional[Path] = None,
+    ):
+        self.log_path = Path(log_path).expanduser()
+        self.name = name
+        self._classify = classify
+        self._markers = tuple(markers)
+        self._reject = tuple(reject)
+        if index_path is None and _persist_enabled():
+            digest = hashlib.sha1(str(self.log_path).encode("utf-8", errors="ignore")).hexdigest()[:16]
+            index_path = run_dir() / "turn-index" / f"{name}-{digest}.json"
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._turns: list[Turn] = []
+        self._by_req: dict[str, int] = {}
+        self._cursor = 0
+        # crc32 of the first `_head_len` bytes as of the last sync.
+        self._head_len = 0
+        self._head_crc: Optional[int] = None
+        self._loaded = False
+        self.counters = {"syncs": 0, "bytes_scanned": 0, "rebuilds": 0}
+
+    # ---- queries ----
+
+    def sync(self) -> int:
+        """Index whatever was appended since the last sync; returns the number of turns."""
+        with self._lock:
+            self._sync_locked()
+            return len(self._turns)
+
+    def turns(self) -> list[Turn]:
+        with self._lock:
+            self._sync_locked()
+            return list(self._turns)
+
+    def latest(self, n: int, *, skip: int = 0) -> list[tuple[str, str]]:
+        """(question, reply) for the newest `n` answered turns, oldest first, after skipping `skip` newer ones."""
+        with self._lock:
+            self._sync_locked()
+            answered = [t for t in self._turns if t.assistant_offset >= 0]
+        end = len(answered) - max(0, int(skip))
+        picked = answered[max(0, end - max(1, int(n))) : max(0, end)]
+        return [pair for pair in (self.conversation(t) for t in picked) if pair is not None]
+
+    def turn_for_req(self, req_id: str) -> Optional[Turn]:
+        with self._lock:
+            self._sync_locked()
+            i = self._by_req.get(str(req_id or "").strip().lower())
+            return self._turns[i] if i is not None else None
+
+    def conversation(self, turn: Turn) -> Optional[tuple[str, str]]:
+        """(question, reply) for `turn`, one seek + read per line."""
+        if turn.assistant_offset < 0:
+            return None
+        try:
+            with self.log_path.open("rb") as handle:
+                question = self._read_text(handle, turn.user_offset, turn.user_len, "user") if turn.user_offset >= 0 else ""
+                reply = self._read_text(handle, turn.assistant_offset, turn.assistant_len, "assistant")
+        except OSError:
+            return None
+        if reply is None:
+            return None
+        return question or "", reply
+
+    def _read_text(self, handle, offset: int, length: int, role: str) -> Optional[str]:
+        handle.seek(offset)
+        entry = decode_json_line(handle.read(length))
+        event = self._classify(entry) if entry is not None else None
+        if not event or event[0] != role:
+            return None
+        return event[1]
+
+    # ---- maintenance ----
+
+    def _sync_locked(self) -> None:
+        if not self._loaded:
+            self._load()
+            self._loaded = True
+        log = LogMap.open(self.log_path)
+        if log is None:
+            return
+        with log:
+            size = log.size
+            if size < self._cursor or (self._head_len and zlib.crc32(log.view(0, self._head_len)) != self._head_crc):
+                # Truncated or replaced: offsets no longer mean anything.
+                self._reset()
+                self.counters["rebuilds"] += 1
+            if size == self._cursor:
+                return
+            self._scan(log)
+            if self._head_len < _HEAD_BYTES:
+                self._head_len = min(_HEAD_BYTES, self._cursor)
+                self._head_crc = zlib.crc32(log.view(0, self._head_len))
+        self.counters["syncs"] += 1
+        self._save()
+
+    def _reset(self) -> None:
+        self._turns = []
+        self._by_req = {}
+        self._cursor = 0
+        self._head_len = 0
+        self._head_crc = None
+
+    def _scan(self, log: LogMap) -> None:
+        pos = self._cursor
+        # A trailing partial line is left for the next sync.
+        for start, end in log.lines(self._cursor):
+            self._add_line(log, start, end)
+            pos = end + 1
+        self.counters["bytes_scanned"] += pos - self._cursor
+        self._cursor = pos
+
+    def _add_line(self, log: LogMap, offset: int, end: int) -> None:
+        length = end - offset
+        entry = log.decode(offset, end, self._markers, reject=self._reject)
+        if entry is None:
+            return
+        event = self._classify(entry)
+        if not event:
+            return
+        role, text = event
+        current = self._turns[-1] if self._turns else None
+        if role == "user":
+            # Codex logs the same prompt twice (event + response item); keep one turn for both.
+            if current is not None and current.assistant_offset < 0 and current.user_offset >= 0:
+                if self._same_user_line(log, current, text):
+                    return
+            req = _REQ_ID_RE.search(text or "")
+            turn = Turn(len(self._turns) + 1, offset, length, req_id=req.group(1).lower() if req else None)
+            self._turns.append(turn)
+            if turn.req_id:
+                self._by_req[turn.req_id] = len(self._turns) - 1
+            return
+        if role != "assistant":
+            return
+        if current is None:
+            current = Turn(1, -1, 0)
+            self._turns.append(current)
+        # The last assistant line of a turn is its reply (earlier ones are progress/tool chatter).
+        current.assistant_offset, current.assistant_len = offset, length
+
+    def _same_user_line(self, log: LogMap, turn: Turn, text: str) -> bool:
+        event = self._classify(log.decode(turn.user_offset, turn.user_offset + turn.user_len))
+        return bool(event) and event[0] == "user" and event[1] == text
+
+    def _load(self) -> None:
+        if not self.index_path:
+            return
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except Exception:
+            return
+        if not isinstance(data, dict) or data.get("v") != INDEX_VERSION or data.get("path") != str(self.log_path):
+            return
+        try:
+            turns = [Turn(*row) for row in data.get("turns") or []]
+            cursor = int(data.get("cursor") or 0)
+            head_len, head_crc = (int(v) for v in data.get("head") or (0, 0))
+        except Exception:
+            return
+        self._turns = turns
+        self._by_req = {t.req_id: i for i, t in enumerate(turns) if t.req_id}
+        self._cursor = cursor
+        self._head_len, self._head_crc = head_len, head_crc
+
+    def _save(self) -> None:
+        if not self.index_path:
+            return
+        payload = {
+            "v": INDEX_VERSION,
+            "path": str(self.log_path),
+            "cursor": self._cursor,
+            "head": [self._head_len, self._head_crc or 0],
+            "turns": [t.row() for t in self._turns],
+        }
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(payload), encoding="utf-8")
+            os.replace(tmp, self.index_path)
+        except Exception:
+            # Only a warm start; the log itself is the source of truth.
+            pass
+
+
+def sync_in_background(index: TurnIndex) -> None:
+    """Catch the index up off the request path (daemons call this once a reply is complete)."""
+
+    def _run() -> None:
+        try:
+            index.sync()
+        except Exception:
+            pass
+
+    threading.Thread(target=_run, name=f"turn-index-{index.name}", daemon=True).start()
+
+
+_indexes: dict[tuple[str, str], TurnIndex] = {}
+_indexes_lock = threading.Lock()
+_MAX_INDEXES = 64
+
+
+def get_turn_index(
+    name: str,
+    log_path: Path,
+    classify: Classifier,
+    *,
+    markers: Sequence[bytes] = (),
+    reject: Sequence[bytes] = (),
+) -> TurnIndex:
+    """Process-wide index for (`name`, `log_path`)."""
+    log_path = Path(log_path).expanduser()
+    key = (name, str(log_path))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            if len(_indexes) >= _MAX_INDEXES:
+                _indexes.pop(next(iter(_indexes)))
+            index = TurnIndex(log_path, name=name, classify=classify, markers=markers, reject=reject)
+            _indexes[key] = index
+        return index
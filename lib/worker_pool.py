@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+import os
 import queue
 import threading
-from typing import Callable, Generic, Optional, Protocol, TypeVar
+import time
+from collections import deque
+from typing import Any, Callable, Generic, Optional, Protocol, TypeVar
+
+import prompt_spool
+from ccb_protocol import PRIORITY_NORMAL, PRIORITY_RANKS, normalize_priority
 
 
 ResultT = TypeVar("ResultT")
@@ -17,30 +23,271 @@ class QueuedTaskLike(Protocol[ResultT]):
 TaskT = TypeVar("TaskT", bound=QueuedTaskLike)
 
 
+def _env_float(name: str, default: float) -> float:
+    raw = (os.environ.get(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except Exception:
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = (os.environ.get(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except Exception:
+        return default
+
+
+class WorkerPoolFull(RuntimeError):
+    """Raised when a new session needs a worker but every pooled worker is busy and the cap is reached."""
+
+
+def task_priority(task: object) -> str:
+    """Priority class of a queued task (`task.priority` or `task.request.priority`, default `normal`)."""
+    value = getattr(task, "priority", None)
+    if value is None:
+        value = getattr(getattr(task, "request", None), "priority", None)
+    return normalize_priority(value)
+
+
+class PriorityTaskQueue(Generic[TaskT]):
+    """
+    Per-session task queue ordered by priority class, FIFO within a class.
+
+    Aging: every `aging_s` seconds spent waiting promotes a `bulk` task by one class, but never above
+    `normal`, so a fresh interactive ask is always served before any backlog. To keep a steady stream of
+    interactive asks from starving aged work, after `aged_every` consecutive interactive pops that
+    passed over an aged task the oldest aged task is served next.
+    """
+
+    def __init__(self, *, aging_s: Optional[float] = None, aged_every: Optional[int] = None):
+        if aging_s is None:
+            aging_s = _env_float("CCB_QUEUE_AGING_S", 30.0)
+        if aged_every is None:
+            aged_every = _env_int("CCB_QUEUE_AGED_EVERY", 4)
+        self.aging_s = max(0.0, float(aging_s))
+        self.aged_every = max(1, int(aged_every))
+        # Consecutive interactive pops while an aged task was waiting.
+        self._passed_over = 0
+        self._cond = threading.Condition(threading.Lock())
+        self._queues: dict[str, deque[tuple[int, float, TaskT]]] = {p: deque() for p in PRIORITY_RANKS}
+        self._seq = 0
+        self._closed = False
+
+    def put(self, task: TaskT, priority: str = PRIORITY_NORMAL) -> None:
+        priority = normalize_priority(priority)
+        with self._cond:
+            self._seq += 1
+            self._queues[priority].append((self._seq, time.monotonic(), task))
+            self._cond.notify()
+
+    def _effective_rank(self, priority: str, enqueued: float, now: float) -> int:
+        base = PRIORITY_RANKS[priority]
+        if base <= 1 or self.aging_s <= 0:
+            return base
+        steps = int((now - enqueued) // self.aging_s)
+        return max(1, base - steps)
+
+    def _pop_best(self) -> Optional[tuple[TaskT, str, float]]:
+        now = time.monotonic()
+        best: Optional[tuple[int, int, str]] = None
+        aged: Optional[tuple[int, int, str]] = None
+        for priority, items in self._queues.items():
+            if not items:
+                continue
+            seq, enqueued, _task = items[0]
+            rank = self._effective_rank(priority, enqueued, now)
+            key = (rank, seq, priority)
+            if best is None or key < best:
+                best = key
+            if rank < PRIORITY_RANKS[priority] and (aged is None or key < aged):
+                aged = key
+        if best is None:
+            return None
+        if best[0] == 0 and aged is not None:
+            if self._passed_over >= self.aged_every:
+                best = aged
+                self._passed_over = 0
+            else:
+                self._passed_over += 1
+        elif best[0] > 0:
+            self._passed_over = 0
+        priority = best[2]
+        _seq, enqueued, task = self._queues[priority].popleft()
+        return task, priority, now - enqueued
+
+    def get(self, timeout: Optional[float] = None) -> tuple[TaskT, str, float]:
+        """Return (task, priority, waited_s); raises `queue.Empty` on timeout or once the queue is closed and drained."""
+        deadline = None if timeout is None else time.monotonic() + max(0.0, float(timeout))
+        with self._cond:
+            while True:
+                item = self._pop_best()
+                if item is not None:
+                    return item
+                if self._closed:
+                    raise queue.Empty
+                if deadline is None:
+                    self._cond.wait()
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise queue.Empty
+                self._cond.wait(remaining)
+
+    def close(self) -> None:
+        """Wake every blocked `get()`; subsequent gets raise `queue.Empty` once no tasks remain."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def qsize(self) -> int:
+        with self._cond:
+            return sum(len(items) for items in self._queues.values())
+
+    def pending_by_priority(self) -> dict[str, int]:
+        with self._cond:
+            return {p: len(items) for p, items in self._queues.items()}
+
+
 class BaseSessionWorker(threading.Thread, Generic[TaskT, ResultT]):
     def __init__(self, session_key: str):
         super().__init__(daemon=True)
         self.session_key = session_key
-        self._q: "queue.Queue[TaskT]" = queue.Queue()
+        self._q: PriorityTaskQueue[TaskT] = PriorityTaskQueue()
         self._stop_event = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._served: dict[str, int] = {p: 0 for p in PRIORITY_RANKS}
+        self._wait_ms_total: dict[str, int] = {p: 0 for p in PRIORITY_RANKS}
+        self._wait_ms_max: dict[str, int] = {p: 0 for p in PRIORITY_RANKS}
+        self._busy = False
+        # Tasks enqueued and not yet finished. Raised by enqueue() (under the pool lock in submit), so a
+        # task the worker has already popped but not started still keeps it from looking idle.
+        self._pending = 0
+        self.last_active = time.monotonic()
+        # Provider log reader parked by the previous request: (binding key, reader, cursor state).
+        self._warm_reader: Optional[tuple[object, Any, dict]] = None
+        self._readers_warm = 0
+        self._readers_cold = 0
+        # Large prompts spooled to files by the current task (see prompt_spool), released after it.
+        self._spooled: list[prompt_spool.SpooledPrompt] = []
+        # Set by PerSessionWorkerPool; a standalone worker never retires on its own.
+        self._pool: Optional[PerSessionWorkerPool] = None
+        self._idle_timeout_s = 0.0
 
     def enqueue(self, task: TaskT) -> None:
-        self._q.put(task)
+        with self._stats_lock:
+            self._pending += 1
+        self._q.put(task, task_priority(task))
 
     def stop(self) -> None:
         self._stop_event.set()
+        self._q.close()
+
+    def is_idle(self) -> bool:
+        with self._stats_lock:
+            return self._pending == 0
+
+    def stats(self) -> dict:
+        pending = self._q.pending_by_priority()
+        with self._stats_lock:
+            return {
+                "session_key": self.session_key,
+                "pending": pending,
+                "served": dict(self._served),
+                "wait_ms_total": dict(self._wait_ms_total),
+                "wait_ms_max": dict(self._wait_ms_max),
+                "busy": self._busy,
+                "readers_warm": self._readers_warm,
+                "readers_cold": self._readers_cold,
+                "idle_s": 0.0 if self._busy else round(time.monotonic() - self.last_active, 3),
+            }
+
+    def _record_dequeue(self, priority: str, waited_s: float) -> None:
+        waited_ms = int(waited_s * 1000)
+        with self._stats_lock:
+            self._served[priority] += 1
+            self._wait_ms_total[priority] += waited_ms
+            self._wait_ms_max[priority] = max(self._wait_ms_max[priority], waited_ms)
+
+    def _acquire_reader(self, key: object, factory: Callable[[], Any]) -> tuple[Any, dict]:
+        """
+        Return (reader, state) for a new request.
+
+        The reader parked by the previous request is reused when `key` (the session's log binding) is
+        unchanged and `reader.resume_state()` accepts its cursor; tailing then starts with no log discovery.
+        Otherwise a fresh reader from `factory` captures state from scratch.
+        """
+        warm, self._warm_reader = self._warm_reader, None
+        if warm is not None and warm[0] == key:
+            reader, state = warm[1], warm[2]
+            try:
+                resumed = reader.resume_state(state)
+            except Exception:
+                resumed = None
+            if resumed is not None:
+                self._readers_warm += 1
+                return reader, resumed
+        reader = factory()
+        self._readers_cold += 1
+        return reader, reader.capture_state()
+
+    def _park_reader(self, key: object, reader: Any, state: Any) -> None:
+        """Keep `reader` and its end-of-reply cursor for the next request on this session."""
+        if isinstance(state, dict):
+            self._warm_reader = (key, reader, dict(state))
+
+    def _spool_message(self, work_dir: object, message: str) -> str:
+        """
+        The message to wrap and send: `message` itself, or for a large one a short pointer to its spool file.
+
+        The file is released when the task finishes (deleted if its result saw the done marker).
+        """
+        spooled = prompt_spool.spool(str(work_dir), message)
+        if spooled is None:
+            return message
+        self._spooled.append(spooled)
+        return prompt_spool.spooled_message(spooled)
+
+    def _release_spooled(self, result: object) -> None:
+        spooled, self._spooled = self._spooled, []
+        completed = bool(getattr(result, "done_seen", False))
+        for item in spooled:
+            prompt_spool.release(item, completed=completed)
+
+    def _attach_pool(self, pool: PerSessionWorkerPool, idle_timeout_s: float) -> None:
+        self._pool = pool
+        self._idle_timeout_s = max(0.0, float(idle_timeout_s))
 
     def run(self) -> None:
         while not self._stop_event.is_set():
+            # Block until work arrives (or stop() closes the queue); the only timed wake is idle retirement.
+            idle_timeout = self._idle_timeout_s if (self._pool is not None and self._idle_timeout_s > 0) else None
             try:
-                task = self._q.get(timeout=0.2)
+                task, priority, waited_s = self._q.get(timeout=idle_timeout)
             except queue.Empty:
+                if self._stop_event.is_set():
+                    break
+                pool = self._pool
+                if pool is not None and pool.retire(self):
+                    break
                 continue
+            self._busy = True
+            self._record_dequeue(priority, waited_s)
             try:
                 task.result = self._handle_task(task)
             except Exception as exc:
                 task.result = self._handle_exception(exc, task)
             finally:
+                self._release_spooled(task.result)
+                self.last_active = time.monotonic()
+                self._busy = False
+                with self._stats_lock:
+                    self._pending -= 1
                 task.done_event.set()
 
     def _handle_task(self, task: TaskT) -> ResultT:
@@ -54,18 +301,107 @@ WorkerT = TypeVar("WorkerT", bound=threading.Thread)
 
 
 class PerSessionWorkerPool(Generic[WorkerT]):
-    def __init__(self):
+    """
+    One worker thread per session key, created on demand.
+
+    Idle workers retire themselves after `idle_timeout_s` (CCB_WORKER_IDLE_TIMEOUT_S, 0 disables) and are
+    recreated by the next submit for that session. `max_workers` (CCB_MAX_SESSION_WORKERS, 0 = unlimited)
+    caps live threads: a new session evicts the least recently active idle worker, and is refused with
+    `WorkerPoolFull` only when every worker is busy.
+    """
+
+    def __init__(self, *, idle_timeout_s: Optional[float] = None, max_workers: Optional[int] = None):
+        if idle_timeout_s is None:
+            idle_timeout_s = _env_float("CCB_WORKER_IDLE_TIMEOUT_S", 300.0)
+        if max_workers is None:
+            max_workers = _env_int("CCB_MAX_SESSION_WORKERS", 64)
+        self.idle_timeout_s = max(0.0, float(idle_timeout_s))
+        self.max_workers = max(0, int(max_workers))
         self._lock = threading.Lock()
         self._workers: dict[str, WorkerT] = {}
+        self._counters = {"created": 0, "retired": 0, "evicted": 0, "rejected": 0}
+
+    def _get_or_create_locked(self, session_key: str, factory: Callable[[str], WorkerT]) -> tuple[WorkerT, bool]:
+        worker = self._workers.get(session_key)
+        if worker is not None:
+            return worker, False
+        if self.max_workers and len(self._workers) >= self.max_workers:
+            self._evict_idle_locked()
+        worker = factory(session_key)
+        attach = getattr(worker, "_attach_pool", None)
+        if callable(attach):
+            attach(self, self.idle_timeout_s)
+        self._workers[session_key] = worker
+        self._counters["created"] += 1
+        return worker, True
+
+    def _evict_idle_locked(self) -> None:
+        idle = [w for w in self._workers.values() if getattr(w, "is_idle", lambda: False)()]
+        if not idle:
+            self._counters["rejected"] += 1
+            raise WorkerPoolFull(f"session worker pool full ({len(self._workers)} busy workers)")
+        victim = min(idle, key=lambda w: getattr(w, "last_active", 0.0))
+        self._workers.pop(getattr(victim, "session_key"), None)
+        self._counters["evicted"] += 1
+        stop = getattr(victim, "stop", None)
+        if callable(stop):
+            stop()
 
     def get_or_create(self, session_key: str, factory: Callable[[str], WorkerT]) -> WorkerT:
-        created = False
         with self._lock:
-            worker = self._workers.get(session_key)
-            if worker is None:
-                worker = factory(session_key)
-                self._workers[session_key] = worker
-                created = True
+            worker, created = self._get_or_create_locked(session_key, factory)
         if created:
             worker.start()
         return worker
+
+    def submit(self, session_key: str, factory: Callable[[str], WorkerT], task: object) -> WorkerT:
+        """
+        Enqueue `task` on the session's worker, creating it if needed.
+
+        Lookup and enqueue happen under the pool lock, so a worker deciding to retire can never swallow
+        a task handed to it concurrently.
+        """
+        with self._lock:
+            worker, created = self._get_or_create_locked(session_key, factory)
+            worker.enqueue(task)  # type: ignore[attr-defined]
+        if created:
+            worker.start()
+        return worker
+
+    def retire(self, worker: WorkerT) -> bool:
+        """Called by an idle worker; True means it was unregistered and should exit."""
+        with self._lock:
+            key = getattr(worker, "session_key", None)
+            if self._workers.get(key) is not worker:
+                # Already evicted (or replaced); let it exit.
+                return True
+            if not getattr(worker, "is_idle", lambda: True)():
+                return False
+            del self._workers[key]
+            self._counters["retired"] += 1
+        stop = getattr(worker, "stop", None)
+        if callable(stop):
+            stop()
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            workers = list(self._workers.values())
+            counters = dict(self._counters)
+        active = sum(1 for w in workers if not getattr(w, "is_idle", lambda: False)())
+        sessions: list[dict] = []
+        for worker in workers:
+            getter = getattr(worker, "stats", None)
+            if callable(getter):
+                try:
+                    sessions.append(getter())
+                except Exception:
+                    continue
+        return {
+            "workers": len(workers),
+            "active": active,
+            **counters,
+            "max_workers": self.max_workers,
+            "idle_timeout_s": self.idle_timeout_s,
+            "sessions": sessions,
+        }
@@ -66,6 +66,12 @@ def _ask_schema() -> dict[str, Any]:
                 "type": "string",
                 "description": "Path to the provider session file (e.g., .codex-session).",
             },
+            "priority": {
+                "type": "string",
+                "enum": ["interactive", "normal", "bulk"],
+                "description": "Daemon queue priority; delegated tasks default to bulk so interactive asks go first.",
+                "default": "bulk",
+            },
         },
         "required": ["message"],
     }
@@ -236,12 +242,13 @@ def _write_json(path: Path, data: dict[str, Any]) -> None:
         pass
 
 
-def _spawn_background(cmd: list[str], message: str, meta_path: Path) -> int | None:
+def _spawn_background(cmd: list[str], message: str, meta_path: Path, env: dict[str, str] | None = None) -> int | None:
     _ensure_cache()
     try:
         stderr_handle = LOG_PATH.open("a", encoding="utf-8")
         proc = subprocess.Popen(
             cmd,
+            env=env,
             stdin=subprocess.PIPE,
             stdout=subprocess.DEVNULL,
             stderr=stderr_handle,
@@ -302,6 +309,10 @@ def _submit_task(provider: str, args: dict[str, Any]) -> dict[str, Any]:
     if session_file and not Path(session_file).expanduser().exists():
         return _tool_error(f"session_file not found: {session_file}")
 
+    priority = str(args.get("priority") or "bulk").strip().lower()
+    if priority not in ("interactive", "normal", "bulk"):
+        return _tool_error(f"invalid priority: {priority}")
+
     task_id = _make_task_id(provider)
     out_path = _output_path(task_id)
     meta_path = _meta_path(task_id)
@@ -315,13 +326,16 @@ def _submit_task(provider: str, args: dict[str, Any]) -> dict[str, Any]:
         "provider": provider,
         "output_file": str(out_path),
         "session_file": session_file,
+        "priority": priority,
         "status": "running",
         "started_at": int(time.time()),
         "exit_code": None,
     }
     _write_json(meta_path, meta)
 
-    pid = _spawn_background(cmd, message, meta_path)
+    env = dict(os.environ)
+    env["CCB_ASK_PRIORITY"] = priority
+    pid = _spawn_background(cmd, message, meta_path, env=env)
     if pid is None:
         return _tool_error("failed to launch provider command")
 
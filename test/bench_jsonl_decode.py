@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark: json.loads on every line vs decode_json_line (byte prefilter + optional orjson).
+
+    python test/bench_jsonl_decode.py                        # synthetic Codex-shaped log (~80 MB)
+    python test/bench_jsonl_decode.py --turns 200            # smaller log
+    python test/bench_jsonl_decode.py --log ~/.codex/sessions/2026/01/02/rollout-....jsonl
+
+All variants must extract the same replies/events; the script exits non-zero if they differ.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "lib"))
+
+import jsonl_tail  # noqa: E402
+from codex_comm import CodexLogReader, _NOISE_HEADS, _REPLY_MARKERS  # noqa: E402
+
+
+def _write_log(path: Path, turns: int) -> None:
+    rng = random.Random(7)
+    # Tool output is mostly code and shell text: newlines, quotes, tabs and the odd non-ASCII char.
+    words = 'def return "path" self.reader\n offset=0 \tpass {"ok": true} naïve → ✓ session/daemon'.split(" ")
+
+    def text(n: int) -> str:
+        return " ".join(rng.choice(words) for _ in range(n))
+
+    def item(kind: str, payload: dict) -> str:
+        return json.dumps({"timestamp": "2026-01-02T03:04:05.678Z", "type": kind, "payload": payload}, separators=(",", ":")) + "\n"
+
+    with path.open("w", encoding="utf-8") as fh:
+        fh.write(item("session_meta", {"id": "sid-1", "cwd": "/work/proj", "cli_version": "0.1"}))
+        for t in range(turns):
+            fh.write(item("turn_context", {"cwd": "/work/proj", "approval_policy": "never", "model": "m"}))
+            fh.write(item("event_msg", {"type": "user_message", "message": f"question {t}: {text(40)}"}))
+            fh.write(item("response_item", {"type": "message", "role": "user", "content": [{"type": "input_text", "text": text(40)}]}))
+            for c in range(rng.randint(3, 8)):
+                fh.write(item("response_item", {"type": "reasoning", "summary": [{"type": "summary_text", "text": text(60)}], "encrypted_content": "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/") for _ in range(2000))}))
+                fh.write(item("response_item", {"type": "function_call", "name": "shell", "arguments": json.dumps({"command": ["rg", text(3)]}), "call_id": f"c{t}-{c}"}))
+                fh.write(item("response_item", {"type": "function_call_output", "call_id": f"c{t}-{c}", "output": text(rng.randint(200, 3000))}))
+                fh.write(item("event_msg", {"type": "token_count", "info": {"total_token_usage": {"input_tokens": t * 1000 + c}}}))
+            fh.write(item("event_msg", {"type": "agent_message", "message": f"answer {t}: {text(120)}"}))
+            fh.write(item("response_item", {"type": "message", "role": "assistant", "content": [{"type": "output_text", "text": f"answer {t}: {text(120)}"}]}))
+
+
+def legacy(lines: list[bytes]) -> list:
+    out = []
+    for raw in lines:
+        line = raw.decode("utf-8", errors="ignore").strip()
+        if not line:
+            continue
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        event = CodexLogReader._extract_event(entry)
+        if event is not None:
+            out.append(event)
+    return out
+
+
+def fast(lines: list[bytes]) -> list:
+    out = []
+    for raw in lines:
+        entry = jsonl_tail.decode_json_line(raw, _REPLY_MARKERS, reject=_NOISE_HEADS, errors="ignore")
+        if not isinstance(entry, dict):
+            continue
+        event = CodexLogReader._extract_event(entry)
+        if event is not None:
+            out.append(event)
+    return out
+
+
+def _time(fn, repeat: int) -> tuple[float, list]:
+    best = float("inf")
+    result: list = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log", help="existing Codex JSONL log (default: build a synthetic one)")
+    parser.add_argument("--turns", type=int, default=800)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(args.log).expanduser() if args.log else Path(tmp) / "rollout.jsonl"
+        if not args.log:
+            _write_log(path, args.turns)
+        lines = path.read_bytes().splitlines(keepends=True)
+        size = path.stat().st_size
+
+    orjson_mod = jsonl_tail._orjson
+    legacy_t, base = _time(lambda: legacy(lines), args.repeat)
+    jsonl_tail._orjson = None
+    stdlib_t, stdlib = _time(lambda: fast(lines), args.repeat)
+    jsonl_tail._orjson = orjson_mod
+    codec_t, codec = _time(lambda: fast(lines), args.repeat) if orjson_mod else (float("nan"), stdlib)
+
+    print(f"log={path} size={size / 1e6:.1f} MB lines={len(lines)} events={len(base)}")
+    print(f"  json.loads every line     {legacy_t * 1000:9.1f} ms")
+    print(f"  prefilter + json          {stdlib_t * 1000:9.1f} ms  ({legacy_t / stdlib_t:.1f}x)")
+    if orjson_mod:
+        print(f"  prefilter + orjson        {codec_t * 1000:9.1f} ms  ({legacy_t / codec_t:.1f}x)")
+    else:
+        print("  prefilter + orjson        (orjson not installed)")
+    if not (base == stdlib == codec):
+        print("MISMATCH: decoders disagree on extracted events", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
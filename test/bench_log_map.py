@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark: chunked copy-and-split log readers vs log_map (mmap + line spans).
+
+    python test/bench_log_map.py                 # synthetic Codex-shaped log (~130 MB)
+    python test/bench_log_map.py --log ~/.codex/sessions/2026/01/02/rollout-....jsonl
+
+Two scans, each run both ways: a full backward walk (the old `_iter_lines_reverse` pattern,
+`buffer = chunk + buffer`) and a full forward walk (read chunk, prepend carry, split). Both filter
+lines with the Codex reply markers and decode the survivors. Reports wall time and the peak of
+Python-level allocations (tracemalloc); results must match or the script exits non-zero.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "lib"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_jsonl_decode import _write_log  # noqa: E402
+from codex_comm import CodexLogReader, _NOISE_HEADS, _REPLY_MARKERS  # noqa: E402
+from jsonl_tail import decode_json_line  # noqa: E402
+from log_map import LogMap  # noqa: E402
+
+
+def _keep(entry) -> bool:
+    return isinstance(entry, dict) and CodexLogReader._extract_event(entry) is not None
+
+
+def legacy_reverse(path: Path) -> int:
+    found = 0
+    with path.open("rb") as handle:
+        handle.seek(0, os.SEEK_END)
+        position = handle.tell()
+        buffer = b""
+        while position > 0:
+            read_size = min(8192, position)
+            position -= read_size
+            handle.seek(position)
+            buffer = handle.read(read_size) + buffer
+            parts = buffer.split(b"\n")
+            buffer = parts[0]
+            for part in reversed(parts[1:]):
+                found += _keep(decode_json_line(part, _REPLY_MARKERS, reject=_NOISE_HEADS))
+        if buffer:
+            found += _keep(decode_json_line(buffer, _REPLY_MARKERS, reject=_NOISE_HEADS))
+    return found
+
+
+def legacy_forward(path: Path) -> int:
+    found = 0
+    carry = b""
+    with path.open("rb") as handle:
+        while True:
+            data = handle.read(1 << 20)
+            if not data:
+                break
+            buf = carry + data
+            end = buf.rfind(b"\n")
+            if end < 0:
+                carry = buf
+                continue
+            carry = buf[end + 1 :]
+            for raw in buf[:end].split(b"\n"):
+                found += _keep(decode_json_line(raw, _REPLY_MARKERS, reject=_NOISE_HEADS))
+    return found
+
+
+def mapped_reverse(path: Path) -> int:
+    with LogMap(path) as log:
+        return sum(_keep(log.decode(s, e, _REPLY_MARKERS, reject=_NOISE_HEADS)) for s, e in log.lines_reverse())
+
+
+def mapped_forward(path: Path) -> int:
+    with LogMap(path) as log:
+        return sum(_keep(log.decode(s, e, _REPLY_MARKERS, reject=_NOISE_HEADS)) for s, e in log.lines())
+
+
+def _measure(fn, path: Path, repeat: int) -> tuple[float, int, int]:
+    best = float("inf")
+    result = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(path)
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    fn(path)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log", help="existing JSONL log (default: build a synthetic one)")
+    parser.add_argument("--turns", type=int, default=1400)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(args.log).expanduser() if args.log else Path(tmp) / "rollout.jsonl"
+        if not args.log:
+            _write_log(path, args.turns)
+        print(f"log={path} size={path.stat().st_size / 1e6:.1f} MB")
+        results = []
+        for label, fn in (
+            ("reverse, chunk + buffer", legacy_reverse),
+            ("reverse, mmap spans", mapped_reverse),
+            ("forward, carry + split", legacy_forward),
+            ("forward, mmap spans", mapped_forward),
+        ):
+            elapsed, peak, found = _measure(fn, path, args.repeat)
+            results.append(found)
+            print(f"  {label:26s} {elapsed * 1000:8.1f} ms   peak alloc {peak / 1e6:7.2f} MB   events={found}")
+
+    if len(set(results)) != 1:
+        print("MISMATCH: readers disagree", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
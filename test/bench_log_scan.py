@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark: legacy glob + stat + header-open scan vs log_scan (parallel scandir + pooled header reads).
+
+    python test/bench_log_scan.py                       # synthetic Codex-style tree in a temp dir
+    python test/bench_log_scan.py --root ~/.codex/sessions --top 20
+    python test/bench_log_scan.py --delay-ms 2          # model a slow filesystem (per header read)
+
+Both sides must return the same top-N paths; the script exits non-zero if they differ.
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "lib"))
+
+from log_scan import map_bounded, newest, scan_tree  # noqa: E402
+
+
+def _build_tree(root: Path, days: int, per_day: int) -> None:
+    n = 0
+    for d in range(days):
+        day_dir = root / "2026" / f"{1 + d // 28:02d}" / f"{1 + d % 28:02d}"
+        day_dir.mkdir(parents=True, exist_ok=True)
+        for i in range(per_day):
+            n += 1
+            path = day_dir / f"rollout-{d:04d}-{i:03d}.jsonl"
+            meta = {"type": "session_meta", "payload": {"cwd": f"/proj/{n % 17}", "id": f"sid-{n}"}}
+            path.write_text(json.dumps(meta) + "\n" + '{"type":"response_item"}\n' * 20, encoding="utf-8")
+            os.utime(path, ns=(n * 1_000_000_000, n * 1_000_000_000))
+
+
+def _read_header(path: str, delay_s: float) -> str:
+    if delay_s:
+        time.sleep(delay_s)
+    with open(path, "rb") as handle:
+        return handle.readline().decode("utf-8", errors="replace")
+
+
+def legacy_scan(root: Path, top: int, delay_s: float) -> list[str]:
+    found = []
+    for p in root.glob("**/*.jsonl"):
+        if not p.is_file() or p.name.startswith("."):
+            continue
+        st = p.stat()
+        found.append((st.st_mtime_ns, str(p)))
+    best = heapq.nlargest(top, found)
+    # Cold discovery has to read every header once (cwd / session id matching).
+    for _mtime, path in found:
+        _read_header(path, delay_s)
+    return [path for _mtime, path in best]
+
+
+def parallel_scan(root: Path, top: int, delay_s: float, workers: int) -> list[str]:
+    files = scan_tree(str(root), lambda name: name.endswith(".jsonl"), workers=workers)
+    best = newest(files, top)
+    map_bounded(lambda f: _read_header(f.path, delay_s), files, workers=workers)
+    return [f.path for f in best]
+
+
+def _time(fn, repeat: int) -> tuple[float, list[str]]:
+    best = float("inf")
+    result: list[str] = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", help="existing log tree (default: build a synthetic one)")
+    parser.add_argument("--days", type=int, default=120)
+    parser.add_argument("--per-day", type=int, default=15)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--delay-ms", type=float, default=0.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    delay_s = max(0.0, args.delay_ms) / 1000.0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(args.root).expanduser() if args.root else Path(tmp) / "sessions"
+        if not args.root:
+            _build_tree(root, args.days, args.per_day)
+
+        legacy_t, legacy = _time(lambda: legacy_scan(root, args.top, delay_s), args.repeat)
+        serial_t, serial = _time(lambda: parallel_scan(root, args.top, delay_s, 1), args.repeat)
+        par_t, par = _time(lambda: parallel_scan(root, args.top, delay_s, args.workers), args.repeat)
+
+    print(f"root={root} top={args.top} delay_ms={args.delay_ms} workers={args.workers}")
+    print(f"  glob+stat+open      {legacy_t * 1000:9.1f} ms")
+    print(f"  scandir (serial)    {serial_t * 1000:9.1f} ms")
+    print(f"  scandir (parallel)  {par_t * 1000:9.1f} ms  ({legacy_t / par_t if par_t else 0:.1f}x)")
+    if not (legacy == serial == par):
+        print("MISMATCH: scanners disagree on the top-N set", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark: fixed-interval stat polling vs the adaptive poll cadence (reactor without inotify).
+
+    python test/bench_poll_schedule.py             # 8s simulated reply, 3 past replies of history
+    python test/bench_poll_schedule.py --scale 4   # 32s reply
+
+A writer thread plays a provider turn into a log: the anchor 0.2s after send, silence while the
+model thinks, a burst of streamed chunks, then the done line. A daemon-style loop waits on the
+reactor (poll mode) and records when it noticed the final write. Reports reactor ticks, stat calls
+and the done detection latency for both cadences.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "lib"))
+
+from askd_reactor import Reactor  # noqa: E402
+from poll_schedule import PollCadence, ReplyTimings  # noqa: E402
+
+
+def _writer(path: Path, scale: float, done_at: list[float]) -> None:
+    def _append(text: str) -> None:
+        with path.open("a", encoding="utf-8") as fh:
+            fh.write(text)
+
+    time.sleep(0.2)
+    _append("anchor\n")
+    time.sleep(6.5 * scale)
+    for i in range(5):
+        _append(f"chunk {i}\n")
+        time.sleep(0.2)
+    done_at.append(time.monotonic())
+    _append("done\n")
+
+
+def run(adaptive: bool, scale: float, history: int) -> tuple[dict, float]:
+    timings = ReplyTimings()
+    for i in range(history):
+        timings.record("bench", "s", anchor_ms=200, done_ms=int((7.4 * scale + 0.1 * i) * 1000))
+    reactor = Reactor(poll_interval=0.05, use_inotify=False)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "s.jsonl"
+        path.write_text("", encoding="utf-8")
+        done_at: list[float] = []
+        cadence = PollCadence(timings, "bench", "s", fast=0.05, slow=1.0, adaptive=adaptive)
+        threading.Thread(target=_writer, args=(path, scale, done_at), daemon=True).start()
+        seen = 0
+        while True:
+            baseline = reactor.snapshot([path])
+            text = path.read_text(encoding="utf-8")
+            if len(text) > seen:
+                seen = len(text)
+                if "anchor" in text:
+                    cadence.anchor()
+                cadence.activity()
+                if "done" in text:
+                    return reactor.stats(), time.monotonic() - done_at[0]
+            reactor.wait_for_change([path], 2.0, baseline=baseline, poll_interval=cadence.interval)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--history", type=int, default=3)
+    args = parser.parse_args()
+    for label, adaptive in (("fixed 50ms", False), ("adaptive", True)):
+        stats, latency = run(adaptive, args.scale, args.history)
+        print(f"  {label:12s} ticks={stats['ticks']:5d} stats={stats['stats']:5d} done latency={latency * 1000:6.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
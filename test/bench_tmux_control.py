@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark: TmuxBackend operations via one `tmux` subprocess per command vs the persistent
+control-mode connection (CCB_TMUX_CONTROL=1).
+
+    python test/bench_tmux_control.py              # 200 iterations per operation
+    python test/bench_tmux_control.py --iterations 50
+
+Runs against a private tmux server (`-L ccb-bench-<pid>`) with one `cat` pane, which is killed at
+the end. send_text runs with CCB_TMUX_ENTER_DELAY=0 so only tmux round trips are measured.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "lib"))
+
+import terminal  # noqa: E402
+from tmux_control import get_control_client  # noqa: E402
+
+
+def _measure(fn, iterations: int) -> tuple[float, float]:
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    samples.sort()
+    return statistics.median(samples) * 1000, samples[int(len(samples) * 0.95) - 1] * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    if shutil.which("tmux") is None:
+        print("tmux not installed", file=sys.stderr)
+        return 1
+
+    socket = f"ccb-bench-{os.getpid()}"
+    os.environ["CCB_TMUX_ENTER_DELAY"] = "0"
+    subprocess.run(["tmux", "-L", socket, "new-session", "-d", "-s", "b", "-x", "200", "-y", "50", "cat"], check=True)
+    try:
+        backend = terminal.TmuxBackend(socket_name=socket)
+        pane = backend._tmux_run(["list-panes", "-t", "b", "-F", "#{pane_id}"], capture=True).stdout.strip()
+        ops = (
+            ("is_alive", lambda: backend.is_alive(pane)),
+            ("get_pane_content", lambda: backend.get_pane_content(pane, lines=50)),
+            ("send_text", lambda: backend.send_text(pane, "hello from the benchmark\nsecond line")),
+        )
+        print(f"{subprocess.run(['tmux', '-V'], capture_output=True, text=True).stdout.strip()}, {args.iterations} iterations")
+        print(f"  {'operation':18s} {'subprocess p50/p95':>22s} {'control p50/p95':>22s}")
+        for name, fn in ops:
+            os.environ["CCB_TMUX_CONTROL"] = "0"
+            sub = _measure(fn, args.iterations)
+            os.environ["CCB_TMUX_CONTROL"] = "1"
+            fn()  # connect outside the measurement
+            ctl = _measure(fn, args.iterations)
+            print(f"  {name:18s} {sub[0]:9.2f} /{sub[1]:7.2f} ms {ctl[0]:9.2f} /{ctl[1]:7.2f} ms   x{sub[0] / max(ctl[0], 1e-9):.1f}")
+        backend._tmux_run(["send-keys", "-t", pane, "C-c"])
+    finally:
+        get_control_client(["tmux", "-L", socket]).close()
+        subprocess.run(["tmux", "-L", socket, "kill-server"], capture_output=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
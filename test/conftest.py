@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 import sys
 from pathlib import Path
 
@@ -8,4 +9,8 @@ def pytest_configure() -> None:
     repo_root = Path(__file__).resolve().parents[1]
     lib_dir = repo_root / "lib"
     sys.path.insert(0, str(lib_dir))
+    # Discovery indexes built over tmp trees must not be persisted into the user's run dir.
+    os.environ.setdefault("CCB_LOG_INDEX", "0")
 
+    # Pane snapshots are process-global; tests that exercise them enable the cache explicitly.
+    os.environ.setdefault("CCB_PANE_SNAPSHOT_TTL", "0")
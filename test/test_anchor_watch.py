@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import anchor_watch
+from anchor_watch import AnchorWatch
+
+ANCHOR = "CCB_REQ_ID: 0123abcd"
+
+
+def _append(path: Path, text: str) -> None:
+    with path.open("a", encoding="utf-8") as fh:
+        fh.write(text)
+
+
+def test_binds_existing_log_at_armed_size(tmp_path: Path) -> None:
+    bound = tmp_path / "a.jsonl"
+    other = tmp_path / "b.jsonl"
+    bound.write_text('{"old":"CCB_REQ_ID: 0123abcd"}\n', encoding="utf-8")
+    other.write_text("{}\n", encoding="utf-8")
+    armed = other.stat().st_size
+    watch = AnchorWatch([tmp_path, tmp_path / "2026" / "01" / "02"], ANCHOR)
+    assert tmp_path in watch.watch_paths()
+
+    # Anchors already present before arming are history, and unrelated growth is not a hit.
+    assert watch.poll() is None
+    _append(bound, '{"n":1}\n')
+    assert watch.poll() is None
+
+    _append(other, '{"text":"CCB_REQ_ID: 0123abcd"}\n')
+    hit = watch.poll()
+    assert hit is not None and hit.path == other and hit.offset == armed
+    assert watch.poll() is hit
+
+
+def test_new_log_is_read_from_start(tmp_path: Path) -> None:
+    watch = AnchorWatch([tmp_path], ANCHOR)
+    fresh = tmp_path / "new.jsonl"
+    fresh.write_text('{"text":"CCB_REQ_ID: 0123abcd"}\n', encoding="utf-8")
+    (tmp_path / "ignored.txt").write_text(ANCHOR, encoding="utf-8")
+    hit = watch.poll()
+    assert hit is not None and hit.path == fresh and hit.offset == 0
+
+
+def test_anchor_split_across_writes(tmp_path: Path) -> None:
+    log = tmp_path / "s.jsonl"
+    log.write_text("", encoding="utf-8")
+    watch = AnchorWatch([tmp_path], ANCHOR)
+    _append(log, "x" * 23 + "CCB_REQ_ID: 01")
+    assert watch.poll() is None
+    _append(log, "23abcd\n" + "y" * 40)
+    hit = watch.poll()
+    assert hit is not None and hit.path == log and hit.offset == 0
+
+
+def test_anchor_split_across_read_chunks(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(anchor_watch, "_READ_STEP", 1)
+    watch = AnchorWatch([tmp_path], ANCHOR)
+    log = tmp_path / "s.jsonl"
+    log.write_text("z" * 35 + ANCHOR + "\n", encoding="utf-8")
+    hit = watch.poll()
+    assert hit is not None and hit.path == log
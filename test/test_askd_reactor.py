@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+from askd_reactor import Reactor
+
+
+def test_wait_for_change_times_out_without_writes(tmp_path: Path) -> None:
+    log = tmp_path / "a.jsonl"
+    log.write_text("x\n", encoding="utf-8")
+    reactor = Reactor(poll_interval=0.01)
+
+    t0 = time.monotonic()
+    assert reactor.wait_for_change([log], 0.1) is False
+    assert time.monotonic() - t0 >= 0.09
+    assert reactor.stats()["fired_timer"] == 1
+
+
+def test_wait_for_change_wakes_on_append(tmp_path: Path) -> None:
+    log = tmp_path / "a.jsonl"
+    log.write_text("x\n", encoding="utf-8")
+    reactor = Reactor(poll_interval=0.01)
+
+    def _append() -> None:
+        time.sleep(0.05)
+        with log.open("a", encoding="utf-8") as handle:
+            handle.write("y\n")
+
+    threading.Thread(target=_append, daemon=True).start()
+    t0 = time.monotonic()
+    assert reactor.wait_for_change([log], 5.0) is True
+    assert time.monotonic() - t0 < 2.0
+
+
+def test_wait_for_change_detects_write_before_registration(tmp_path: Path) -> None:
+    log = tmp_path / "a.jsonl"
+    log.write_text("x\n", encoding="utf-8")
+    reactor = Reactor(poll_interval=0.01)
+
+    baseline = reactor.snapshot([log])
+    log.write_text("x\ny\n", encoding="utf-8")
+    assert reactor.wait_for_change([log], 5.0, baseline=baseline) is True
+
+
+def test_many_waits_share_one_reactor(tmp_path: Path) -> None:
+    reactor = Reactor(poll_interval=0.01)
+    logs = [tmp_path / f"{i}.jsonl" for i in range(8)]
+    for log in logs:
+        log.write_text("", encoding="utf-8")
+    results: dict[int, bool] = {}
+
+    def _wait(i: int) -> None:
+        results[i] = reactor.wait_for_change([logs[i]], 5.0)
+
+    threads = [threading.Thread(target=_wait, args=(i,), daemon=True) for i in range(len(logs))]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    for log in logs:
+        log.write_text("z\n", encoding="utf-8")
+    for t in threads:
+        t.join(timeout=5.0)
+
+    assert results == {i: True for i in range(len(logs))}
+    assert reactor.stats()["fired_change"] == len(logs)
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import random
 import re
 
-from ccb_protocol import DONE_PREFIX, REQ_ID_PREFIX, is_done_text, make_req_id, strip_done_text, wrap_codex_prompt
+from ccb_protocol import DONE_PREFIX, REQ_ID_PREFIX, DoneDetector, is_done_text, make_req_id, strip_done_text, wrap_codex_prompt
 from ccb_protocol import strip_trailing_markers
 
 
@@ -65,3 +66,24 @@ def test_strip_trailing_markers_removes_done_and_harness_trailers() -> None:
     req_id = make_req_id()
     text = f"line1\nline2\n{DONE_PREFIX} {req_id}\nHARNESS_DONE\n\n"
     assert strip_trailing_markers(text) == "line1\nline2"
+
+
+def test_done_detector_matches_join_and_rescan() -> None:
+    req_id = make_req_id()
+    other_id = make_req_id()
+    pieces = [
+        "", "\n", "\r", "\r\n", "  ", "text", "more text\n", "a\n\nb", "x\u2028y",
+        f"{DONE_PREFIX} {req_id}", f"{DONE_PREFIX} {req_id}\n", f"  {DONE_PREFIX} {req_id}  \n\n",
+        f"{DONE_PREFIX} {other_id}", "HARNESS_DONE", "HARNESS_DONE\n",
+    ]
+    rng = random.Random(1)
+    for _ in range(3000):
+        detector = DoneDetector(req_id)
+        chunks: list[str] = []
+        for _ in range(rng.randint(1, 6)):
+            chunk = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 3)))
+            chunks.append(chunk)
+            combined = "\n".join(chunks)
+            assert detector.feed(chunk) is is_done_text(combined, req_id), chunks
+            assert detector.reply() == strip_done_text(combined, req_id), chunks
+        assert detector.replace("hi\n" + chunks[-1]) is is_done_text("hi\n" + chunks[-1], req_id)
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+import claude_sessions_index
+from claude_sessions_index import latest_indexed_session, load_sessions_index
+
+
+def _norm(value: str) -> str:
+    return str(value).rstrip("/")
+
+
+def _write_index(index_path: Path, entries: list[dict]) -> None:
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    index_path.write_text(json.dumps({"version": 1, "entries": entries}), encoding="utf-8")
+
+
+def test_latest_session_per_project_and_sidechains_skipped(tmp_path: Path) -> None:
+    project = tmp_path / "proj"
+    logs = {name: project / f"{name}.jsonl" for name in ("a", "b", "side", "other", "gone")}
+    for name, path in logs.items():
+        if name != "gone":
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("{}\n", encoding="utf-8")
+    index = project / "sessions-index.json"
+    _write_index(
+        index,
+        [
+            {"fullPath": str(logs["a"]), "projectPath": "/w/x", "fileMtime": 100},
+            {"fullPath": str(logs["b"]), "projectPath": "/w/x/", "fileMtime": 200},
+            {"fullPath": str(logs["side"]), "projectPath": "/w/x", "fileMtime": 900, "isSidechain": True},
+            {"fullPath": str(logs["gone"]), "projectPath": "/w/x", "fileMtime": 800},
+            {"fullPath": str(logs["other"]), "projectPath": "/w/y", "fileMtime": 999},
+        ],
+    )
+
+    assert latest_indexed_session(index, ["/w/x"], _norm) == logs["b"]
+    assert latest_indexed_session(index, ["/w/y"], _norm) == logs["other"]
+    assert latest_indexed_session(index, ["/w/z"], _norm) is None
+
+
+def test_parsed_index_is_reused_until_the_file_changes(tmp_path: Path) -> None:
+    index = tmp_path / "sessions-index.json"
+    log = tmp_path / "a.jsonl"
+    log.write_text("{}\n", encoding="utf-8")
+    _write_index(index, [{"fullPath": str(log), "projectPath": "/w", "fileMtime": 1}])
+
+    first = load_sessions_index(index, _norm)
+    hits = claude_sessions_index.cache_stats()["hits"]
+    assert load_sessions_index(index, _norm) is first
+    assert claude_sessions_index.cache_stats()["hits"] == hits + 1
+
+    _write_index(index, [{"fullPath": str(log), "projectPath": "/w2", "fileMtime": 1}])
+    st = index.stat()
+    os.utime(index, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    second = load_sessions_index(index, _norm)
+    assert second is not first
+    assert latest_indexed_session(index, ["/w2"], _norm) == log
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from askd_reactor import Reactor
+from file_watch import InotifyWatcher
+
+
+def _watcher() -> InotifyWatcher:
+    watcher = InotifyWatcher.create()
+    if watcher is None:
+        pytest.skip("inotify not available")
+    return watcher
+
+
+def test_watcher_reports_append_in_watched_dir(tmp_path: Path) -> None:
+    log = tmp_path / "a.jsonl"
+    log.write_text("x\n", encoding="utf-8")
+    watcher = _watcher()
+    try:
+        assert watcher.sync([str(log)]) == set()
+        assert watcher.watched_dirs() == 1
+        assert watcher.wait(0.05) is False
+
+        with log.open("a", encoding="utf-8") as handle:
+            handle.write("y\n")
+        assert watcher.wait(2.0) is True
+    finally:
+        watcher.close()
+
+
+def test_watcher_reports_unwatchable_paths_and_drops_stale_dirs(tmp_path: Path) -> None:
+    missing = tmp_path / "nope" / "a.jsonl"
+    log = tmp_path / "a.jsonl"
+    watcher = _watcher()
+    try:
+        assert watcher.sync([str(log), str(missing)]) == {str(missing)}
+        assert watcher.sync([]) == set()
+        assert watcher.watched_dirs() == 0
+    finally:
+        watcher.close()
+
+
+def test_watcher_wake_interrupts_wait(tmp_path: Path) -> None:
+    watcher = _watcher()
+    try:
+        threading.Timer(0.05, watcher.wake).start()
+        t0 = time.monotonic()
+        assert watcher.wait(5.0) is False
+        assert time.monotonic() - t0 < 2.0
+    finally:
+        watcher.close()
+
+
+def test_reactor_inotify_backend_wakes_on_append(tmp_path: Path) -> None:
+    log = tmp_path / "a.jsonl"
+    log.write_text("x\n", encoding="utf-8")
+    # Long safety interval: only the inotify event can wake the wait in time.
+    reactor = Reactor(poll_interval=0.01, safety_interval=30.0)
+    if not reactor.uses_inotify:
+        pytest.skip("inotify not available")
+
+    def _append() -> None:
+        time.sleep(0.1)
+        with log.open("a", encoding="utf-8") as handle:
+            handle.write("y\n")
+
+    threading.Thread(target=_append, daemon=True).start()
+    t0 = time.monotonic()
+    assert reactor.wait_for_change([log], 10.0) is True
+    assert time.monotonic() - t0 < 5.0
+    stats = reactor.stats()
+    assert stats["backend"] == "inotify"
+    assert stats["watched_dirs"] == 1
+
+
+def test_reactor_without_inotify_polls(tmp_path: Path) -> None:
+    reactor = Reactor(poll_interval=0.01, use_inotify=False)
+    assert reactor.stats()["backend"] == "poll"
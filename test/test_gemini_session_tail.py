@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from gemini_comm import SessionJsonTail
+
+
+def _write(path: Path, messages: list[dict], updated: str = "2026-01-01T00:00:00.000Z") -> None:
+    payload = {"sessionId": "s1", "projectHash": "h", "lastUpdated": updated, "messages": messages}
+    path.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+def test_appends_and_in_place_edits_decode_incrementally(tmp_path: Path) -> None:
+    path = tmp_path / "session-1.json"
+    msgs = [{"id": "u1", "type": "user", "content": "hi"}, {"id": "g1", "type": "gemini", "content": ""}]
+    _write(path, msgs)
+    tail = SessionJsonTail()
+    assert tail.read(path)["messages"] == msgs
+    assert tail.counters == {"full": 1, "incremental": 0}
+
+    msgs[-1]["content"] = "héllo \"messages\": ["
+    _write(path, msgs, updated="2026-01-01T00:00:01.000Z")
+    assert tail.read(path)["messages"] == msgs
+
+    msgs += [{"id": "u2", "type": "user", "content": "more"}, {"id": "g2", "type": "gemini", "content": "ok"}]
+    _write(path, msgs, updated="2026-01-01T00:00:02.000Z")
+    assert tail.read(path)["messages"] == msgs
+    assert tail.read(path)["messages"] == msgs
+    assert tail.counters == {"full": 1, "incremental": 3}
+
+
+def test_prefix_rewrite_or_partial_write_falls_back(tmp_path: Path) -> None:
+    path = tmp_path / "session-1.json"
+    msgs = [{"id": f"m{i}", "type": "user", "content": str(i)} for i in range(4)]
+    _write(path, msgs)
+    tail = SessionJsonTail()
+    tail.read(path)
+
+    msgs[0]["content"] = "rewritten"
+    _write(path, msgs)
+    assert tail.read(path)["messages"] == msgs
+    assert tail.counters["full"] == 2
+
+    full = path.read_bytes()
+    path.write_bytes(full[: len(full) // 3])
+    assert tail.read(path) is None
+    path.write_bytes(full)
+    assert tail.read(path)["messages"] == msgs
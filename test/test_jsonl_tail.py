@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from claude_comm import ClaudeLogReader
+from jsonl_tail import read_jsonl_window
+
+
+def _line(role: str, text: str) -> str:
+    return json.dumps({"type": role, "message": {"role": role, "content": text}}) + "\n"
+
+
+def test_window_respects_max_bytes_and_carries_partial_lines(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("CCB_JSONL_CHUNK_BYTES", "4096")
+    log = tmp_path / "s.jsonl"
+    log.write_text("".join(json.dumps({"n": i, "pad": "x" * 90}) + "\n" for i in range(500)), encoding="utf-8")
+
+    seen: list[int] = []
+    offset, carry, more = 0, b"", True
+    windows = 0
+    while more:
+        offset, carry, more = read_jsonl_window(log, offset, carry, lambda e: seen.append(e["n"]), max_bytes=5000)
+        windows += 1
+        assert len(carry) < 200
+    assert seen == list(range(500))
+    assert offset == log.stat().st_size and carry == b""
+    assert windows == -(-log.stat().st_size // 5000)
+
+
+def test_claude_reader_streams_large_backlog(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("CCB_JSONL_CHUNK_BYTES", "4096")
+    monkeypatch.setenv("CCB_JSONL_MAX_BYTES", "8192")
+    session = tmp_path / "s.jsonl"
+    body = "".join(_line("user", f"q{i}") + _line("assistant", f"a{i}") for i in range(300))
+    session.write_text(body + '{"partial', encoding="utf-8")
+    reader = ClaudeLogReader(root=tmp_path, work_dir=tmp_path)
+
+    message, state = reader._read_new_messages(session, {"session_path": session, "offset": 0, "carry": b""})
+    assert message == "a299"
+    assert state["offset"] == session.stat().st_size and state["carry"] == b'{"partial'
+
+    events: list[tuple[str, str]] = []
+    state = {"session_path": session, "offset": 0, "carry": b""}
+    calls = 0
+    while True:
+        batch, state = reader._read_new_events(session, state)
+        if not batch:
+            break
+        events.extend(batch)
+        calls += 1
+    assert calls > 1
+    assert events[0] == ("user", "q0") and events[-1] == ("assistant", "a299") and len(events) == 600
+
+
+def test_decode_json_line_prefilter_and_stdlib_fallback(monkeypatch) -> None:
+    import jsonl_tail
+
+    line = json.dumps({"type": "response_item", "payload": {"type": "message", "role": "assistant"}}).encode()
+    assert jsonl_tail.decode_json_line(line, (b"token_count",)) is None
+    assert jsonl_tail.decode_json_line(line.replace(b" ", b""), reject=(b'"payload":{"type":"message"',)) is None
+    assert jsonl_tail.decode_json_line(b"   \n") is None
+    assert jsonl_tail.decode_json_line(b'{"message": ', (b"message",)) is None
+
+    fast = jsonl_tail.decode_json_line(line, (b"assistant",))
+    assert fast["payload"]["role"] == "assistant"
+    assert jsonl_tail.decode_json_line(line.decode(), (b"assistant",)) == fast
+    # Invalid UTF-8 is rejected by orjson; the stdlib path still yields the entry.
+    assert jsonl_tail.decode_json_line(b'{"t": "assistant \xff"}', (b"assistant",)) == {"t": "assistant �"}
+
+    monkeypatch.setattr(jsonl_tail, "_orjson", None)
+    assert jsonl_tail.json_codec() == "json"
+    assert jsonl_tail.decode_json_line(line, (b"assistant",)) == fast
+
+
+def test_window_markers_skip_unrelated_lines(tmp_path: Path) -> None:
+    log = tmp_path / "s.jsonl"
+    noise = json.dumps({"type": "progress", "data": "x" * 50}) + "\n"
+    log.write_text(noise + _line("user", "q") + noise + _line("assistant", "a") + noise, encoding="utf-8")
+    seen: list = []
+    read_jsonl_window(log, 0, b"", seen.append, markers=(b"assistant",))
+    assert [e["type"] for e in seen] == ["assistant"]
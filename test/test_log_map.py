@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from log_map import LogMap
+
+
+def _lines(log: LogMap, spans) -> list[bytes]:
+    return [bytes(log.view(s, e)) for s, e in spans]
+
+
+@pytest.mark.parametrize("mmap_flag", ["1", "0"])
+def test_forward_and_reverse_spans(tmp_path: Path, monkeypatch, mmap_flag: str) -> None:
+    monkeypatch.setenv("CCB_LOG_MMAP", mmap_flag)
+    path = tmp_path / "s.jsonl"
+    path.write_bytes(b'{"n":0}\n\n{"n":1}\n{"n":2}\n{"par')
+    with LogMap(path) as log:
+        assert log.mapped is (mmap_flag == "1")
+        assert _lines(log, log.lines()) == [b'{"n":0}', b"", b'{"n":1}', b'{"n":2}']
+        assert _lines(log, log.lines(9)) == [b'{"n":1}', b'{"n":2}']
+        assert _lines(log, log.lines_reverse()) == [b'{"par', b'{"n":2}', b'{"n":1}', b"", b'{"n":0}']
+        # The line cut by the byte bound is not returned.
+        assert _lines(log, log.lines_reverse(max_bytes=14)) == [b'{"par', b'{"n":2}']
+        assert log.decode(0, 7) == {"n": 0}
+        assert log.decode(0, 7, (b"zz",)) is None
+
+
+def test_map_is_a_snapshot_and_notices_truncation(tmp_path: Path) -> None:
+    path = tmp_path / "s.jsonl"
+    path.write_text(json.dumps({"n": 0}) + "\n", encoding="utf-8")
+    log = LogMap(path)
+    with path.open("a", encoding="utf-8") as fh:
+        fh.write(json.dumps({"n": 1}) + "\n")
+    assert [log.decode(s, e) for s, e in log.lines()] == [{"n": 0}]
+    with LogMap(path) as fresh:
+        assert len(list(fresh.lines())) == 2
+
+    path.write_bytes(b"")
+    assert log._shrunk() and log.truncated
+    log.close()
+
+    with LogMap(path) as empty:
+        assert list(empty.lines()) == [] and list(empty.lines_reverse()) == []
+
+
+def test_scans_clamp_to_a_file_truncated_after_mapping(tmp_path: Path) -> None:
+    path = tmp_path / "s.jsonl"
+    line = json.dumps({"pad": "x" * 200}) + "\n"
+    path.write_text(line * 2000, encoding="utf-8")
+    log = LogMap(path)
+    assert log.mapped
+
+    # Cut to two lines: pages past the new end would SIGBUS if a scan touched them.
+    with path.open("r+b") as fh:
+        fh.truncate(len(line) * 2)
+    assert len(list(log.lines_reverse(max_bytes=1 << 20))) == 2
+    assert log.truncated and log.size == len(line) * 2
+    assert [log.decode(s, e) for s, e in log.lines()] == [json.loads(line)] * 2
+
+    path.write_bytes(b"")
+    assert list(log.lines_reverse()) == [] and list(log.lines()) == []
+    assert bytes(log.view(0, 100)) == b""
+    log.close()
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_truncation_mid_iteration_stops_the_scan(tmp_path: Path, reverse: bool) -> None:
+    path = tmp_path / "s.jsonl"
+    line = json.dumps({"pad": "x" * 200}) + "\n"
+    path.write_text(line * 2000, encoding="utf-8")
+    seen = []
+    with LogMap(path) as log:
+        assert log.mapped
+        scan = log.lines_reverse() if reverse else log.lines()
+        for i, (start, end) in enumerate(scan):
+            seen.append(log.decode(start, end))
+            if i == 10:
+                # Pages the scan has not reached yet now lie past the end of the file.
+                with path.open("r+b") as fh:
+                    fh.truncate(len(line) * 2)
+        assert len(seen) == 11 and all(entry == json.loads(line) for entry in seen)
+        assert log.truncated and not log.mapped and log.size == len(line) * 2
+        assert log.decode(len(line) * 1500, len(line) * 1501 - 1) is None
+        assert [log.decode(s, e) for s, e in log.lines()] == [json.loads(line)] * 2
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from claude_comm import ClaudeLogReader
+from codex_comm import CodexLogReader
+
+
+def test_codex_resume_state_rebases_to_eof(tmp_path: Path) -> None:
+    log = tmp_path / "rollout.jsonl"
+    log.write_text('{"a": 1}\n', encoding="utf-8")
+    reader = CodexLogReader(root=tmp_path, log_path=log, work_dir=tmp_path)
+    state = reader.capture_state()
+
+    with log.open("a", encoding="utf-8") as handle:
+        handle.write('{"b": 2}\n')
+    resumed = reader.resume_state(state)
+    assert resumed == {"log_path": log, "offset": log.stat().st_size}
+
+
+def test_codex_resume_state_rejects_truncated_or_missing_log(tmp_path: Path) -> None:
+    log = tmp_path / "rollout.jsonl"
+    log.write_text('{"a": 1}\n{"b": 2}\n', encoding="utf-8")
+    reader = CodexLogReader(root=tmp_path, log_path=log, work_dir=tmp_path)
+    state = reader.capture_state()
+
+    log.write_text("", encoding="utf-8")
+    assert reader.resume_state(state) is None
+    log.unlink()
+    assert reader.resume_state(state) is None
+
+
+def test_claude_resume_state_resets_carry(tmp_path: Path) -> None:
+    session = tmp_path / "s.jsonl"
+    session.write_text('{"a": 1}\n{"partial', encoding="utf-8")
+    reader = ClaudeLogReader(root=tmp_path, work_dir=tmp_path)
+    resumed = reader.resume_state({"session_path": session, "offset": 9, "carry": b'{"partial'})
+    assert resumed == {"session_path": session, "offset": session.stat().st_size, "carry": b""}
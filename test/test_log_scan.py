@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from log_scan import IrregularLayout, iter_date_partitions, map_bounded, newest, scan_dirs, scan_tree
+
+
+def _touch(path: Path, mtime_ns: int) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("{}\n", encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_scan_tree_matches_glob_and_top_n(tmp_path: Path) -> None:
+    root = tmp_path / "sessions"
+    n = 0
+    for day in range(1, 6):
+        for i in range(4):
+            n += 1
+            _touch(root / "2026" / "01" / f"{day:02d}" / f"log-{i}.jsonl", n * 1_000_000_000)
+    _touch(root / "2026" / "01" / "01" / "notes.txt", 99 * 1_000_000_000)
+    _touch(root / "2026" / "01" / "01" / ".hidden.jsonl", 98 * 1_000_000_000)
+
+    expected = sorted(
+        (p for p in root.glob("**/*.jsonl") if not p.name.startswith(".")),
+        key=lambda p: p.stat().st_mtime_ns,
+        reverse=True,
+    )
+    for workers in (1, 4):
+        files = scan_tree(str(root), lambda name: name.endswith(".jsonl"), workers=workers)
+        assert len(files) == 20
+        assert [f.path for f in newest(files, 5)] == [str(p) for p in expected[:5]]
+
+    with_hidden = scan_tree(str(root), lambda name: name.endswith(".jsonl"), include_hidden=True)
+    assert newest(with_hidden, 1)[0].path.endswith(".hidden.jsonl")
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="needs symlinks")
+def test_scan_tree_does_not_follow_symlink_cycles(tmp_path: Path) -> None:
+    root = tmp_path / "projects"
+    _touch(root / "a" / "s.jsonl", 1_000_000_000)
+    os.symlink(root, root / "a" / "loop")
+    os.symlink(root / "a" / "s.jsonl", root / "linked.jsonl")
+    files = scan_tree(str(root), lambda name: name.endswith(".jsonl"))
+    assert sorted(Path(f.path).name for f in files) == ["linked.jsonl", "s.jsonl"]
+
+
+def test_scan_dirs_is_not_recursive_and_tolerates_missing(tmp_path: Path) -> None:
+    _touch(tmp_path / "a" / "chats" / "session-1.json", 1_000_000_000)
+    _touch(tmp_path / "a" / "chats" / "deep" / "session-2.json", 2_000_000_000)
+    files = scan_dirs(
+        [str(tmp_path / "a" / "chats"), str(tmp_path / "missing" / "chats")],
+        lambda name: name.startswith("session-"),
+    )
+    assert [Path(f.path).name for f in files] == ["session-1.json"]
+
+
+def test_map_bounded_preserves_order() -> None:
+    assert map_bounded(lambda x: x * 2, range(10), workers=4) == [x * 2 for x in range(10)]
+
+
+def test_iter_date_partitions_newest_first_and_irregular(tmp_path: Path) -> None:
+    for rel in ("2025/12/31", "2026/01/02", "2026/01/10", "2026/02/01"):
+        (tmp_path / rel).mkdir(parents=True)
+    days = [d.isoformat() for d, _ in iter_date_partitions(str(tmp_path), lambda n: n.endswith(".jsonl"))]
+    assert days == ["2026-02-01", "2026-01-10", "2026-01-02", "2025-12-31"]
+
+    _touch(tmp_path / "2026" / "loose.jsonl", 1)
+    with pytest.raises(IrregularLayout):
+        list(iter_date_partitions(str(tmp_path), lambda n: n.endswith(".jsonl")))
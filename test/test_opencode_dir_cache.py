@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+
+from opencode_comm import OpenCodeLogReader, _JsonDirCache
+
+
+def _load(path: Path) -> dict:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _write(path: Path, payload: dict) -> None:
+    path.write_text(json.dumps(payload), encoding="utf-8")
+
+
+def _age_dir(path: Path) -> None:
+    old = time.time() - 60
+    os.utime(path, (old, old))
+
+
+def test_unchanged_dir_costs_only_a_few_stats(tmp_path: Path) -> None:
+    for i in range(20):
+        _write(tmp_path / f"msg_{i:04d}.json", {"id": f"msg_{i:04d}", "n": i})
+    _age_dir(tmp_path)
+    cache = _JsonDirCache("msg_", _load, recheck=2, full_interval=60.0)
+
+    first = cache.load(tmp_path)
+    assert [m["n"] for m in first] == list(range(20))
+    assert cache.counters["parses"] == 20
+
+    before = dict(cache.counters)
+    assert cache.load(tmp_path) == first
+    assert cache.counters["parses"] == before["parses"]
+    assert cache.counters["lists"] == before["lists"]
+    assert cache.counters["stats"] - before["stats"] == 3
+
+    # The newest message is rewritten in place while streaming: picked up without a relist.
+    _write(tmp_path / "msg_0019.json", {"id": "msg_0019", "n": 19, "done": True})
+    _age_dir(tmp_path)
+    assert cache.load(tmp_path)[-1].get("done") is True
+    assert cache.counters["parses"] == before["parses"] + 1
+
+
+def test_new_files_trigger_relist(tmp_path: Path) -> None:
+    _write(tmp_path / "msg_0001.json", {"id": "msg_0001"})
+    _age_dir(tmp_path)
+    cache = _JsonDirCache("msg_", _load, full_interval=60.0)
+    assert len(cache.load(tmp_path)) == 1
+
+    _write(tmp_path / "msg_0002.json", {"id": "msg_0002"})
+    assert [m["id"] for m in cache.load(tmp_path)] == ["msg_0001", "msg_0002"]
+    assert cache.counters["parses"] == 2
+
+
+def test_reader_orders_messages_by_created_then_id(tmp_path: Path) -> None:
+    msg_dir = tmp_path / "message" / "ses_1"
+    msg_dir.mkdir(parents=True)
+    _write(msg_dir / "msg_b.json", {"id": "msg_b", "sessionID": "ses_1", "time": {"created": 5}})
+    _write(msg_dir / "msg_a.json", {"id": "msg_a", "sessionID": "ses_1", "time": {"created": 5}})
+    _write(msg_dir / "msg_0.json", {"id": "msg_0", "sessionID": "ses_1", "time": {"created": 9}})
+    _write(msg_dir / "msg_x.json", {"id": "msg_x", "sessionID": "other", "time": {"created": 1}})
+    reader = OpenCodeLogReader(root=tmp_path, work_dir=tmp_path, project_id="p")
+    assert [m["id"] for m in reader._read_messages("ses_1")] == ["msg_a", "msg_b", "msg_0"]
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from threading import Thread
+
+import pytest
+
+import askd_rpc
+import pane_events
+import terminal
+from askd_reactor import get_reactor
+from askd_runtime import state_file_path
+from askd_server import AskDaemonServer
+from providers import CASKD_SPEC
+
+
+@pytest.fixture(autouse=True)
+def _isolated_events(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(pane_events, "_dead", {})
+    monkeypatch.setattr(pane_events, "_listeners", [])
+
+
+def test_notify_records_death_and_calls_listeners() -> None:
+    seen: list[tuple[str, str]] = []
+    pane_events.subscribe(lambda pane_id, event: seen.append((pane_id, event)))
+    before = time.time()
+
+    pane_events.notify("%7", "exited")
+
+    assert seen == [("%7", "exited")]
+    assert pane_events.died_since("%7", before) is True
+    assert pane_events.died_since("%7", time.time() + 1.0) is False
+    assert pane_events.died_since("%8", before) is False
+    pane_events.clear("%7")
+    assert pane_events.died_since("%7", before) is False
+
+
+def test_notify_interrupts_pending_reactor_waits(tmp_path: Path) -> None:
+    log = tmp_path / "a.jsonl"
+    log.write_text("x\n", encoding="utf-8")
+    threading.Timer(0.1, pane_events.notify, args=("%3",)).start()
+
+    t0 = time.monotonic()
+    assert get_reactor().wait_for_change([log], 5.0) is False
+    assert time.monotonic() - t0 < 2.0
+
+
+def test_hook_command_quotes_for_tmux() -> None:
+    cmd = pane_events.pane_hook_command("died", python="/usr/bin/python3", script="/opt/ccb/lib/pane_events.py", run_dir="/tmp/run dir")
+    assert cmd == "run-shell -b \"CCB_RUN_DIR='/tmp/run dir' /usr/bin/python3 /opt/ccb/lib/pane_events.py died #{hook_pane}\""
+
+
+@pytest.fixture
+def caskd_server(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("CCB_RUN_DIR", str(tmp_path))
+    state_file = state_file_path(CASKD_SPEC.state_file_name)
+    server = AskDaemonServer(
+        spec=CASKD_SPEC,
+        host="127.0.0.1",
+        port=0,
+        token="test-token",
+        state_file=state_file,
+        request_handler=lambda msg: {"exit_code": 0, "reply": ""},
+    )
+    thread = Thread(target=server.serve_forever, name="pane-events-daemon", daemon=True)
+    thread.start()
+    deadline = time.time() + 3.0
+    while time.time() < deadline and not state_file.exists():
+        time.sleep(0.05)
+    yield tmp_path, state_file
+    askd_rpc.shutdown_daemon(CASKD_SPEC.protocol_prefix, timeout_s=0.5, state_file=state_file)
+    thread.join(timeout=3.0)
+
+
+def test_notify_daemons_reaches_running_daemon(caskd_server) -> None:
+    before = time.time()
+    assert pane_events.notify_daemons("%42", "died") == 1
+    assert pane_events.died_since("%42", before) is True
+
+
+@pytest.mark.skipif(shutil.which("tmux") is None, reason="tmux not installed")
+def test_tmux_hook_pushes_pane_death(caskd_server) -> None:
+    run_dir, _state_file = caskd_server
+    socket = f"ccb-hook-test-{time.time_ns()}"
+    subprocess.run(["tmux", "-L", socket, "new-session", "-d", "-s", "t", "-x", "120", "-y", "20", "cat"], check=True)
+    try:
+        backend = terminal.TmuxBackend(socket_name=socket)
+        victim = subprocess.run(
+            ["tmux", "-L", socket, "split-window", "-d", "-t", "t", "-P", "-F", "#{pane_id}", "sleep 30"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        for hook, event in pane_events.HOOK_EVENTS.items():
+            command = pane_events.pane_hook_command(event, python=sys.executable, run_dir=str(run_dir))
+            assert backend.set_hook(hook, pane_events.HOOK_INDEX, command, target="t") is True
+
+        before = time.time()
+        subprocess.run(["tmux", "-L", socket, "send-keys", "-t", victim, "C-c"], check=True)
+        deadline = time.time() + 10.0
+        while time.time() < deadline and not pane_events.died_since(victim, before):
+            time.sleep(0.05)
+        assert pane_events.died_since(victim, before) is True
+    finally:
+        subprocess.run(["tmux", "-L", socket, "kill-server"], capture_output=True)
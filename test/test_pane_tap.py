@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+import pane_tap
+import terminal
+from askd_reactor import get_reactor
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="needs mkfifo")
+
+
+@pytest.fixture
+def tap(tmp_path: Path):
+    fifo = tmp_path / "t.fifo"
+    os.mkfifo(str(fifo))
+    tap = pane_tap.PaneTap("%1", fifo, capacity=4096)
+    yield tap
+    tap.close()
+
+
+def test_text_since_mark_strips_escapes_and_drops_overflow(tap: pane_tap.PaneTap) -> None:
+    tap.feed(b"old \x1b[1mhistory\x1b[0m\n")
+    mark = tap.mark()
+    tap.feed(b"\x1b]0;title\x07\x1b[31m\xe2\x96\xa0 Conversation\x1b[0m interrupted\r\n")
+    assert tap.text_since(mark) == "■ Conversation interrupted\r\n"
+    assert tap.seen("■ Conversation interrupted", since=mark)
+    assert not tap.seen("history", since=mark)
+
+    tap.feed(b"x" * 5000)
+    assert tap.written == mark + 49 + 5000
+    assert tap.text_since(mark) == "x" * 4096
+
+
+def test_needle_in_new_output_interrupts_waits(tap: pane_tap.PaneTap, tmp_path: Path) -> None:
+    tap.watch(["■ Conversation interrupted"])
+    log = tmp_path / "a.jsonl"
+    log.write_text("x\n", encoding="utf-8")
+    # Split across two writes to the FIFO: the overlap re-scan still finds it.
+    def _write() -> None:
+        time.sleep(0.1)
+        fd = os.open(str(tap.fifo), os.O_WRONLY)
+        os.write(fd, "■ Conversa".encode())
+        time.sleep(0.05)
+        os.write(fd, b"tion interrupted\n")
+        os.close(fd)
+
+    threading.Thread(target=_write, daemon=True).start()
+    t0 = time.monotonic()
+    assert get_reactor().wait_for_change([log], 5.0) is False
+    assert time.monotonic() - t0 < 2.0
+
+
+@pytest.mark.skipif(shutil.which("tmux") is None, reason="tmux not installed")
+def test_tap_for_pipes_tmux_pane_output(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("CCB_RUN_DIR", str(tmp_path))
+    monkeypatch.setenv("CCB_TMUX_ENTER_DELAY", "0")
+    monkeypatch.setattr(pane_tap, "_taps", {})
+    socket = f"ccb-tap-test-{time.time_ns()}"
+    subprocess.run(["tmux", "-L", socket, "new-session", "-d", "-s", "t", "-x", "120", "-y", "20", "cat"], check=True)
+    try:
+        backend = terminal.TmuxBackend(socket_name=socket)
+        pane = subprocess.run(
+            ["tmux", "-L", socket, "list-panes", "-t", "t", "-F", "#{pane_id}"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+
+        monkeypatch.setenv("CCB_PANE_TAP", "0")
+        assert pane_tap.tap_for(backend, pane) is None
+        monkeypatch.setenv("CCB_PANE_TAP", "1")
+        tap = pane_tap.tap_for(backend, pane)
+        assert tap is not None and pane_tap.tap_for(backend, pane) is tap
+        mark = tap.mark()
+        backend.send_text(pane, "tapped line")
+        deadline = time.time() + 5.0
+        while time.time() < deadline and not tap.seen("tapped line", since=mark):
+            time.sleep(0.05)
+        assert tap.seen("tapped line", since=mark)
+    finally:
+        subprocess.run(["tmux", "-L", socket, "kill-server"], capture_output=True)
+        for opened in pane_tap._taps.values():
+            opened.close()
+
+
+class _FakeBackend:
+    def _tmux_base(self) -> list[str]:
+        return ["tmux", "-L", "fake"]
+
+    def pane_pipe_open(self, pane_id: str) -> bool:
+        return False
+
+    def pipe_pane(self, pane_id: str, command: str) -> bool:
+        return True
+
+
+def test_first_tap_sweeps_dead_daemon_fifos_and_close_all_removes_ours(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("CCB_RUN_DIR", str(tmp_path))
+    monkeypatch.setenv("CCB_PANE_TAP", "1")
+    monkeypatch.setattr(pane_tap, "_taps", {})
+    monkeypatch.setattr(pane_tap, "_swept", False)
+    fifo_dir = tmp_path / "pane-tap"
+    fifo_dir.mkdir()
+    dead = subprocess.Popen(["true"])
+    dead.wait()
+    stale = fifo_dir / f"{dead.pid}-_1.fifo"
+    live = fifo_dir / f"{os.getppid()}-_1.fifo"
+    for path in (stale, live):
+        os.mkfifo(str(path))
+
+    tap = pane_tap.tap_for(_FakeBackend(), "%7")
+    assert tap is not None and tap.fifo.exists()
+    assert not stale.exists()
+    assert live.exists()
+
+    pane_tap.close_all()
+    assert pane_tap._taps == {}
+    assert not tap.fifo.exists()
+    assert not tap._thread.is_alive()
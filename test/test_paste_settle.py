@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import shutil
+import subprocess
+import time
+
+import pytest
+
+import terminal
+from paste_settle import fixed_delay, wait_for_settle
+
+
+def _probe(values: list):
+    it = iter(values)
+    last = [values[-1]]
+
+    def probe():
+        try:
+            last[0] = next(it)
+        except StopIteration:
+            pass
+        return last[0]
+
+    return probe
+
+
+def test_settles_after_change_then_quiet() -> None:
+    waited = wait_for_settle(_probe(["a", "a", "b", "c"]), "a", max_s=2.0, quiet_s=0.05, step_s=0.01)
+    assert waited < 0.5
+
+
+def test_unchanged_pane_waits_until_no_change_bound() -> None:
+    waited = wait_for_settle(_probe(["a"]), "a", max_s=2.0, no_change_s=0.2, quiet_s=0.01, step_s=0.01)
+    assert 0.2 <= waited < 0.5
+
+
+def test_never_changing_pane_counts_as_settled_at_the_old_delay(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("CCB_PASTE_SETTLE_NO_CHANGE", raising=False)
+    calls = []
+    waited = wait_for_settle(lambda: calls.append(1) or "same", "same", default_no_change_s=0.1)
+    assert 0.1 <= waited < 0.3
+    assert len(calls) <= 10
+
+
+def test_changed_but_busy_pane_may_wait_past_the_old_delay(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("CCB_PASTE_SETTLE_NO_CHANGE", raising=False)
+    monkeypatch.setenv("CCB_PASTE_SETTLE_MAX", "0.4")
+    # A slow paste: the pane keeps changing for 0.25s, well past the 0.1s old delay, then goes quiet.
+    start = time.monotonic()
+    waited = wait_for_settle(
+        lambda: str(int((time.monotonic() - start) * 100)) if time.monotonic() - start < 0.25 else "done",
+        "before",
+        default_no_change_s=0.1,
+    )
+    assert 0.25 <= waited < 0.4
+
+
+def test_always_changing_pane_is_bounded_by_max(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("CCB_PASTE_SETTLE_MAX", "0.3")
+    ticks = iter(range(10**6))
+    waited = wait_for_settle(lambda: str(next(ticks)), "start", default_no_change_s=0.1)
+    assert 0.3 <= waited < 0.5
+
+
+def test_unreadable_pane_stops_waiting() -> None:
+    assert wait_for_settle(_probe([None]), "a", max_s=2.0, quiet_s=0.05, step_s=0.01) < 0.5
+
+
+def test_explicit_legacy_delay_keeps_fixed_sleep(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("CCB_TMUX_ENTER_DELAY", raising=False)
+    assert fixed_delay("CCB_TMUX_ENTER_DELAY") is None
+    monkeypatch.setenv("CCB_TMUX_ENTER_DELAY", "0.3")
+    assert fixed_delay("CCB_TMUX_ENTER_DELAY") == 0.3
+
+
+@pytest.mark.skipif(shutil.which("tmux") is None, reason="tmux not installed")
+def test_tmux_multiline_send_submits_after_settle(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("CCB_TMUX_ENTER_DELAY", raising=False)
+    socket = f"ccb-settle-test-{time.time_ns()}"
+    subprocess.run(["tmux", "-L", socket, "new-session", "-d", "-s", "t", "-x", "120", "-y", "20", "cat"], check=True)
+    try:
+        backend = terminal.TmuxBackend(socket_name=socket)
+        pane = subprocess.run(
+            ["tmux", "-L", socket, "list-panes", "-t", "t", "-F", "#{pane_id}"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        t0 = time.monotonic()
+        backend.send_text(pane, "first line\nsecond line")
+        assert time.monotonic() - t0 < 0.5
+        deadline = time.time() + 5.0
+        content = ""
+        # cat echoes the submitted line once more after Enter.
+        while time.time() < deadline and content.count("second line") < 2:
+            content = backend.get_pane_content(pane, lines=10) or ""
+            time.sleep(0.05)
+        assert content.count("second line") >= 2
+    finally:
+        subprocess.run(["tmux", "-L", socket, "kill-server"], capture_output=True)
+
+
+def test_tmux_signature_sees_screen_change_without_cursor_move(monkeypatch: pytest.MonkeyPatch) -> None:
+    backend = terminal.TmuxBackend()
+    screen = ["> long pasted text"]
+
+    def fake_run(args, **_kwargs):
+        out = "2,5,0\n" if args[0] == "display-message" else screen[0] + "\n"
+        return subprocess.CompletedProcess(args, 0, stdout=out, stderr="")
+
+    monkeypatch.setattr(backend, "_tmux_run", fake_run)
+    before = backend._settle_signature("%1")
+    screen[0] = "> [Pasted Content 1024 chars]"
+    after = backend._settle_signature("%1")
+    assert before is not None and after is not None and before != after
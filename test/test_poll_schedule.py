@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+from askd_reactor import Reactor
+from poll_schedule import PollCadence, ReplyTimings
+
+
+def _cadence(timings: ReplyTimings, **kw) -> PollCadence:
+    return PollCadence(timings, "caskd", "s1", fast=0.05, slow=1.0, adaptive=True, **kw)
+
+
+def test_fast_after_send_then_backs_off_and_snaps_back() -> None:
+    cadence = _cadence(ReplyTimings())
+    t0 = cadence.started
+    assert cadence.interval(t0 + 0.5) == 0.05
+    cadence.anchor()
+    assert cadence.interval(cadence._last_activity + 0.1) == 0.05
+    assert cadence.interval(cadence._last_activity + 4.0) == 0.5
+    assert cadence.interval(cadence._last_activity + 60.0) == 1.0
+    cadence.activity()
+    assert cadence.interval(cadence._last_activity + 0.1) == 0.05
+
+
+def test_history_drives_completion_window() -> None:
+    timings = ReplyTimings()
+    for done in (29_000, 30_000, 31_000, 30_500):
+        timings.record("caskd", "other", anchor_ms=200, done_ms=done)
+    # The session has no history of its own yet: the provider-wide window applies.
+    lo, hi = timings.done_window_s("caskd", "s1")
+    assert 23.0 < lo < 24.0 and 38.0 < hi < 39.0
+
+    cadence = _cadence(timings)
+    cadence.anchor()
+    t0 = cadence.started
+    cadence._last_activity = t0
+    assert cadence.interval(t0 + 10.0) == 1.0
+    # Backoff never sleeps past the start of the expected window, and polls fast inside it.
+    assert cadence.interval(lo + t0 - 0.2) < 0.25
+    assert cadence.interval(t0 + 30.0) == 0.05
+    assert cadence.interval(t0 + 60.0) > 0.05
+
+    cadence.finish(anchor_ms=None, done_ms=None)
+    assert len(timings._samples(timings._done, "caskd", "")) == 4
+
+
+def test_reactor_honours_per_wait_interval(tmp_path: Path) -> None:
+    log = tmp_path / "a.jsonl"
+    log.write_text("x\n", encoding="utf-8")
+    reactor = Reactor(poll_interval=0.01, use_inotify=False)
+
+    assert reactor.wait_for_change([log], 0.5, poll_interval=lambda: 0.2) is False
+    assert reactor.stats()["stats"] <= 4
+
+    baseline = reactor.snapshot([log])
+    log.write_text("x\ny\n", encoding="utf-8")
+    t0 = time.monotonic()
+    assert reactor.wait_for_change([log], 5.0, baseline=baseline, poll_interval=0.2) is True
+    assert time.monotonic() - t0 < 1.0
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+import prompt_spool
+from ccb_protocol import wrap_codex_prompt
+from worker_pool import BaseSessionWorker
+
+
+@pytest.fixture
+def project(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("CCB_PROMPT_SPOOL_BYTES", "100")
+    (tmp_path / ".ccb_config").mkdir()
+    return tmp_path
+
+
+def test_small_prompts_and_projects_without_config_are_not_spooled(project: Path, tmp_path_factory) -> None:
+    assert prompt_spool.spool(project, "x" * 100) is None
+    assert prompt_spool.spool(tmp_path_factory.mktemp("bare"), "x" * 500) is None
+
+
+def test_large_prompt_is_content_addressed_and_removed_on_completion(project: Path) -> None:
+    message = "diff line\n" * 50
+    first = prompt_spool.spool(project, message)
+    second = prompt_spool.spool(project, message)
+    assert first is not None and second is not None and first.path == second.path
+    assert first.path.parent == project / ".ccb_config" / "spool"
+    assert first.path.read_text(encoding="utf-8") == message
+
+    wrapped = wrap_codex_prompt(prompt_spool.spooled_message(first), "a" * 32)
+    assert str(first.path) in wrapped and message not in wrapped
+    assert wrapped.rstrip().endswith("CCB_DONE: " + "a" * 32)
+
+    prompt_spool.release(first, completed=True)
+    assert first.path.exists()
+    prompt_spool.release(second, completed=True)
+    assert not first.path.exists()
+
+
+def test_unfinished_request_keeps_file_until_swept(project: Path) -> None:
+    spooled = prompt_spool.spool(project, "y" * 500)
+    assert spooled is not None
+    prompt_spool.release(spooled, completed=False)
+    assert spooled.path.exists()
+
+    old = time.time() - 7200
+    os.utime(spooled.path, (old, old))
+    assert prompt_spool.sweep(spooled.path.parent, ttl_s=3600) == 1
+    assert not spooled.path.exists()
+
+
+@dataclass
+class _Result:
+    done_seen: bool
+
+
+@dataclass
+class _Task:
+    req_id: str
+    done_event: threading.Event
+    message: str
+    result: Optional[_Result] = None
+
+
+def test_worker_releases_spool_after_task(project: Path) -> None:
+    seen: list[str] = []
+
+    class _Worker(BaseSessionWorker[_Task, _Result]):
+        def _handle_task(self, task: _Task) -> _Result:
+            seen.append(self._spool_message(project, task.message))
+            return _Result(done_seen=True)
+
+    worker = _Worker("s1")
+    worker.start()
+    try:
+        task = _Task(req_id="r1", done_event=threading.Event(), message="z" * 500)
+        worker.enqueue(task)
+        assert task.done_event.wait(timeout=2.0)
+    finally:
+        worker.stop()
+    assert "too large to paste" in seen[0]
+    assert list((project / ".ccb_config" / "spool").iterdir()) == []
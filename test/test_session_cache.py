@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+
+from session_cache import SessionHandleCache
+import caskd_session
+
+
+def _write_session(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+def _counting_cache() -> tuple[SessionHandleCache, list[Path]]:
+    loads: list[Path] = []
+
+    def _load(work_dir: Path):
+        loads.append(work_dir)
+        return caskd_session.load_project_session(work_dir)
+
+    cache = SessionHandleCache(_load, caskd_session.compute_session_key, locate=caskd_session.find_project_session_file)
+    return cache, loads
+
+
+def test_session_handle_cache_reuses_parse_until_file_changes(tmp_path: Path) -> None:
+    session_file = tmp_path / ".ccb_config" / ".codex-session"
+    _write_session(session_file, {"ccb_project_id": "p1", "pane_id": "%1"})
+    cache, loads = _counting_cache()
+
+    h1 = cache.get(tmp_path)
+    h2 = cache.get(tmp_path)
+    assert h1.session is not None and h2.session is h1.session
+    assert h1.session_key == "codex:p1"
+    assert len(loads) == 1
+
+    _write_session(session_file, {"ccb_project_id": "p1", "pane_id": "%2", "pad": "x"})
+    st = session_file.stat()
+    os.utime(session_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    h3 = cache.get(tmp_path)
+    assert len(loads) == 2
+    assert h3.session is not None and h3.session.pane_id == "%2"
+    assert cache.stats()["hits"] == 1
+
+
+def test_session_handle_cache_missing_session(tmp_path: Path) -> None:
+    cache, _loads = _counting_cache()
+    handle = cache.get(tmp_path)
+    assert handle.session is None
+    assert handle.session_key is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_claude_session_handle_revalidates_on_registry_change(tmp_path: Path, monkeypatch) -> None:
+    import laskd_session
+    from pane_registry import registry_signature
+    from project_id import compute_ccb_project_id
+
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    for key in ("CCB_SESSION_ID", "CODEX_SESSION_ID", "GEMINI_SESSION_ID", "OPENCODE_SESSION_ID", "TMUX_PANE", "WEZTERM_PANE"):
+        monkeypatch.delenv(key, raising=False)
+    work_dir = tmp_path / "proj"
+    _write_session(work_dir / ".ccb_config" / ".claude-session", {"terminal": "tmux", "pane_id": "%1"})
+    cache = SessionHandleCache(
+        laskd_session.load_project_session,
+        laskd_session.compute_session_key,
+        locate=laskd_session.find_project_session_file,
+        extra_sig=lambda _work_dir: registry_signature(),
+    )
+
+    first = cache.get(work_dir)
+    assert first.session is not None and first.session.pane_id == "%1"
+    assert cache.get(work_dir).session is first.session
+
+    record = {
+        "ccb_session_id": "s1",
+        "ccb_project_id": compute_ccb_project_id(work_dir),
+        "work_dir": str(work_dir),
+        "terminal": "tmux",
+        "updated_at": int(time.time()),
+        "providers": {"claude": {"pane_id": "%5"}},
+    }
+    _write_session(tmp_path / "home" / ".ccb" / "run" / "ccb-session-s1.json", record)
+    moved = cache.get(work_dir)
+    assert moved.session is not None and moved.session.pane_id == "%5"
+    assert cache.stats()["loads"] == 2
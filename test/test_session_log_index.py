@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+
+from codex_comm import read_codex_session_meta
+from session_log_index import SessionLogIndex
+
+
+def _write_log(path: Path, cwd: str, sid: str, mtime_ns: int) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    meta = {"type": "session_meta", "payload": {"cwd": cwd, "id": sid}}
+    path.write_text(json.dumps(meta) + "\n", encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def _index(root: Path, index_path: Path) -> SessionLogIndex:
+    return SessionLogIndex(root, name="codex", meta_reader=read_codex_session_meta, index_path=index_path, ttl_s=0)
+
+
+def test_index_returns_newest_match_and_tracks_new_logs(tmp_path: Path) -> None:
+    root = tmp_path / "sessions"
+    _write_log(root / "2026" / "01" / "01" / "a.jsonl", "/proj/a", "sid-a", 1_000_000_000)
+    _write_log(root / "2026" / "01" / "02" / "b.jsonl", "/proj/b", "sid-b", 2_000_000_000)
+    index = _index(root, tmp_path / "idx.json")
+
+    hit = index.latest(lambda e: e.cwd == "/proj/a")
+    assert hit is not None and hit.session_id == "sid-a"
+    assert index.latest().session_id == "sid-b"
+
+    _write_log(root / "2026" / "01" / "03" / "c.jsonl", "/proj/a", "sid-c", 3_000_000_000)
+    hit = index.latest(lambda e: e.cwd == "/proj/a")
+    assert hit is not None and hit.session_id == "sid-c"
+
+
+def test_index_persists_and_only_reads_new_headers(tmp_path: Path) -> None:
+    root = tmp_path / "sessions"
+    log = root / "a.jsonl"
+    _write_log(log, "/proj/a", "sid-a", 1_000_000_000)
+    first = _index(root, tmp_path / "idx.json")
+    assert first.latest() is not None
+    assert first.stats()["meta_reads"] == 1
+
+    with log.open("a", encoding="utf-8") as handle:
+        handle.write('{"type": "response_item"}\n')
+    second = _index(root, tmp_path / "idx.json")
+    entry = second.latest()
+    assert entry is not None and entry.cwd == "/proj/a"
+    assert entry.size == log.stat().st_size
+    assert second.stats()["meta_reads"] == 0
+
+    log.unlink()
+    assert second.latest() is None
+
+
+def test_latest_codex_log_stops_at_recent_partitions(tmp_path: Path, monkeypatch) -> None:
+    from datetime import datetime
+
+    from codex_comm import codex_log_index, latest_codex_log
+
+    monkeypatch.setenv("CCB_LOG_INDEX", "0")
+    root = tmp_path / "sessions"
+
+    def _ts(day: str) -> int:
+        return int(datetime.fromisoformat(day + "T12:00:00").timestamp()) * 1_000_000_000
+
+    _write_log(root / "2026" / "01" / "01" / "old.jsonl", "/proj/a", "sid-old", _ts("2026-01-01"))
+    _write_log(root / "2026" / "03" / "09" / "y.jsonl", "/proj/b", "sid-y", _ts("2026-03-09"))
+    _write_log(root / "2026" / "03" / "10" / "t.jsonl", "/proj/a", "sid-t", _ts("2026-03-10"))
+
+    hit = latest_codex_log(lambda e: e.cwd == "/proj/a", root=root)
+    assert hit is not None and hit.session_id == "sid-t"
+    # Today's match plus one day of lookback: the January partition is never opened.
+    assert codex_log_index(root).stats()["meta_reads"] == 2
+
+    hit = latest_codex_log(lambda e: e.cwd == "/proj/b", root=root)
+    assert hit is not None and hit.session_id == "sid-y"
+
+
+def test_latest_codex_log_falls_back_for_flat_trees(tmp_path: Path, monkeypatch) -> None:
+    from codex_comm import latest_codex_log
+
+    monkeypatch.setenv("CCB_LOG_INDEX", "0")
+    root = tmp_path / "sessions"
+    _write_log(root / "flat.jsonl", "/proj/a", "sid-flat", 1_000_000_000)
+    hit = latest_codex_log(lambda e: e.cwd == "/proj/a", root=root)
+    assert hit is not None and hit.session_id == "sid-flat"
+
+
+def test_unchanged_tree_refresh_stats_directories_not_every_log(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("CCB_LOG_INDEX_RECHECK", "2")
+    root = tmp_path / "projects"
+    for p in range(5):
+        for i in range(10):
+            _write_log(root / f"p{p}" / f"s{i}.jsonl", f"/proj/{p}", f"sid-{p}-{i}", (p * 10 + i + 1) * 1_000_000_000)
+    old = 1_000_000_000
+    for d in [root, *root.iterdir()]:
+        os.utime(d, ns=(old, old))
+    index = _index(root, tmp_path / "idx.json")
+    index.refresh()
+    walked = index.stats()
+    assert walked["full_walks"] == 1 and walked["file_stats"] == 50
+
+    index.refresh()
+    again = index.stats()
+    assert again["full_walks"] == 1 and again["dir_lists"] == walked["dir_lists"]
+    assert again["file_stats"] - walked["file_stats"] == 2
+
+    # The newest log grows in place (directory mtime unchanged) and a new log lands in another project.
+    newest = root / "p4" / "s9.jsonl"
+    with newest.open("a", encoding="utf-8") as handle:
+        handle.write("{}\n")
+    _write_log(root / "p0" / "late.jsonl", "/proj/0", "sid-late", time.time_ns() + 10_000_000_000)
+    index.refresh()
+    assert index.latest().session_id == "sid-late"
+    assert index.latest(lambda e: e.cwd == "/proj/4").size == newest.stat().st_size
+    assert index.stats()["full_walks"] == 1
+
+
+def test_streaming_log_does_not_rewrite_the_index_file(tmp_path: Path) -> None:
+    root = tmp_path / "sessions"
+    log = root / "a.jsonl"
+    _write_log(log, "/proj/a", "sid-a", 1_000_000_000)
+    index_path = tmp_path / "idx.json"
+    index = _index(root, index_path)
+    index.refresh()
+    saved = index_path.read_text(encoding="utf-8")
+    index_path.unlink()
+
+    for _ in range(3):
+        with log.open("a", encoding="utf-8") as handle:
+            handle.write("{}\n")
+        index.refresh()
+        assert index.latest().size == log.stat().st_size
+    assert not index_path.exists()
+
+    _write_log(root / "b.jsonl", "/proj/b", "sid-b", 2_000_000_000)
+    index.refresh()
+    assert index_path.exists() and index_path.read_text(encoding="utf-8") != saved
+    assert json.loads(index_path.read_text(encoding="utf-8"))["entries"][str(log)][1] == log.stat().st_size
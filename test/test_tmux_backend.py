@@ -155,3 +155,47 @@ def test_tmux_kill_pane_prefers_pane_id_over_session(monkeypatch: pytest.MonkeyP
     calls.clear()
     backend.kill_pane("mysession")
     assert calls == [["kill-session", "-t", "mysession"]]
+
+
+def test_tmux_pane_snapshot_answers_lookups_and_confirms_misses(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("CCB_PANE_SNAPSHOT_TTL", "30")
+    terminal.invalidate_pane_snapshots()
+    listings = ["%1\t0\tmain\tCCB-codex-abc\n%2\t1\tmain\tCCB-gemini\tx\n"]
+    calls: list[list[str]] = []
+
+    def fake_tmux_run(self: terminal.TmuxBackend, args: list[str], *, check: bool = False, capture: bool = False,
+                      input_bytes: bytes | None = None, timeout: float | None = None) -> subprocess.CompletedProcess[str]:
+        calls.append(args)
+        if args and args[0] in terminal.TmuxBackend._PANE_MUTATING_COMMANDS:
+            terminal.invalidate_pane_snapshots()
+        assert args[:3] == ["list-panes", "-a", "-F"] or args[0] == "kill-pane"
+        return _cp(stdout=listings[-1])
+
+    backend = terminal.TmuxBackend()
+    monkeypatch.setattr(backend, "_tmux_run", fake_tmux_run.__get__(backend, terminal.TmuxBackend))
+    other = terminal.TmuxBackend()
+    monkeypatch.setattr(other, "_tmux_run", fake_tmux_run.__get__(other, terminal.TmuxBackend))
+
+    assert backend.is_alive("%1") is True
+    assert other.is_alive("main") is True
+    assert other.find_pane_by_title_marker("CCB-codex") == "%1"
+    assert len(calls) == 1
+
+    # Dead or missing panes are confirmed with a fresh listing once the snapshot is not brand new.
+    listings.append("%1\t0\tmain\tCCB-codex-abc\n%3\t0\tmain\tCCB-claude\n")
+    monkeypatch.setattr(terminal, "_SNAPSHOT_CONFIRM_AGE_S", 0.0)
+    assert backend.is_alive("%3") is True
+    assert backend.is_alive("%2") is False
+    assert len(calls) == 3
+
+    # A sweep answers every lookup from one listing taken when it starts.
+    calls.clear()
+    with terminal.pane_sweep():
+        assert [backend.is_alive(p) for p in ("%1", "%2", "%3", "%4")] == [True, False, True, False]
+        assert other.find_pane_by_title_marker("CCB-none") is None
+    assert len(calls) == 1
+
+    backend.kill_pane("%3")
+    listings.append("%1\t0\tmain\tCCB-codex-abc\n")
+    assert backend.is_alive("%3") is False
+    assert calls[-1][:3] == ["list-panes", "-a", "-F"]
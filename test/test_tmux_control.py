@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import pytest
+
+import terminal
+import tmux_control
+from tmux_control import command_line, get_control_client
+
+pytestmark = pytest.mark.skipif(shutil.which("tmux") is None, reason="tmux not installed")
+
+
+def test_command_line_quotes_for_tmux_parser() -> None:
+    assert command_line(["display-message", "-p", "#{pane_id}"]) == '"display-message" "-p" "#{pane_id}"'
+    assert command_line(['a "b" $HOME\\', "x\ny\t\x01"]) == '"a \\"b\\" \\$HOME\\\\" "x\\ny\\t\\001"'
+
+
+@pytest.fixture
+def tmux_server(monkeypatch: pytest.MonkeyPatch):
+    socket = f"ccb-test-{os.getpid()}"
+    monkeypatch.setenv("CCB_TMUX_CONTROL", "1")
+    monkeypatch.setenv("CCB_TMUX_ENTER_DELAY", "0")
+    subprocess.run(["tmux", "-L", socket, "new-session", "-d", "-s", "t", "-x", "120", "-y", "20", "cat"], check=True)
+    pane = subprocess.run(
+        ["tmux", "-L", socket, "list-panes", "-t", "t", "-F", "#{pane_id}"], capture_output=True, text=True, check=True
+    ).stdout.strip()
+    try:
+        yield socket, pane
+    finally:
+        get_control_client(["tmux", "-L", socket]).close()
+        subprocess.run(["tmux", "-L", socket, "kill-server"], capture_output=True)
+
+
+def test_backend_runs_over_control_connection(tmux_server) -> None:
+    socket, pane = tmux_server
+    backend = terminal.TmuxBackend(socket_name=socket)
+    client = get_control_client(backend._tmux_base())
+    connects = client.counters["connects"]
+
+    assert backend.is_alive(pane) is True
+    assert backend.is_alive("%999") is False
+    backend.send_text(pane, 'hello "ctl" $HOME\nsecond line \\ end')
+    deadline = time.time() + 5.0
+    content = ""
+    while time.time() < deadline and "second line \\ end" not in content:
+        content = backend.get_pane_content(pane, lines=10) or ""
+        time.sleep(0.05)
+    assert 'hello "ctl" $HOME' in content and "second line \\ end" in content
+    assert client.counters["connects"] == connects + 1 and client.counters["commands"] >= 6
+
+    with pytest.raises(subprocess.CalledProcessError):
+        backend._tmux_run(["send-keys", "-t", "%999", "x"], check=True)
+
+
+def test_falls_back_and_reconnects(tmux_server, monkeypatch: pytest.MonkeyPatch) -> None:
+    socket, pane = tmux_server
+    backend = terminal.TmuxBackend(socket_name=socket)
+    client = get_control_client(backend._tmux_base())
+    assert backend.is_pane_alive(pane) is True
+    connects = client.counters["connects"]
+
+    client._close()
+    monkeypatch.setattr(tmux_control, "_RECONNECT_BACKOFF_S", 0.0)
+    assert backend.is_pane_alive(pane) is True
+    assert client.counters["connects"] == connects + 1
+
+    # Commands that depend on the calling client never use the control connection.
+    assert backend._tmux_run_control(["display-message", "-p", "#{pane_id}"], input_bytes=None, timeout=None) is None
+
+
+_HANGING_TMUX = """
+import sys, time
+for n, line in enumerate(sys.stdin, 1):
+    if line.startswith("refresh-client"):
+        sys.stdout.write(f"%begin 1 {n} 1\\n%end 1 {n} 1\\n")
+        sys.stdout.flush()
+    else:
+        time.sleep(30)
+"""
+
+
+def test_sent_command_without_reply_is_not_rerun(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    script = tmp_path / "fake_tmux.py"
+    script.write_text(_HANGING_TMUX, encoding="utf-8")
+    client = tmux_control.TmuxControlClient([sys.executable, str(script)])
+    backend = terminal.TmuxBackend()
+    subprocess_calls: list[list[str]] = []
+    monkeypatch.setenv("CCB_TMUX_CONTROL", "1")
+    monkeypatch.setattr(terminal, "get_control_client", lambda base_cmd: client)
+    monkeypatch.setattr(terminal, "_run", lambda args, **kw: subprocess_calls.append(args))
+    try:
+        cp = backend._tmux_run(["send-keys", "-t", "%1", "Enter"], timeout=0.3)
+        assert cp.returncode != 0
+        assert subprocess_calls == []
+        assert client.counters["failures"] == 1 and not client.connected
+    finally:
+        client.close()
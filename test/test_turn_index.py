@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from claude_comm import ClaudeLogReader
+from codex_comm import _NOISE_HEADS, _REPLY_MARKERS, _classify_event
+from turn_index import TurnIndex
+
+
+def _codex_turn(i: int) -> str:
+    prompt = f"CCB_REQ_ID: {i:032x}\n\nquestion {i}"
+    rows = [
+        {"type": "event_msg", "payload": {"type": "user_message", "message": prompt}},
+        {"type": "response_item", "payload": {"type": "message", "role": "user", "content": [{"type": "input_text", "text": prompt}]}},
+        {"type": "response_item", "payload": {"type": "function_call_output", "output": "x" * 500}},
+        {"type": "event_msg", "payload": {"type": "agent_message", "message": f"thinking {i}"}},
+        {"type": "event_msg", "payload": {"type": "agent_message", "message": f"answer {i}\nCCB_DONE: {i:032x}"}},
+    ]
+    return "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in rows)
+
+
+def _index(log: Path, tmp_path: Path) -> TurnIndex:
+    return TurnIndex(
+        log,
+        name="codex",
+        classify=_classify_event,
+        markers=_REPLY_MARKERS,
+        reject=_NOISE_HEADS,
+        index_path=tmp_path / "idx.json",
+    )
+
+
+def test_turns_pages_and_req_lookup(tmp_path: Path) -> None:
+    log = tmp_path / "rollout.jsonl"
+    log.write_text("".join(_codex_turn(i) for i in range(10)), encoding="utf-8")
+    index = _index(log, tmp_path)
+
+    assert index.sync() == 10
+    latest = index.latest(2)
+    assert [q.splitlines()[-1] for q, _ in latest] == ["question 8", "question 9"]
+    assert latest[-1][1] == f"answer 9\nCCB_DONE: {9:032x}"
+    assert [a.splitlines()[0] for _, a in index.latest(3, skip=5)] == ["answer 2", "answer 3", "answer 4"]
+
+    turn = index.turn_for_req(f"{3:032X}")
+    assert turn is not None and turn.n == 4
+    assert index.conversation(turn)[1].startswith("answer 3")
+
+
+def test_incremental_sync_persistence_and_rebuild(tmp_path: Path) -> None:
+    log = tmp_path / "rollout.jsonl"
+    log.write_text(_codex_turn(0) + _codex_turn(1), encoding="utf-8")
+    index = _index(log, tmp_path)
+    index.sync()
+    scanned = index.counters["bytes_scanned"]
+
+    with log.open("a", encoding="utf-8") as fh:
+        fh.write(_codex_turn(2) + '{"type":"event_msg","payl')
+    assert index.sync() == 3
+    assert index.counters["bytes_scanned"] - scanned < len(_codex_turn(2)) + 1
+
+    # A fresh process resumes from the sidecar instead of rescanning the log.
+    reloaded = _index(log, tmp_path)
+    assert reloaded.sync() == 3 and reloaded.counters["bytes_scanned"] == 0
+    assert reloaded.latest(1)[0][1].startswith("answer 2")
+
+    log.write_text(_codex_turn(7), encoding="utf-8")
+    assert reloaded.sync() == 1
+    assert reloaded.counters["rebuilds"] == 1
+    assert reloaded.turn_for_req(f"{7:032x}") is not None
+
+
+def test_claude_reader_uses_turn_index(tmp_path: Path) -> None:
+    session = tmp_path / "s.jsonl"
+    lines = []
+    for i in range(4):
+        lines.append({"type": "user", "userType": "external", "message": {"role": "user", "content": f"q{i}"}})
+        lines.append({"type": "assistant", "message": {"role": "assistant", "content": [{"type": "text", "text": f"a{i}"}]}})
+        lines.append({"type": "progress", "data": "noise"})
+    session.write_text("".join(json.dumps(x) + "\n" for x in lines), encoding="utf-8")
+    reader = ClaudeLogReader(root=tmp_path, work_dir=tmp_path)
+    reader.set_preferred_session(session)
+
+    assert reader.latest_conversations(2) == [("q2", "a2"), ("q3", "a3")]
+    assert reader.latest_conversations(1, skip=3) == [("q0", "a0")]
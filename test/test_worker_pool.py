@@ -5,7 +5,7 @@ import time
 from dataclasses import dataclass
 from typing import Optional
 
-from worker_pool import BaseSessionWorker, PerSessionWorkerPool
+from worker_pool import BaseSessionWorker, PerSessionWorkerPool, PriorityTaskQueue, WorkerPoolFull
 
 
 class _NoopThread(threading.Thread):
@@ -36,6 +36,7 @@ class _Task:
     req_id: str
     done_event: threading.Event
     result: Optional[str] = None
+    priority: Optional[str] = None
 
 
 class _EchoWorker(BaseSessionWorker[_Task, str]):
@@ -77,3 +78,203 @@ def test_base_session_worker_exception_path() -> None:
         worker.stop()
         worker.join(timeout=2.0)
 
+
+
+def test_priority_queue_serves_interactive_before_bulk_backlog() -> None:
+    q: PriorityTaskQueue[_Task] = PriorityTaskQueue(aging_s=60.0)
+    for i in range(20):
+        q.put(_Task(req_id=f"b{i}", done_event=threading.Event()), "bulk")
+    q.put(_Task(req_id="n1", done_event=threading.Event()), "normal")
+    q.put(_Task(req_id="i1", done_event=threading.Event()), "interactive")
+
+    order = [q.get(timeout=0.1)[0].req_id for _ in range(3)]
+    assert order == ["i1", "n1", "b0"]
+    assert q.pending_by_priority() == {"interactive": 0, "normal": 0, "bulk": 19}
+
+
+def test_priority_queue_aging_promotes_one_class_per_interval() -> None:
+    q: PriorityTaskQueue[_Task] = PriorityTaskQueue(aging_s=0.2)
+    q.put(_Task(req_id="bulk", done_event=threading.Event()), "bulk")
+    time.sleep(0.25)
+    q.put(_Task(req_id="normal", done_event=threading.Event()), "normal")
+    q.put(_Task(req_id="interactive", done_event=threading.Event()), "interactive")
+
+    order = [q.get(timeout=0.1)[0].req_id for _ in range(3)]
+    assert order == ["interactive", "bulk", "normal"]
+
+
+def test_priority_queue_serves_fresh_interactive_before_aged_bulk_batch() -> None:
+    q: PriorityTaskQueue[_Task] = PriorityTaskQueue(aging_s=0.02)
+    for i in range(20):
+        q.put(_Task(req_id=f"b{i}", done_event=threading.Event()), "bulk")
+    time.sleep(0.1)
+    q.put(_Task(req_id="i1", done_event=threading.Event()), "interactive")
+
+    assert q.get(timeout=0.1)[0].req_id == "i1"
+    assert q.pending_by_priority() == {"interactive": 0, "normal": 0, "bulk": 20}
+
+
+def test_priority_queue_serves_aged_bulk_while_interactive_keeps_arriving() -> None:
+    q: PriorityTaskQueue[_Task] = PriorityTaskQueue(aging_s=0.02, aged_every=3)
+    q.put(_Task(req_id="bulk", done_event=threading.Event()), "bulk")
+    time.sleep(0.05)
+    served: list[str] = []
+    for i in range(6):
+        q.put(_Task(req_id=f"i{i}", done_event=threading.Event()), "interactive")
+        served.append(q.get(timeout=0.1)[0].req_id)
+
+    assert served[:4] == ["i0", "i1", "i2", "bulk"]
+    assert q.pending_by_priority() == {"interactive": 1, "normal": 0, "bulk": 0}
+
+
+def test_base_session_worker_reports_priority_stats() -> None:
+    worker = _EchoWorker("s1")
+    worker.start()
+    try:
+        task = _Task(req_id="r3", done_event=threading.Event(), priority="bulk")
+        worker.enqueue(task)
+        assert task.done_event.wait(timeout=2.0) is True
+        stats = worker.stats()
+        assert stats["served"]["bulk"] == 1
+        assert stats["pending"]["bulk"] == 0
+    finally:
+        worker.stop()
+        worker.join(timeout=2.0)
+
+
+class _BlockingWorker(_EchoWorker):
+    def __init__(self, session_key: str, gate: threading.Event):
+        super().__init__(session_key)
+        self._gate = gate
+
+    def _handle_task(self, task: _Task) -> str:
+        self._gate.wait(timeout=5.0)
+        return super()._handle_task(task)
+
+
+def test_pool_retires_idle_worker_and_recreates_on_demand() -> None:
+    pool: PerSessionWorkerPool[_EchoWorker] = PerSessionWorkerPool(idle_timeout_s=0.05, max_workers=0)
+    t1 = _Task(req_id="r1", done_event=threading.Event())
+    w1 = pool.submit("s1", _EchoWorker, t1)
+    assert t1.done_event.wait(timeout=2.0) is True
+
+    w1.join(timeout=2.0)
+    assert not w1.is_alive()
+    stats = pool.stats()
+    assert stats["active"] == 0
+    assert stats["created"] == 1
+    assert stats["retired"] == 1
+
+    t2 = _Task(req_id="r2", done_event=threading.Event())
+    w2 = pool.submit("s1", _EchoWorker, t2)
+    assert w2 is not w1
+    assert t2.done_event.wait(timeout=2.0) is True
+    assert t2.result == "ok:r2"
+    assert pool.stats()["created"] == 2
+    w2.stop()
+
+
+def test_pool_cap_evicts_idle_worker_and_rejects_when_all_busy() -> None:
+    pool: PerSessionWorkerPool[_EchoWorker] = PerSessionWorkerPool(idle_timeout_s=0, max_workers=1)
+    t1 = _Task(req_id="r1", done_event=threading.Event())
+    w1 = pool.submit("s1", _EchoWorker, t1)
+    assert t1.done_event.wait(timeout=2.0) is True
+
+    gate = threading.Event()
+    t2 = _Task(req_id="r2", done_event=threading.Event())
+    w2 = pool.submit("s2", lambda k: _BlockingWorker(k, gate), t2)
+    w1.join(timeout=2.0)
+    assert not w1.is_alive()
+    assert pool.stats()["evicted"] == 1
+
+    time.sleep(0.05)
+    try:
+        pool.submit("s3", _EchoWorker, _Task(req_id="r3", done_event=threading.Event()))
+    except WorkerPoolFull:
+        pass
+    else:
+        raise AssertionError("expected WorkerPoolFull while the only worker is busy")
+    assert pool.stats()["rejected"] == 1
+
+    gate.set()
+    assert t2.done_event.wait(timeout=2.0) is True
+    w2.stop()
+
+
+def test_pool_never_evicts_a_worker_that_popped_a_task() -> None:
+    gate = threading.Event()
+    popped = threading.Event()
+
+    class _SlowStartWorker(_EchoWorker):
+        def __init__(self, session_key: str):
+            super().__init__(session_key)
+            get = self._q.get
+
+            def _get(timeout=None):
+                item = get(timeout=timeout)
+                # Between dequeue and running the task, where the worker used to look idle.
+                popped.set()
+                gate.wait(timeout=5.0)
+                return item
+
+            self._q.get = _get  # type: ignore[method-assign]
+
+    pool: PerSessionWorkerPool[_EchoWorker] = PerSessionWorkerPool(idle_timeout_s=0, max_workers=1)
+    t1 = _Task(req_id="r1", done_event=threading.Event())
+    w1 = pool.submit("s1", _SlowStartWorker, t1)
+    assert popped.wait(timeout=2.0)
+    assert pool.stats()["active"] == 1
+    try:
+        pool.submit("s2", _EchoWorker, _Task(req_id="r2", done_event=threading.Event()))
+    except WorkerPoolFull:
+        pass
+    else:
+        raise AssertionError("evicted a worker that was about to run a task")
+    gate.set()
+    assert t1.done_event.wait(timeout=2.0) is True
+    assert pool.stats()["evicted"] == 0 and pool.stats()["active"] == 0
+    w1.stop()
+
+
+class _FakeReader:
+    def __init__(self, resumable: bool = True):
+        self.resumable = resumable
+        self.captures = 0
+
+    def capture_state(self) -> dict:
+        self.captures += 1
+        return {"offset": 0}
+
+    def resume_state(self, state: dict) -> Optional[dict]:
+        return {"offset": state["offset"]} if self.resumable else None
+
+
+def test_worker_reuses_parked_reader_until_binding_changes() -> None:
+    worker = _EchoWorker("s1")
+    created: list[_FakeReader] = []
+
+    def _factory() -> _FakeReader:
+        created.append(_FakeReader())
+        return created[-1]
+
+    r1, s1 = worker._acquire_reader(("wd", "log-a"), _factory)
+    worker._park_reader(("wd", "log-a"), r1, {"offset": 42})
+    r2, s2 = worker._acquire_reader(("wd", "log-a"), _factory)
+    assert r2 is r1
+    assert s2 == {"offset": 42}
+    assert r1.captures == 1
+
+    worker._park_reader(("wd", "log-a"), r2, s2)
+    r3, _s3 = worker._acquire_reader(("wd", "log-b"), _factory)
+    assert r3 is not r1
+    assert len(created) == 2
+    stats = worker.stats()
+    assert (stats["readers_warm"], stats["readers_cold"]) == (1, 2)
+
+
+def test_worker_rebuilds_reader_on_rotation() -> None:
+    worker = _EchoWorker("s1")
+    stale = _FakeReader(resumable=False)
+    worker._park_reader("k", stale, {"offset": 1})
+    fresh, _state = worker._acquire_reader("k", _FakeReader)
+    assert fresh is not stale